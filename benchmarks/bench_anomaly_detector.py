@@ -0,0 +1,46 @@
+"""
+Cost of one anomaly detector tick (update + evaluate) across all containers.
+
+Every tick feeds one reading per container, as the sampler does, and then
+evaluates the leak and spike state of all of them, as the API does. Run
+from the repository root:
+
+    python -m benchmarks.bench_anomaly_detector --counts 100 500 1000 --ticks 1000
+"""
+import argparse
+import time
+import numpy as np
+from services.anomaly_detector import AnomalyDetector
+
+
+def run(counts, ticks):
+    rng = np.random.default_rng(0)
+    print(f"{'containers':>10} {'update (ms)':>12} {'evaluate (ms)':>14} {'flagged':>8}")
+    for count in counts:
+        detector = AnomalyDetector(min_samples=10)
+        ids = [f"{i:064x}" for i in range(count)]
+        slots = np.arange(count)
+        limits = np.full(count, 2048.0)
+        growth = np.where(np.arange(count) % 10 == 0, 0.5, 0.0)
+
+        started = time.perf_counter()
+        for tick in range(ticks):
+            values = 200 + growth * tick + rng.normal(0, 1, count)
+            detector.update(ids, slots, float(tick), values, limits)
+        update = (time.perf_counter() - started) / ticks
+
+        rounds = max(1, ticks // 10)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            anomalies = detector.evaluate(ids, ids, slots)
+        evaluate = (time.perf_counter() - started) / rounds
+        flagged = sum(a.leak or a.spike for a in anomalies)
+        print(f"{count:>10} {update * 1000:>12.3f} {evaluate * 1000:>14.2f} {flagged:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 500, 1000])
+    args = parser.parse_args()
+    run(args.counts, args.ticks)
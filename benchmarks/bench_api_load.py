@@ -0,0 +1,199 @@
+"""
+Load test of the HTTP API against the fake Docker daemon.
+
+Starts tests/fake_daemon.py with `--containers` containers and `--images`
+images, serves main.app with uvicorn on a local port and drives every
+scenario at each `--concurrency` level from blocking http.client workers
+(one keep-alive connection per worker). Latency percentiles and requests
+per second are printed as JSON so runs can be diffed across commits. Run
+from the repository root:
+
+    python -m benchmarks.bench_api_load --containers 500 --images 200 \\
+        --stats-latency 0.05 --concurrency 1 8 32 --duration 5 --output load.json
+"""
+import argparse
+import contextlib
+import http.client
+import itertools
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from tests.fake_daemon import FakeDockerDaemon
+
+SCENARIOS = {
+    "list_containers": ("GET", "/api/containers/"),
+    "list_containers_page": ("GET", "/api/containers/?limit=50&status=running"),
+    "list_images": ("GET", "/api/images/"),
+    "page_containers": ("GET", "/pages/containers"),
+    "page_images": ("GET", "/pages/images"),
+    "page_predictions": ("GET", "/pages/predictions"),
+    # Alternating start/stop over a set of containers, see _requests
+    "start_stop": None,
+}
+
+
+def _requests(scenario, container_ids):
+    if SCENARIOS[scenario] is not None:
+        return itertools.repeat(SCENARIOS[scenario])
+    # Every call changes the container's state, so none is answered with 304
+    return itertools.chain.from_iterable(
+        (("POST", f"/api/containers/{container_id}/start"),
+         ("POST", f"/api/containers/{container_id}/stop"))
+        for container_id in itertools.cycle(container_ids))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def drive(port, scenario, container_ids, concurrency, duration, warmup):
+    """
+    Run `concurrency` workers for `duration` seconds after a warm-up and
+    return the latency and throughput summary.
+    """
+    lock = threading.Lock()
+    requests = _requests(scenario, container_ids)
+    latencies, errors = [], [0]
+    measuring = threading.Event()
+    stop = threading.Event()
+
+    def worker():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        own, failed = [], 0
+        while not stop.is_set():
+            with lock:
+                method, path = next(requests)
+            started = time.perf_counter()
+            try:
+                connection.request(method, path)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status < 500
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                ok = False
+            elapsed = time.perf_counter() - started
+            if measuring.is_set():
+                own.append(elapsed)
+                failed += not ok
+        connection.close()
+        with lock:
+            latencies.extend(own)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    time.sleep(warmup)
+    measuring.set()
+    started = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    elapsed = time.perf_counter() - started
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def serve(port):
+    # Imported late: config reads DOCKER_HOST when the app is first imported
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port,
+                                           log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start in time")
+        time.sleep(0.01)
+    return server, thread
+
+
+def run(args):
+    daemon = FakeDockerDaemon.generate(containers=args.containers, images=args.images,
+                                       stats_latency=args.stats_latency, latency=args.latency)
+    # The app prints progress to stdout, which is reserved for the report
+    with daemon, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        os.environ["DOCKER_HOST"] = daemon.url
+        port = _free_port()
+        server, thread = serve(port)
+        container_ids = list(daemon.containers)[:max(1, args.concurrency[-1] * 2)]
+        results = []
+        try:
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    result = drive(port, scenario, container_ids, concurrency,
+                                   args.duration, args.warmup)
+                    results.append(result)
+                    print(f"{scenario:>22} c={concurrency:<4} {result['rps']:>9} req/s "
+                          f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms", file=sys.stderr)
+        finally:
+            server.should_exit = True
+            thread.join(10)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "daemon": {"containers": args.containers, "images": args.images,
+                   "stats_latency": args.stats_latency, "latency": args.latency},
+        "duration": args.duration,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--containers", type=int, default=200)
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--stats-latency", type=float, default=0.0,
+                        help="seconds every stats sample takes on the fake daemon")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds every fake daemon response is delayed")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=3.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=0.5, help="unmeasured seconds per run")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    run(parser.parse_args())
@@ -0,0 +1,70 @@
+"""
+Time of one memory sampling sweep through the cgroup fast path versus the
+stats API.
+
+A fake cgroup v2 tree with `--count` containers is written to a temporary
+directory. The API path uses mocked containers whose `stats(stream=False)`
+sleeps for `--latency` seconds, like the real daemon while it takes two CPU
+readings. Run from the repository root:
+
+    python -m benchmarks.bench_cgroup_sampler --counts 10 100 1000 --latency 0.25
+"""
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.bench_stats_collection import make_containers
+from services.cgroup_sampler import CgroupSampler
+from services.prediction_manager import ContainerMemoryManager
+
+
+def make_cgroup_tree(root: str, containers):
+    with open(os.path.join(root, "cgroup.controllers"), "w") as file:
+        file.write("cpu memory\n")
+    for container in containers:
+        path = os.path.join(root, "system.slice", f"docker-{container.id}.scope")
+        os.makedirs(path)
+        for name, content in (("memory.current", f"{64 * 1024 ** 2}\n"),
+                              ("memory.stat", "anon 1\ninactive_file 2\n"),
+                              ("cpu.stat", "usage_usec 1000\n")):
+            with open(os.path.join(path, name), "w") as file:
+                file.write(content)
+
+
+def run(counts, latency, workers, rounds):
+    print(f"stats API latency per container: {latency:.2f}s")
+    print(f"{'containers':>10} {f'API, {workers} workers (ms)':>24} {'cgroup first (ms)':>18} "
+          f"{'cgroup warm (ms)':>17}")
+    for count in counts:
+        containers = make_containers(count, latency)
+        with tempfile.TemporaryDirectory(prefix="fake-cgroup-") as root:
+            make_cgroup_tree(root, containers)
+
+            api = ContainerMemoryManager(max_workers=workers, stats_timeout=60)
+            started = time.perf_counter()
+            api.collect_stats(containers)
+            api_time = time.perf_counter() - started
+
+            local = ContainerMemoryManager(max_workers=workers, cgroup=CgroupSampler(root))
+            started = time.perf_counter()
+            local.collect_stats(containers)
+            first_time = time.perf_counter() - started
+
+            # Later sweeps reuse the resolved paths and open file handles
+            started = time.perf_counter()
+            for _ in range(rounds):
+                local.collect_stats(containers)
+            warm_time = (time.perf_counter() - started) / rounds
+            local.cgroup.close()
+
+        print(f"{count:>10} {api_time * 1000:>24.1f} {first_time * 1000:>18.2f} {warm_time * 1000:>17.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20, help="warm sweeps to average")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+    run(args.counts, args.latency, args.workers, args.rounds)
@@ -0,0 +1,102 @@
+"""
+Throughput and peak memory of the container logs endpoint versus reading
+the whole log into memory and filtering it afterwards.
+
+A fake engine serves the log in 4 KB frames. The buffered baseline fetches
+the complete body, demultiplexes and filters it, the way the blocking SDK
+hands logs over; the endpoint demultiplexes, filters and sends line
+batches as they arrive. Memory is the tracemalloc peak of a separate run
+(it includes the fake engine's thread).
+Run from the repository root:
+
+    python -m benchmarks.bench_container_logs --megabytes 16 64
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from dependencies import get_async_docker_client
+from main import app
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.log_stream import FrameDemuxer, LineSplitter
+from tests.fake_daemon import FakeDockerDaemon
+
+LINE = b"2026-01-01T00:00:00Z GET /api/items/%06d 200 12ms\n"
+
+
+async def buffered(url: str, grep: bytes) -> int:
+    engine = AsyncDockerEngine(url)
+    status, _, data = await engine.request("GET", "/containers/web/logs",
+                                           {"stdout": True, "stderr": True, "tail": "all"}, timeout=60)
+    assert status == 200
+    splitter = LineSplitter(1 << 30)
+    lines = [line for stream, piece in FrameDemuxer().feed(data) for _, line in splitter.feed(stream, piece)]
+    await engine.close()
+    return sum(len(line) + 1 for line in lines if grep in line)
+
+
+async def streamed(grep: str) -> int:
+    sent = 0
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": "/api/containers/web/logs", "raw_path": b"", "root_path": "",
+             "query_string": f"grep={grep}".encode(), "headers": [],
+             "client": ("127.0.0.1", 50000), "server": ("testserver", 80)}
+    await app(scope, receive, send)
+    return sent
+
+
+def measure(coroutine_factory):
+    started = time.perf_counter()
+    size = asyncio.run(coroutine_factory())
+    elapsed = time.perf_counter() - started
+    # tracemalloc slows everything down: the peak comes from a second run
+    tracemalloc.start()
+    asyncio.run(coroutine_factory())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def run(args):
+    print(f"{'log MB':>7} {'mode':>9} {'MB/s':>8} {'peak MB':>8}")
+    for megabytes in args.megabytes:
+        with FakeDockerDaemon(containers={"web": "web"}) as daemon:
+            lines = megabytes * 1024 * 1024 // len(LINE % 0)
+            per_frame = 4096 // len(LINE % 0)
+            for start in range(0, lines, per_frame):
+                daemon.log("web", b"".join(LINE % i for i in range(start, min(start + per_frame, lines))))
+            # Let the daemon thread append everything before measuring
+            time.sleep(0.5)
+            app.dependency_overrides[get_async_docker_client] = \
+                lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+            try:
+                results = {}
+                for mode, factory in (("buffered", lambda: buffered(daemon.url, args.grep.encode())),
+                                      ("streamed", lambda: streamed(args.grep))):
+                    size, elapsed, peak = measure(factory)
+                    results[mode] = size
+                    print(f"{megabytes:>7} {mode:>9} {megabytes / elapsed:>8.1f} {peak / 1024 ** 2:>8.1f}")
+                assert results["buffered"] == results["streamed"]
+            finally:
+                app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--grep", default="/api/items/0001", help="substring filter")
+    run(parser.parse_args())
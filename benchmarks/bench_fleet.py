@@ -0,0 +1,69 @@
+"""
+Latency of a fleet-wide container listing, hosts queried one after another
+versus concurrently with per-host deadlines.
+
+Every host is a tests/fake_daemon.py daemon answering after `--latency`
+seconds. With `--hung` one more host never answers in time: the sequential
+listing waits out its whole deadline, the fleet reports it as partial and
+skips it on the following requests. Run from the repository root:
+
+    python -m benchmarks.bench_fleet --hosts 1 4 16 --latency 0.1 --hung
+"""
+import argparse
+import asyncio
+import contextlib
+import statistics
+import time
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.fleet import Fleet
+from services.listing import ListingQuery
+from tests.fake_daemon import FakeDockerDaemon
+
+
+async def measure(daemons, args):
+    clients = {f"host-{i}": AsyncDockerClient(AsyncDockerEngine(daemon.url)) for i, daemon in enumerate(daemons)}
+    fleet = Fleet(clients, timeout=args.timeout, retry_interval=60, owned=tuple(clients))
+    timings = {"sequential": [], "fleet": []}
+    try:
+        for _ in range(args.rounds):
+            started = time.monotonic()
+            for host in fleet.hosts:
+                try:
+                    await asyncio.wait_for(host.client.query_containers(ListingQuery()), args.timeout)
+                except (OSError, asyncio.TimeoutError):
+                    pass
+            timings["sequential"].append(time.monotonic() - started)
+
+            started = time.monotonic()
+            result = await fleet.containers()
+            timings["fleet"].append(time.monotonic() - started)
+    finally:
+        await fleet.close()
+    return {mode: statistics.median(values) for mode, values in timings.items()}, result
+
+
+def run(args):
+    print(f"per-host latency {args.latency:.2f}s, deadline {args.timeout:.2f}s, "
+          f"hung host: {'yes' if args.hung else 'no'}")
+    print(f"{'hosts':>5} {'sequential (s)':>15} {'fleet (s)':>10} {'speedup':>8} {'partial':>8}")
+    for count in args.hosts:
+        with contextlib.ExitStack() as stack:
+            daemons = [stack.enter_context(FakeDockerDaemon.generate(containers=args.containers,
+                                                                     latency=args.latency))
+                       for _ in range(count)]
+            if args.hung:
+                daemons.append(stack.enter_context(FakeDockerDaemon(latency=3600)))
+            medians, result = asyncio.run(measure(daemons, args))
+        print(f"{count:>5} {medians['sequential']:>15.3f} {medians['fleet']:>10.3f} "
+              f"{medians['sequential'] / medians['fleet']:>7.1f}x {str(result.partial):>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--containers", type=int, default=50, help="containers per host")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--timeout", type=float, default=1.0, help="per-host deadline")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--hung", action="store_true", help="add a host that never answers in time")
+    run(parser.parse_args())
@@ -0,0 +1,64 @@
+"""
+Forecasting cost for 1,000 containers x 1,000 samples.
+
+Compares the vectorized least-squares batch fit, the O(1) incremental update
+and the forecast of every container against one scikit-learn fit per
+container (skipped when scikit-learn is not installed). Run from the
+repository root:
+
+    python -m benchmarks.bench_forecast
+"""
+import argparse
+import time
+import numpy as np
+from services.stats_history import StatsHistory
+
+
+def timed(fn, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def run(containers, samples, steps):
+    rng = np.random.default_rng(0)
+    history = StatsHistory(window=samples, max_containers=containers)
+    timestamps = 1_700_000_000.0 + 10.0 * np.arange(samples)
+    values = 100.0 + rng.normal(0, 5, (containers, samples)) + rng.uniform(-1, 1, (containers, 1)) * np.arange(samples)
+
+    fill_time, _ = timed(lambda: [
+        history.append(f"c{c}", f"c{c}", timestamps[s], memory_usage=values[c, s])
+        for s in range(samples) for c in range(containers)])
+    appends = containers * samples
+    print(f"incremental append       : {fill_time / appends * 1e6:8.2f} us/sample ({appends} samples)")
+
+    refit_time, _ = timed(history.refit, repeat=3)
+    print(f"vectorized batch fit     : {refit_time * 1e3:8.2f} ms for {containers} x {samples}")
+
+    _, _, slots = history.active()
+    forecast_time, _ = timed(lambda: history.trend.forecast(slots, steps, 10.0), repeat=10)
+    print(f"forecast {steps} steps        : {forecast_time * 1e3:8.2f} ms for {containers} containers")
+
+    try:
+        from sklearn.linear_model import LinearRegression
+    except ImportError:
+        print("scikit-learn per-container fit: skipped (not installed)")
+        return
+
+    def sklearn_fit():
+        t = (timestamps - timestamps[0]).reshape(-1, 1)
+        for c in range(containers):
+            LinearRegression().fit(t, values[c])
+
+    sklearn_time, _ = timed(sklearn_fit)
+    print(f"sklearn fit per container: {sklearn_time * 1e3:8.2f} ms ({sklearn_time / refit_time:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--containers", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=6)
+    args = parser.parse_args()
+    run(args.containers, args.samples, args.steps)
@@ -0,0 +1,77 @@
+"""
+Per-request time of an image listing route: validated pydantic rows through
+response_model versus trusted rows encoded straight to bytes.
+
+Both routes declare `response_model=List[DockerImage]` and return the same
+rows, built once the way the inventory cache keeps them. The validated one
+lets FastAPI validate and encode the list again; the fast one returns
+`listing_response` (orjson when installed, pydantic's serializer otherwise;
+streamed in chunks above LISTING_CHUNK_SIZE rows). Run from the repository
+root:
+
+    python -m benchmarks.bench_listing_serialization --counts 100 1000 10000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+from fastapi import FastAPI
+from models.docker_model import DockerImage
+from services import listing
+from services.async_docker_client import _image_from_json
+from services.listing import listing_response
+from tests.asgi import call_async
+
+
+def make_app(rows: list[DockerImage]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated", response_model=List[DockerImage])
+    async def validated():
+        return rows
+
+    @app.get("/fast", response_model=List[DockerImage])
+    async def fast():
+        return listing_response(rows)
+
+    return app
+
+
+def make_images(count: int) -> list[dict]:
+    return [{"Id": f"sha256:{i:064x}", "RepoTags": [f"registry.local/team/image-{i}:1.{i % 50}"],
+             "Labels": {"maintainer": "ops", "tier": "web" if i % 3 else "db"}}
+            for i in range(count)]
+
+
+async def measure(app, path: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        status, _, body = await call_async(app, "GET", path)
+        timings.append(time.perf_counter() - started)
+        assert status == 200
+    return statistics.median(timings), body
+
+
+def run(args):
+    if args.no_orjson:
+        listing.orjson = None
+    encoder = "orjson" if listing.orjson is not None else "pydantic"
+    print(f"encoder: {encoder}, chunk size: {listing.config.LISTING_CHUNK_SIZE}")
+    print(f"{'images':>7} {'validated (ms)':>15} {'fast (ms)':>10} {'speedup':>8}")
+    for count in args.counts:
+        app = make_app([_image_from_json(image) for image in make_images(count)])
+        validated, expected = asyncio.run(measure(app, "/validated", args.repeat))
+        fast, body = asyncio.run(measure(app, "/fast", args.repeat))
+        assert json.loads(body) == json.loads(expected)
+        print(f"{count:>7} {validated * 1000:>15.2f} {fast * 1000:>10.2f} {validated / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-orjson", action="store_true", help="use pydantic's serializer")
+    run(parser.parse_args())
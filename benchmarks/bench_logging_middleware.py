@@ -0,0 +1,104 @@
+"""
+Requests per second through the access log middleware, before and after.
+
+"before" is the previous BaseHTTPMiddleware implementation logging through
+`logging.basicConfig(filename=...)`; "after" is the pure ASGI middleware with
+the background AccessLogWriter. Requests are sent straight into the ASGI app,
+so the numbers measure middleware overhead rather than socket I/O. Run from
+the repository root:
+
+    python -m benchmarks.bench_logging_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from middlewares.loggingMiddleware import AccessLogWriter, LoggingMiddleware
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        logging.info({
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "duration_ms": round(process_time, 2),
+            "client_ip": request.client.host if request.client else "unknown",
+        })
+        return response
+
+
+async def endpoint(request):
+    return JSONResponse([{"id": str(i), "name": f"container-{i}"} for i in range(20)])
+
+
+def make_app():
+    return Starlette(routes=[Route("/api/containers/", endpoint)])
+
+
+async def drive(app, requests, concurrency):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/containers/", "raw_path": b"/api/containers/",
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def one():
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            pass
+
+        await app(dict(scope), receive, send)
+
+    async def worker(count):
+        for _ in range(count):
+            await one()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+def run(requests, concurrency):
+    directory = tempfile.mkdtemp(prefix="bench-log-")
+
+    logging.basicConfig(filename=os.path.join(directory, "before.log"),
+                        format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO)
+    before = asyncio.run(drive(BaseHTTPLoggingMiddleware(make_app()), requests, concurrency))
+
+    writer = AccessLogWriter(path=os.path.join(directory, "after.log"))
+    after = asyncio.run(drive(LoggingMiddleware(make_app(), writer=writer), requests, concurrency))
+    writer.stop()
+
+    baseline = asyncio.run(drive(make_app(), requests, concurrency))
+
+    print(f"{'middleware':<28} {'req/s':>10}")
+    print(f"{'none (baseline)':<28} {baseline:>10.0f}")
+    print(f"{'BaseHTTPMiddleware (before)':<28} {before:>10.0f}")
+    print(f"{'pure ASGI + writer (after)':<28} {after:>10.0f}  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    run(args.requests, args.concurrency)
@@ -0,0 +1,98 @@
+"""
+Docker API traffic and HTTP throughput of N uvicorn workers, each polling the
+daemon on its own versus sharing one elected poller.
+
+For every `--workers` count, `uvicorn main:app --workers N` is started
+against tests/fake_daemon.py, once without and once with SHARED_CACHE_PATH.
+Every worker serves the predictions page once (which starts the stats
+sampler), then the container listing is driven for `--duration` seconds
+while the daemon counts the calls it gets. Run from the repository root:
+
+    python -m benchmarks.bench_shared_cache --workers 1 2 4 --duration 20
+"""
+import argparse
+import collections
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.bench_api_load import _free_port, drive
+from tests.fake_daemon import FakeDockerDaemon
+
+
+def _wait_ready(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/metrics")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def _operation(path: str) -> str:
+    parts = [part for part in path.split("?")[0].split("/") if part]
+    if parts and parts[0].startswith("v1."):
+        parts = parts[1:]
+    if parts[:1] == ["containers"] and len(parts) > 2:
+        # /containers/{id}/json is an inspect, not a listing
+        return "containers/inspect" if parts[-1] == "json" else f"containers/{parts[-1]}"
+    return "/".join(parts[:2])
+
+
+def measure(daemon, workers, shared, args):
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix="shared-cache-") as path:
+        env = {**os.environ, "DOCKER_HOST": daemon.url, "STATS_SAMPLE_INTERVAL": str(args.interval),
+               "SHARED_CACHE_PATH": path if shared else "", "ACCESS_LOG_PATH": os.devnull}
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+             "--log-level", "warning", "--no-access-log"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_ready(port)
+            # Fresh connections spread over the workers, so all of them
+            # load the prediction stack
+            for _ in range(8 * workers):
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                connection.request("GET", "/pages/predictions")
+                connection.getresponse().read()
+                connection.close()
+            time.sleep(2)
+            before = len(daemon.requests)
+            listing = drive(port, "list_containers", [], args.concurrency, args.duration, 0.0)
+            calls = daemon.requests[before:]
+        finally:
+            process.terminate()
+            process.wait(10)
+
+    counts = collections.Counter(_operation(path) for _, path in calls)
+    return listing["rps"], len(calls) / args.duration, counts
+
+
+def run(args):
+    daemon = FakeDockerDaemon.generate(containers=args.containers, images=args.images)
+    with daemon:
+        print(f"{'workers':>7} {'mode':>10} {'list req/s':>11} {'daemon calls/s':>15}  top daemon calls")
+        for workers in args.workers:
+            for shared in (False, True):
+                list_rps, daemon_rate, counts = measure(daemon, workers, shared, args)
+                top = ", ".join(f"{op} {n}" for op, n in counts.most_common(3))
+                print(f"{workers:>7} {'shared' if shared else 'per-worker':>10} {list_rps:>11} "
+                      f"{daemon_rate:>15.1f}  {top}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--containers", type=int, default=100)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per run")
+    parser.add_argument("--interval", type=float, default=2.0, help="stats sampling interval")
+    run(parser.parse_args())
@@ -0,0 +1,67 @@
+"""
+Cold-start import time and resident memory of a worker, with and without
+the numpy/pandas prediction stack.
+
+Every run is a fresh interpreter that imports `main` (what uvicorn does
+when it boots a worker) and then, for the "with predictions" row, the
+prediction manager that the first /pages/predictions request loads. Run
+from the repository root:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, sys, time
+
+def rss_mb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+started = time.perf_counter()
+import main
+{extra}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb(),
+                  "pandas_loaded": "pandas" in sys.modules}}))
+"""
+
+VARIANTS = {
+    "api worker (lazy predictions)": "",
+    "with prediction stack": "import services.prediction_manager",
+}
+
+
+def measure(extra: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(extra=extra)],
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(sample["seconds"] for sample in samples),
+        "rss_mb": statistics.median(sample["rss_mb"] for sample in samples),
+        "pandas_loaded": samples[0]["pandas_loaded"],
+    }
+
+
+def run(runs: int):
+    print(f"{'worker':<32} {'import (ms)':>12} {'RSS (MB)':>10} {'pandas':>7}")
+    for name, extra in VARIANTS.items():
+        result = measure(extra, runs)
+        print(f"{name:<32} {result['seconds'] * 1000:>12.0f} {result['rss_mb']:>10.1f} "
+              f"{str(result['pandas_loaded']):>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="interpreters per variant (median)")
+    args = parser.parse_args()
+    run(args.runs)
@@ -0,0 +1,58 @@
+"""
+Wall-clock time of ContainerMemoryManager.collect_stats against container count.
+
+The Docker daemon is mocked: every `container.stats(stream=False)` call sleeps
+for `--latency` seconds, the way the real daemon blocks while it takes two CPU
+samples. Run from the repository root:
+
+    python -m benchmarks.bench_stats_collection --latency 0.25
+"""
+import argparse
+import time
+from unittest.mock import MagicMock
+from services.prediction_manager import ContainerMemoryManager
+
+
+def make_containers(count: int, latency: float):
+    containers = []
+    for i in range(count):
+        container = MagicMock()
+        container.id = f"container-{i}"
+        container.name = f"container-{i}"
+
+        def stats(stream=False, _latency=latency):
+            time.sleep(_latency)
+            return {"memory_stats": {"usage": 64 * 1024 ** 2}}
+
+        container.stats.side_effect = stats
+        containers.append(container)
+    return containers
+
+
+def run(counts, latency, workers):
+    print(f"stats latency per container: {latency:.2f}s")
+    print(f"{'containers':>10} {'sequential (s)':>15} {f'{workers} workers (s)':>16} {'speedup':>8}")
+    for count in counts:
+        containers = make_containers(count, latency)
+
+        sequential = ContainerMemoryManager(max_workers=1, stats_timeout=60)
+        started = time.monotonic()
+        sequential.collect_stats(containers)
+        sequential_time = time.monotonic() - started
+
+        concurrent = ContainerMemoryManager(max_workers=workers, stats_timeout=60)
+        started = time.monotonic()
+        concurrent.collect_stats(containers)
+        concurrent_time = time.monotonic() - started
+
+        print(f"{count:>10} {sequential_time:>15.2f} {concurrent_time:>16.2f} "
+              f"{sequential_time / concurrent_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 40, 80])
+    args = parser.parse_args()
+    run(args.counts, args.latency, args.workers)
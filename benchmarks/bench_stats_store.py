@@ -0,0 +1,84 @@
+"""
+Range query latency of the on-disk stats store over a week of history.
+
+A store with `--containers` containers is written to a temporary directory:
+two days of raw samples every 10 s, a week of 1 minute rollups and a week
+of 1 hour rollups per container, as the background rollups would leave it.
+Each query runs once per container against the memory-mapped files. Run
+from the repository root:
+
+    python -m benchmarks.bench_stats_store --containers 300
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import numpy as np
+from services.stats_store import RECORD, RESOLUTIONS, StatsStore
+
+DAY = 86400
+
+
+def make_records(start: float, end: float, step: float) -> np.ndarray:
+    times = np.arange(start, end, step)
+    records = np.empty(len(times), dtype=RECORD)
+    records["t"] = times
+    records["memory"] = records["memory_max"] = 100 + np.sin(times / 3600) * 20
+    records["cpu"] = 12.5
+    records["samples"] = max(1, int(step // 10))
+    return records
+
+
+def populate(store: StatsStore, containers: int, now: float):
+    spans = {"raw": (2 * DAY, 10), "1m": (7 * DAY, 60), "1h": (7 * DAY, 3600)}
+    for resolution, (span, step) in spans.items():
+        records = make_records(now - span, now, step)
+        for i in range(containers):
+            records.tofile(os.path.join(store.path, resolution, f"{i:064x}.bin"))
+
+
+def time_queries(store: StatsStore, ids, start, end, step=None):
+    samples, points = [], 0
+    for container_id in ids:
+        started = time.perf_counter()
+        resolution, records = store.query(container_id, start, end, step)
+        points += len(records["t"].tolist())
+        samples.append(time.perf_counter() - started)
+    return resolution, samples, points / len(ids)
+
+
+def run(containers: int):
+    now = time.time()
+    queries = {
+        "last hour": (now - 3600, now, None),
+        "last day, 5 min step": (now - DAY, now, 300),
+        "last week": (now - 7 * DAY, now, None),
+        "last week, 15 min step": (now - 7 * DAY, now, 900),
+    }
+    with tempfile.TemporaryDirectory(prefix="stats-store-") as path:
+        store = StatsStore(path)
+        populate(store, containers, now)
+        size = sum(os.path.getsize(os.path.join(path, r, f))
+                   for r in RESOLUTIONS for f in os.listdir(os.path.join(path, r)))
+        print(f"{containers} containers, {size / 1024 ** 2:.1f} MB on disk")
+        print(f"{'query':<24} {'tier':>5} {'points':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'all (ms)':>9}")
+        ids = [f"{i:064x}" for i in range(containers)]
+        for name, (start, end, step) in queries.items():
+            resolution, samples, points = time_queries(store, ids, start, end, step)
+            samples.sort()
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+            print(f"{name:<24} {resolution:>5} {points:>7.0f} {statistics.median(samples) * 1000:>9.3f} "
+                  f"{p99 * 1000:>9.3f} {sum(samples) * 1000:>9.1f}")
+
+        started = time.perf_counter()
+        store.maintain(now + 3600)
+        print(f"rollup + retention pass: {(time.perf_counter() - started) * 1000:.0f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--containers", type=int, default=300)
+    args = parser.parse_args()
+    run(args.containers)
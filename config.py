@@ -0,0 +1,134 @@
+# config.py
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+# Docker engine connection pool
+DOCKER_HOST = os.getenv("DOCKER_HOST", "unix:///var/run/docker.sock")
+DOCKER_POOL_SIZE = _env_int("DOCKER_POOL_SIZE", 10)
+DOCKER_TIMEOUT = _env_int("DOCKER_TIMEOUT", 30)
+DOCKER_HEALTH_TTL = _env_float("DOCKER_HEALTH_TTL", 5.0)
+# Circuit breaker: consecutive failures that open it, cap of the re-probe backoff
+DOCKER_FAILURE_THRESHOLD = _env_int("DOCKER_FAILURE_THRESHOLD", 3)
+DOCKER_MAX_BACKOFF = _env_float("DOCKER_MAX_BACKOFF", 60.0)
+# TLS for tcp:// endpoints, as for the docker CLI: https:// and port 2376 always
+# use TLS, other tcp:// endpoints when DOCKER_TLS_VERIFY is set. ca.pem,
+# cert.pem and key.pem are read from DOCKER_CERT_PATH when present
+DOCKER_TLS_VERIFY = os.getenv("DOCKER_TLS_VERIFY", "") not in ("", "0")
+DOCKER_CERT_PATH = os.getenv("DOCKER_CERT_PATH", os.path.expanduser("~/.docker"))
+
+# Fleet mode: more Docker endpoints as comma separated name=url pairs, e.g.
+# "build=tcp://10.0.0.5:2375,edge=unix:///run/edge.sock" (unix, tcp, http and
+# https endpoints; ssh:// is not supported and fails at startup). The local
+# DOCKER_HOST is always part of the fleet as "local" unless listed by name
+DOCKER_HOSTS = os.getenv("DOCKER_HOSTS", "")
+# Deadline of one host's part of a fleet request; a host that misses it is
+# skipped (reported as partial) for that operation, an unreachable one for
+# every operation, for FLEET_RETRY_INTERVAL seconds. The stats sweep takes one
+# stats call per running container and has its own, longer deadline
+FLEET_HOST_TIMEOUT = _env_float("FLEET_HOST_TIMEOUT", 5.0)
+FLEET_STATS_TIMEOUT = _env_float("FLEET_STATS_TIMEOUT", 30.0)
+FLEET_RETRY_INTERVAL = _env_float("FLEET_RETRY_INTERVAL", 15.0)
+
+# Docker version check: the release feed (any URL answering like GitHub's
+# latest-release API) and how long each version is cached, in seconds
+VERSION_FEED_URL = os.getenv("VERSION_FEED_URL", "https://api.github.com/repos/docker/docker-ce/releases/latest")
+VERSION_FEED_TIMEOUT = _env_float("VERSION_FEED_TIMEOUT", 5.0)
+VERSION_LATEST_TTL = _env_float("VERSION_LATEST_TTL", 6 * 3600)
+VERSION_INSTALLED_TTL = _env_float("VERSION_INSTALLED_TTL", 300.0)
+# Wait after a failed check (longer when the feed's rate limit says so)
+VERSION_RETRY_INTERVAL = _env_float("VERSION_RETRY_INTERVAL", 300.0)
+
+# Container stats collection
+STATS_MAX_WORKERS = _env_int("STATS_MAX_WORKERS", 16)
+STATS_TIMEOUT = _env_float("STATS_TIMEOUT", 5.0)
+# Read memory/CPU counters from the local cgroup filesystem instead of the
+# stats API when the engine is local (falls back to the API per container)
+STATS_CGROUP = _env_int("STATS_CGROUP", 1) == 1
+STATS_CGROUP_ROOT = os.getenv("STATS_CGROUP_ROOT", "/sys/fs/cgroup")
+
+# Background stats sampler and in-memory history
+STATS_SAMPLE_INTERVAL = _env_float("STATS_SAMPLE_INTERVAL", 10.0)
+STATS_WINDOW = _env_int("STATS_WINDOW", 360)
+STATS_MAX_CONTAINERS = _env_int("STATS_MAX_CONTAINERS", 1000)
+# Rounds between rebuilds of the trend sums (0: never), which removes their
+# floating point drift and moves their time origin up to the oldest sample
+STATS_REFIT_ROUNDS = _env_int("STATS_REFIT_ROUNDS", 360)
+# Load the numpy/pandas prediction stack and start the sampler at startup
+# instead of on the first /pages/predictions request
+PREDICTION_PRELOAD = _env_int("PREDICTION_PRELOAD", 0) == 1
+
+# Persistent stats history (disabled unless a directory is set)
+STATS_STORE_PATH = os.getenv("STATS_STORE_PATH", "")
+STATS_STORE_ROLLUP_INTERVAL = _env_float("STATS_STORE_ROLLUP_INTERVAL", 60.0)
+# Seconds of history kept per resolution
+STATS_STORE_RETENTION_RAW = _env_float("STATS_STORE_RETENTION_RAW", 2 * 86400)
+STATS_STORE_RETENTION_1M = _env_float("STATS_STORE_RETENTION_1M", 14 * 86400)
+STATS_STORE_RETENTION_1H = _env_float("STATS_STORE_RETENTION_1H", 365 * 86400)
+
+# Memory usage forecasting
+FORECAST_STEPS = _env_int("FORECAST_STEPS", 6)
+FORECAST_CONFIDENCE = _env_float("FORECAST_CONFIDENCE", 0.95)
+
+# Memory leak and anomaly detection. Time constants are in seconds: the
+# slope windows, the smoothed reading and the baseline the z-score uses
+ANOMALY_SLOPE_WINDOWS = (300.0, 1800.0, 7200.0)
+ANOMALY_EWMA_WINDOW = _env_float("ANOMALY_EWMA_WINDOW", 60.0)
+ANOMALY_BASELINE_WINDOW = _env_float("ANOMALY_BASELINE_WINDOW", 3600.0)
+ANOMALY_Z_THRESHOLD = _env_float("ANOMALY_Z_THRESHOLD", 4.0)
+# Growth (MB/min) every slope window must exceed to flag a leak
+ANOMALY_LEAK_SLOPE = _env_float("ANOMALY_LEAK_SLOPE", 0.1)
+ANOMALY_MIN_SAMPLES = _env_int("ANOMALY_MIN_SAMPLES", 30)
+
+# Event-driven inventory cache
+INVENTORY_RESYNC_INTERVAL = _env_float("INVENTORY_RESYNC_INTERVAL", 300.0)
+
+# Container and image listings longer than this are streamed in chunks
+LISTING_CHUNK_SIZE = _env_int("LISTING_CHUNK_SIZE", 1000)
+
+# Responses larger than this are gzip (or, with the brotli package, brotli)
+# compressed for clients that accept it
+COMPRESSION_MIN_SIZE = _env_int("COMPRESSION_MIN_SIZE", 1024)
+COMPRESSION_GZIP_LEVEL = _env_int("COMPRESSION_GZIP_LEVEL", 6)
+COMPRESSION_BROTLI_QUALITY = _env_int("COMPRESSION_BROTLI_QUALITY", 4)
+# Rendered HTML pages kept, one per page and inventory version
+PAGE_CACHE_SIZE = _env_int("PAGE_CACHE_SIZE", 32)
+
+# Bulk container lifecycle operations
+BULK_MAX_PARALLELISM = _env_int("BULK_MAX_PARALLELISM", 8)
+
+# Background job queue for container operations
+JOB_MAX_CONCURRENCY = _env_int("JOB_MAX_CONCURRENCY", 8)
+# Finished jobs stay pollable this many seconds, up to JOB_MAX_HISTORY jobs
+JOB_RETENTION = _env_float("JOB_RETENTION", 3600.0)
+JOB_MAX_HISTORY = _env_int("JOB_MAX_HISTORY", 10000)
+
+# Container logs: longer lines are cut, so a connection's buffer stays bounded
+LOGS_MAX_LINE = _env_int("LOGS_MAX_LINE", 16 * 1024)
+
+# Live stats streaming
+STATS_STREAM_QUEUE_SIZE = _env_int("STATS_STREAM_QUEUE_SIZE", 16)
+
+# Cache shared by the uvicorn workers of one host (disabled unless a
+# directory is set, ideally on tmpfs such as /dev/shm/docker-dashboard)
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+SHARED_CACHE_INTERVAL = _env_float("SHARED_CACHE_INTERVAL", 0.5)
+
+# Access log
+ACCESS_LOG_PATH = os.getenv("ACCESS_LOG_PATH", "app.log")
+ACCESS_LOG_MAX_BYTES = _env_int("ACCESS_LOG_MAX_BYTES", 10 * 1024 * 1024)
+ACCESS_LOG_BACKUPS = _env_int("ACCESS_LOG_BACKUPS", 5)
+ACCESS_LOG_QUEUE_SIZE = _env_int("ACCESS_LOG_QUEUE_SIZE", 10000)
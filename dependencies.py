@@ -1,21 +1,112 @@
 # dependencies.py
+import sys
+from services.async_docker_client import AsyncDockerClient, get_async_engine
 from services.docker_client import DockerClient
-from services.prediction_manager import ContainerMemoryManager
+from services.docker_engine import get_engine
+from services.fleet import Fleet, get_fleet
+from services.inventory_cache import get_inventory_cache
+from services.job_scheduler import JobScheduler, get_job_scheduler
+from services.shared_cache import get_shared_cache
+from services.stats_broadcaster import StatsBroadcaster, get_stats_broadcaster
+from services.version_service import VersionService, get_version_service
 
 
 def get_docker_client():
     """
     Dependency that provides a Docker client instance.
     This function can be used with FastAPI's Depends to inject the Docker client
-    into route handlers.
+    into route handlers. The client is a thin wrapper around the shared,
+    app-lifespan managed Docker engine connection and inventory cache.
     """
-    return DockerClient()
+    return DockerClient(get_engine(), get_inventory_cache(), get_version_service())
+
+
+def get_async_docker_client():
+    """
+    Dependency that provides an async Docker client instance.
+    The client speaks HTTP over the Docker socket with pooled keep-alive
+    connections, so async route handlers never block a worker thread.
+    """
+    return AsyncDockerClient(get_async_engine(), get_inventory_cache())
+
+
+def get_docker_fleet() -> Fleet:
+    """
+    Dependency that provides the configured set of Docker hosts
+    (DOCKER_HOSTS plus the local engine), queried concurrently.
+    """
+    return get_fleet()
+
+
+def get_docker_versions() -> VersionService:
+    """
+    Dependency that provides the cached installed and latest Docker versions.
+    """
+    return get_version_service()
+
+
+def get_stats_stream_broadcaster() -> StatsBroadcaster:
+    """
+    Dependency that provides the shared live stats broadcaster.
+    """
+    return get_stats_broadcaster()
+
+
+def get_job_queue() -> JobScheduler:
+    """
+    Dependency that provides the shared background job scheduler.
+    """
+    return get_job_scheduler()
 
 
 def get_prediction_manager():
     """
     Dependency that provides an instance of the prediction manager.
     This function can be used with FastAPI's Depends to inject the prediction manager
-    into route handlers.
+    into route handlers. The manager is shared so its background sampler
+    history survives across requests.
+
+    The numpy/pandas prediction stack is imported on first use, so workers
+    that never serve predictions do not load it; its sampler starts then too,
+    in the shared cache's leader only.
+    """
+    from services.prediction_manager import get_memory_manager
+
+    manager = get_memory_manager()
+    shared = get_shared_cache()
+    if shared is None or shared.leader:
+        manager.start_sampling()
+    else:
+        # Followers get the leader's samples through the shared cache
+        shared.request_stats()
+        shared.tick()
+    return manager
+
+
+def close_prediction_manager():
+    """
+    Stop the prediction manager if the prediction stack was ever loaded.
+    """
+    module = sys.modules.get("services.prediction_manager")
+    if module is not None:
+        module.close_memory_manager()
+
+
+def get_stats_history_store():
+    """
+    Dependency that provides the on-disk stats store, or None when
+    STATS_STORE_PATH is not configured. Like the prediction stack, numpy is
+    only imported once it is first used.
+    """
+    from services.stats_store import get_stats_store
+
+    return get_stats_store()
+
+
+def close_stats_history_store():
+    """
+    Close the stats store if it was ever opened.
     """
-    return ContainerMemoryManager()
+    module = sys.modules.get("services.stats_store")
+    if module is not None:
+        module.close_stats_store()
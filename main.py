@@ -1,19 +1,80 @@
+from contextlib import asynccontextmanager
 import uvicorn
-from fastapi.responses import HTMLResponse
-from fastapi import FastAPI, Request, Depends
+from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi import FastAPI, Request, Response, Depends
 from fastapi.templating import Jinja2Templates
-from middlewares.loggingMiddleware import LoggingMiddleware
-from dependencies import get_docker_client, get_prediction_manager
-from routers import containers, images
+from middlewares.compressionMiddleware import CompressionMiddleware
+from middlewares.loggingMiddleware import LoggingMiddleware, close_access_log_writer
+from middlewares.metricsMiddleware import MetricsMiddleware
+import config
+from dependencies import (get_async_docker_client, get_prediction_manager, close_prediction_manager,
+                          close_stats_history_store)
+from models.exceptions import NoDataFoundException
+from routers import containers, fleet, images, jobs, predictions, version
+from services.docker_engine import get_engine, close_engine
+from services.async_docker_client import close_async_engine
+from services.fleet import close_fleet, get_fleet
+from services.stats_broadcaster import close_stats_broadcaster
+from services.inventory_cache import get_inventory_cache, close_inventory_cache
+from services.job_scheduler import close_job_scheduler
+from services.shared_cache import get_shared_cache, close_shared_cache
+from services.version_service import close_version_service
+from services.http_cache import PageCache, conditional, etag_matches, make_etag, not_modified
+from services.metrics import render_metrics
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the shared Docker engine connection and start its health monitor
+    and the inventory cache on startup; stop them on shutdown. The prediction
+    stack and its stats sampler start with the first prediction request
+    unless PREDICTION_PRELOAD is set or samples are persisted to a
+    STATS_STORE_PATH. With a SHARED_CACHE_PATH only the elected worker runs
+    these pollers.
+    """
+    if config.DOCKER_HOSTS:
+        # Fails startup on a DOCKER_HOSTS entry that cannot be used
+        get_fleet()
+    engine = get_engine()
+    engine.connect()
+    shared = get_shared_cache()
+    if shared is not None:
+        # Only the elected worker polls the daemon; the others mirror it
+        shared.start()
+    else:
+        engine.start_monitoring()
+        get_inventory_cache().start()
+    if config.PREDICTION_PRELOAD or config.STATS_STORE_PATH:
+        get_prediction_manager()
+    yield
+    await close_job_scheduler()
+    close_shared_cache()
+    close_version_service()
+    close_prediction_manager()
+    close_stats_history_store()
+    close_inventory_cache()
+    await close_stats_broadcaster()
+    await close_fleet()
+    await close_async_engine()
+    close_engine()
+    close_access_log_writer()
+
+
+app = FastAPI(lifespan=lifespan)
 templates = Jinja2Templates(directory="templates")
+page_cache = PageCache()
 
 app.include_router(containers.router)
 app.include_router(images.router)
+app.include_router(fleet.router)
+app.include_router(jobs.router)
+app.include_router(predictions.router)
+app.include_router(version.router)
 
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -21,31 +82,69 @@ def render_root(request: Request):
     """
     Root endpoint that returns a simple greeting message.
     """
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def render_prometheus_metrics():
+    """
+    Request, Docker API and cache metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+async def _render_listing_page(request: Request, docker_client, name: str, render) -> Response:
+    """
+    Render an inventory page at most once per inventory version and Docker
+    health state, and answer 304 to clients that already have it. Without a
+    fresh inventory the page is rendered and tagged with a hash of its body.
+    """
+    docker_ready = await docker_client.is_docker_online()
+    tag = docker_client.inventory_tag()
+    if_none_match = request.headers.get("if-none-match")
+    if tag is None:
+        return conditional(await render(docker_ready), if_none_match)
+
+    etag = make_etag(name, tag, docker_ready)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    body = page_cache.get(etag)
+    if body is None:
+        body = (await render(docker_ready)).body
+        page_cache.put(etag, body)
+    return HTMLResponse(body, headers={"ETag": etag})
 
 
 @app.get("/pages/images")
-def render_images(request: Request, docker_client=Depends(get_docker_client)):
+async def render_images(request: Request, docker_client=Depends(get_async_docker_client)):
     """
     Root endpoint that returns a list of images.
     """
-    return templates.TemplateResponse("images.html", {
-        "request": request,
-        "images": docker_client.list_images(),
-        "docker_ready": docker_client.is_docker_online()
-    })
+    async def render(docker_ready):
+        try:
+            images = await docker_client.list_images()
+        except NoDataFoundException:
+            images = []
+        return templates.TemplateResponse(request, "images.html", {
+            "images": images,
+            "docker_ready": docker_ready
+        })
+
+    return await _render_listing_page(request, docker_client, "images", render)
 
 
 @app.get("/pages/containers")
-def render_containers(request: Request, docker_client=Depends(get_docker_client)):
+async def render_containers(request: Request, docker_client=Depends(get_async_docker_client)):
     """
     Root endpoint that returns a list of containers.
     """
-    return templates.TemplateResponse("containers.html", {
-        "request": request,
-        "containers": docker_client.list_containers(),
-        "docker_ready": docker_client.is_docker_online()
-    })
+    async def render(docker_ready):
+        return templates.TemplateResponse(request, "containers.html", {
+            "containers": await docker_client.list_containers(),
+            "docker_ready": docker_ready
+        })
+
+    return await _render_listing_page(request, docker_client, "containers", render)
 
 
 @app.get("/pages/predictions", response_class=HTMLResponse)
@@ -55,14 +154,12 @@ def render_prediction(request: Request, client=Depends(get_prediction_manager)):
     """
     try:
         result = client.predict_memory_usage()
-        return templates.TemplateResponse("prediction.html", {
-            "request": request,
+        return templates.TemplateResponse(request, "prediction.html", {
             "result": result,      # Pydantic object
             "error": None          # No error
         })
     except Exception as e:
-        return templates.TemplateResponse("prediction.html", {
-            "request": request,
+        return templates.TemplateResponse(request, "prediction.html", {
             "result": None,
             "error": str(e)        # Pass error message to template
         })
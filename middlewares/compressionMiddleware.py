@@ -0,0 +1,128 @@
+import zlib
+from typing import Optional
+import config
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+# Streams that must reach the client as soon as each event is produced
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header, None for identity.
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    offered = (["br"] if brotli is not None else []) + ["gzip"]
+    wildcard = accepted.get("*", 0.0)
+    ranked = [(accepted.get(coding, wildcard), -rank, coding) for rank, coding in enumerate(offered)]
+    quality, _, coding = max(ranked)
+    return coding if quality > 0 else None
+
+
+class _Encoder:
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        if coding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            # wbits 31: gzip container
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        # Flush every chunk so a streamed body reaches the client as it is produced
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with gzip, or brotli
+    when the brotli package is installed and the client prefers it.
+
+    Bodies sent in one piece are compressed only from `minimum_size` bytes
+    on; streamed bodies are compressed chunk by chunk. Responses that are
+    already encoded and event streams are passed through.
+    """
+
+    def __init__(self, app, minimum_size: int = config.COMPRESSION_MIN_SIZE,
+                 gzip_level: int = config.COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = config.COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = next((value.decode("latin-1") for name, value in scope["headers"]
+                       if name == b"accept-encoding"), "")
+        coding = negotiate(accept) if accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = {name.lower() for name, _ in message.get("headers", [])}
+                content_type = next((value.decode("latin-1") for name, value in message.get("headers", [])
+                                     if name.lower() == b"content-type"), "")
+                passthrough = (b"content-encoding" in headers or message["status"] in (204, 304)
+                               or content_type.startswith(UNCOMPRESSED_TYPES))
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it is worth it
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body, more = message.get("body", b""), message.get("more_body", False)
+            if start is not None:
+                if not more and len(body) < self.minimum_size:
+                    await send(start)
+                    start = None
+                    passthrough = True
+                    await send(message)
+                    return
+                encoder = _Encoder(coding, self.gzip_level, self.brotli_quality)
+                payload = encoder.compress(body, final=not more)
+                headers = [(name, value) for name, value in start.get("headers", [])
+                           if name.lower() not in (b"content-length", b"vary")]
+                vary = [value for name, value in start.get("headers", []) if name.lower() == b"vary"]
+                headers.append((b"content-encoding", coding.encode()))
+                headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+                if not more:
+                    headers.append((b"content-length", str(len(payload)).encode()))
+                await send({**start, "headers": headers})
+                start = None
+                await send({"type": "http.response.body", "body": payload, "more_body": more})
+                return
+            await send({"type": "http.response.body", "body": encoder.compress(body, final=not more),
+                        "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
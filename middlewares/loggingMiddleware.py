@@ -1,30 +1,166 @@
 # middleware/logging.py
+import json
+import os
+import queue
+import threading
 import time
-import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-
-# Configure logging
-logging.basicConfig(
-    filename="app.log",  # Log file path
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-
-        log_data = {
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "duration_ms": round(process_time, 2),
-            "client_ip": request.client.host if request.client else "unknown",
-        }
-
-        logging.info(log_data)
-        return response
+from datetime import datetime, timezone
+from typing import Optional
+import config
+
+
+class AccessLogWriter:
+    """
+    Background thread that writes access log records as JSON lines.
+
+    Records are handed over through a bounded queue (`submit` never blocks;
+    records are dropped and counted when the queue is full), written in
+    batches and the file is rotated once it grows past `max_bytes`.
+    """
+
+    def __init__(self, path: str = config.ACCESS_LOG_PATH,
+                 max_bytes: int = config.ACCESS_LOG_MAX_BYTES,
+                 backup_count: int = config.ACCESS_LOG_BACKUPS,
+                 queue_size: int = config.ACCESS_LOG_QUEUE_SIZE,
+                 batch_size: int = 256, flush_interval: float = 0.5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+
+    def submit(self, record: dict):
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Flush the pending records and stop the writer thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except OSError as e:
+                print(f"[AccessLogWriter] Failed to write access log: {e}")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, batch: list[dict]):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(json.dumps(record) + "\n" for record in batch))
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+_writer: Optional[AccessLogWriter] = None
+
+
+def get_access_log_writer() -> AccessLogWriter:
+    """
+    Return the process-wide access log writer, creating it on first use.
+    """
+    global _writer
+    if _writer is None:
+        _writer = AccessLogWriter()
+    return _writer
+
+
+def close_access_log_writer():
+    """
+    Flush and stop the process-wide access log writer.
+    """
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+class LoggingMiddleware:
+    """
+    Pure ASGI access log middleware.
+
+    Responses (including streaming ones) pass through untouched; only the
+    status code is read from `http.response.start`. The record is queued for
+    the background writer once the response has finished, so the request
+    path never touches the file system.
+    """
+
+    def __init__(self, app, writer: Optional[AccessLogWriter] = None):
+        self.app = app
+        self.writer = writer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            process_time = (time.perf_counter() - start_time) * 1000
+            query = scope.get("query_string", b"").decode("latin-1")
+            client = scope.get("client")
+            log_data = {
+                "time": datetime.now(timezone.utc).isoformat(),
+                "method": scope["method"],
+                "url": scope["path"] + (f"?{query}" if query else ""),
+                "status_code": status_code,
+                "duration_ms": round(process_time, 2),
+                "client_ip": client[0] if client else "unknown",
+            }
+            (self.writer or get_access_log_writer()).submit(log_data)
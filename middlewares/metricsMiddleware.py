@@ -0,0 +1,62 @@
+import time
+from services.metrics import HTTP_REQUEST_ERRORS, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+
+# Route label of requests that matched no route, so unknown paths cannot
+# blow up the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency, error responses and the
+    number of requests in flight.
+
+    Requests are labelled by the matched route's path template
+    (`/api/containers/{container_id}/start`), never by the raw URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._in_flight = HTTP_REQUESTS_IN_FLIGHT.labels()
+        # method -> route template (-> status) -> series, looked up once each
+        self._latency: dict[str, dict[str, object]] = {}
+        self._errors: dict[str, dict[str, dict[int, object]]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self._in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            by_route = self._latency.get(method)
+            if by_route is None:
+                by_route = self._latency.setdefault(method, {})
+            latency = by_route.get(template)
+            if latency is None:
+                latency = by_route[template] = HTTP_REQUEST_SECONDS.labels(method, template)
+            latency.observe(time.perf_counter() - start_time)
+            if status_code >= 400:
+                self._error_series(method, template, status_code).inc()
+
+    def _error_series(self, method: str, template: str, status_code: int):
+        by_status = self._errors.setdefault(method, {}).setdefault(template, {})
+        series = by_status.get(status_code)
+        if series is None:
+            series = by_status[status_code] = HTTP_REQUEST_ERRORS.labels(method, template, str(status_code))
+        return series
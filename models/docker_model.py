@@ -1,10 +1,13 @@
-from typing import List
-from pydantic import BaseModel
+from enum import Enum
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
 
 class DockerContainer(BaseModel):
     id: str
     name: str
+    status: Optional[str] = None
+    labels: Dict[str, str] = {}
 
     def __str__(self):
         return f"DockerContainer(id={self.id}, name={self.name})"
@@ -13,6 +16,7 @@ class DockerContainer(BaseModel):
 class DockerImage(BaseModel):
     id: str
     name: str
+    labels: Dict[str, str] = {}
 
     def __str__(self):
         return f"DockerImage(id={self.id}, name={self.name})"
@@ -20,10 +24,173 @@ class DockerImage(BaseModel):
 
 class ContainerStats(BaseModel):
     name: str
+    memory_usage: Optional[float] = None
+    partial: bool = False
+
+
+class StatsPoint(BaseModel):
+    t: float
+    memory_usage: float
+    memory_max: float
+    cpu_percent: Optional[float] = None
+    samples: int
+
+
+class StatsRange(BaseModel):
+    container_id: str
+    resolution: str
+    step: Optional[float] = None
+    points: List[StatsPoint]
+
+
+class ContainerForecast(BaseModel):
+    id: str
+    name: str
+    samples: int
+    slope_mb_per_min: float
+    step_seconds: float
+    predicted: List[float]
+    lower: List[float]
+    upper: List[float]
+
+
+class ContainerAnomaly(BaseModel):
+    id: str
+    name: str
+    samples: int
     memory_usage: float
+    ewma: float
+    zscore: float
+    slopes_mb_per_min: Dict[str, float]
+    memory_limit: Optional[float] = None
+    time_to_limit_seconds: Optional[float] = None
+    leak: bool = False
+    spike: bool = False
 
 
 class PredictionResult(BaseModel):
     data: List[ContainerStats]
     predicted_next: float
     summary: str
+    forecasts: List[ContainerForecast] = []
+    anomalies: List[ContainerAnomaly] = []
+
+
+class BulkAction(str, Enum):
+    start = "start"
+    stop = "stop"
+    restart = "restart"
+
+
+class BulkActionRequest(BaseModel):
+    ids: List[str] = Field(min_length=1)
+    action: BulkAction
+    parallelism: Optional[int] = Field(None, ge=1)
+    # Container id -> ids it depends on. Dependencies are started first and stopped last.
+    depends_on: Dict[str, List[str]] = {}
+    timeout: Optional[int] = Field(None, ge=0)
+
+
+class BulkItemResult(BaseModel):
+    status: str
+    detail: Optional[str] = None
+    duration_ms: float = 0.0
+    job_id: Optional[str] = None
+
+
+class BulkActionResult(BaseModel):
+    action: BulkAction
+    succeeded: int
+    failed: int
+    skipped: int
+    duration_ms: float
+    results: Dict[str, BulkItemResult]
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    not_found = "not_found"
+
+
+class Job(BaseModel):
+    id: str
+    action: str
+    target: str
+    status: JobStatus = JobStatus.queued
+    detail: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration_ms: Optional[float] = None
+
+
+class VersionStatus(BaseModel):
+    installed: Optional[str] = None
+    latest: Optional[str] = None
+    up_to_date: Optional[bool] = None
+    installed_checked_at: Optional[float] = None
+    latest_checked_at: Optional[float] = None
+
+
+class HostState(str, Enum):
+    ok = "ok"
+    timeout = "timeout"
+    unavailable = "unavailable"
+    error = "error"
+
+
+class FleetHostStatus(BaseModel):
+    host: str
+    state: HostState
+    detail: Optional[str] = None
+    duration_ms: float = 0.0
+
+
+class FleetContainer(DockerContainer):
+    host: str
+
+
+class FleetImage(DockerImage):
+    host: str
+
+
+class FleetContainerStats(BaseModel):
+    host: str
+    id: str
+    name: str
+    cpu_percent: float
+    memory_usage: float
+    memory_limit: float
+
+
+class FleetVersion(BaseModel):
+    host: str
+    version: str
+    api_version: Optional[str] = None
+
+
+class FleetContainers(BaseModel):
+    items: List[FleetContainer]
+    hosts: List[FleetHostStatus]
+    partial: bool
+
+
+class FleetImages(BaseModel):
+    items: List[FleetImage]
+    hosts: List[FleetHostStatus]
+    partial: bool
+
+
+class FleetStats(BaseModel):
+    items: List[FleetContainerStats]
+    hosts: List[FleetHostStatus]
+    partial: bool
+
+
+class FleetVersions(BaseModel):
+    items: List[FleetVersion]
+    hosts: List[FleetHostStatus]
+    partial: bool
@@ -1,2 +1,15 @@
 class NoDataFoundException(Exception):
     pass
+
+
+class DockerUnavailableError(ConnectionError):
+    """
+    Raised instead of calling the daemon while the health circuit is open.
+    """
+
+
+class DockerEngineError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Docker engine returned {status_code}: {message}")
+        self.status_code = status_code
+        self.message = message
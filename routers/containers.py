@@ -1,9 +1,22 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from services.docker_client import DockerClient
-from models.docker_model import DockerContainer
-from dependencies import get_docker_client
-from models.exceptions import NoDataFoundException
+import asyncio
+import json
+import math
+import time
+from contextlib import aclosing
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from services.async_docker_client import AsyncDockerClient
+from services.bulk_operations import run_bulk_action
+from services.job_scheduler import JobScheduler
+from services.http_cache import conditional, etag_matches, make_etag, not_modified
+from services.listing import ListingQuery, listing_response, parse_fields
+from services.log_stream import ClosingStreamingResponse, line_matcher, parse_log_time
+from services.stats_broadcaster import END_OF_STREAM, StatsBroadcaster
+from models.docker_model import BulkActionRequest, BulkActionResult, DockerContainer, Job, StatsRange
+from dependencies import (get_async_docker_client, get_job_queue, get_stats_history_store,
+                          get_stats_stream_broadcaster)
+from models.exceptions import DockerEngineError, DockerUnavailableError, NoDataFoundException
 
 router = APIRouter(
     prefix="/api/containers",      # Všechny cesty budou začínat /items
@@ -12,13 +25,39 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[DockerContainer], status_code=status.HTTP_200_OK)
-def read_items(client: DockerClient = Depends(get_docker_client)):
+async def read_items(request: Request,
+                     limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size"),
+                     cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+                     name: Optional[str] = Query(None, description="Substring of the container name"),
+                     label: List[str] = Query([], description="Label key or key=value, repeatable"),
+                     state: Optional[str] = Query(None, alias="status", description="Container state, e.g. running"),
+                     fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+                     client: AsyncDockerClient = Depends(get_async_docker_client)):
+    # The cached inventory's tag changes with every change to it: a client
+    # that has the current version gets a 304 without any listing work
+    tag = client.inventory_tag()
+    etag = make_etag("containers", tag, request.url.query) if tag else None
+    if_none_match = request.headers.get("if-none-match")
+    if etag is not None and etag_matches(if_none_match, etag):
+        return not_modified(etag)
     try:
-        return client.list_containers()
+        projection = parse_fields(fields, DockerContainer)
+        query = ListingQuery(limit=limit, cursor=cursor, name=name, labels=label, status=state)
+        page = await client.query_containers(query)
+        headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+        # The response model only documents the schema: rows come from the
+        # daemon and are encoded as they are, without a second validation
+        return conditional(listing_response(page.items, projection, headers), if_none_match, etag)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except NoDataFoundException as e:
         print("Actually, no Docker containers found.")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except DockerUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
     except Exception as e:
         print(
             f"An unexpected error occurred while listing containers: {str(e)}")
@@ -26,33 +65,174 @@ def read_items(client: DockerClient = Depends(get_docker_client)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from e
 
 
-@router.post("/{container_id}/start", status_code=status.HTTP_201_CREATED)
-def start(container_id: str, client: DockerClient = Depends(get_docker_client)):
+@router.post("/bulk", response_model=BulkActionResult, status_code=status.HTTP_200_OK)
+async def bulk(request: BulkActionRequest, client: AsyncDockerClient = Depends(get_async_docker_client),
+               jobs: JobScheduler = Depends(get_job_queue)):
+    """
+    Start, stop or restart many containers concurrently, as jobs of the job
+    queue. Failures are reported per container instead of failing the whole batch.
+    """
     try:
-        client.start_container(container_id)
-        return {"message": f"Container '{container_id}' started successfully."}
+        return await run_bulk_action(client, request, jobs)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+
+@router.post("/{container_id}/start", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def start(container_id: str, response: Response,
+                client: AsyncDockerClient = Depends(get_async_docker_client),
+                jobs: JobScheduler = Depends(get_job_queue)):
+    """
+    Queue a container start and return its job; poll it at the Location URL.
+    """
+    job = jobs.submit("start", container_id, lambda: client.start_container(container_id))
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
+
+
+@router.post("/{container_id}/stop", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+async def stop(container_id: str, response: Response,
+               client: AsyncDockerClient = Depends(get_async_docker_client),
+               jobs: JobScheduler = Depends(get_job_queue)):
+    """
+    Queue a container stop and return its job; poll it at the Location URL.
+    The stop itself can take the container's whole grace period.
+    """
+    job = jobs.submit("stop", container_id, lambda: client.stop_container(container_id))
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
 
+
+@router.get("/{container_id}/stats/stream")
+async def stream_stats(container_id: str,
+                       client: AsyncDockerClient = Depends(get_async_docker_client),
+                       broadcaster: StatsBroadcaster = Depends(get_stats_stream_broadcaster)):
+    """
+    Stream live CPU, memory and network samples of a container as server-sent events.
+    All viewers of a container share a single upstream stats stream.
+    """
+    try:
+        container = await client.inspect_container(container_id)
     except NoDataFoundException as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
-        ) from e
-
+            status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except DockerUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Internal server error"
-        ) from e
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from e
+
+    async def events():
+        async with broadcaster.subscribe(container["Id"]) as queue:
+            while (sample := await queue.get()) is not END_OF_STREAM:
+                yield f"data: {json.dumps(sample)}\n\n"
 
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
 
-@router.post("/{container_id}/stop", status_code=201)
-def stop(container_id: str, client: DockerClient = Depends(get_docker_client)):
+
+@router.get("/{container_id}/logs", response_class=ClosingStreamingResponse)
+async def logs(container_id: str,
+               follow: bool = Query(False, description="Keep streaming new lines"),
+               since: Optional[str] = Query(None, description="Unix seconds or a duration such as 15m"),
+               until: Optional[str] = Query(None, description="Unix seconds or a duration such as 15m"),
+               tail: Optional[int] = Query(None, ge=0, description="Only the last N lines"),
+               stdout: bool = Query(True),
+               stderr: bool = Query(True),
+               timestamps: bool = Query(False, description="Prefix lines with the engine's timestamp"),
+               grep: Optional[str] = Query(None, description="Only lines containing this text"),
+               regex: Optional[str] = Query(None, description="Only lines matching this regular expression"),
+               ignore_case: bool = Query(False),
+               client: AsyncDockerClient = Depends(get_async_docker_client)):
+    """
+    Stream a container's logs as plain text, filtered on the server while
+    streaming. Lines are read from the engine only as fast as the client
+    takes them, and a client going away closes the engine's stream.
+    """
+    try:
+        matches = line_matcher(grep, regex, ignore_case)
+        since_time, until_time = parse_log_time(since), parse_log_time(until)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     try:
-        client.stop_container(container_id)
-        return {"message": f"Container '{container_id}' stoped successfully."}
+        await client.inspect_container(container_id)
     except NoDataFoundException as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except DockerUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from e
+
+    async def lines():
+        batches = client.container_logs(container_id, follow=follow, since=since_time, until=until_time,
+                                        tail=tail, stdout=stdout, stderr=stderr, timestamps=timestamps)
+        async with aclosing(batches):
+            try:
+                async for batch in batches:
+                    kept = [line for _, line in batch if matches is None or matches(line)]
+                    if kept:
+                        yield b"\n".join(kept) + b"\n"
+            except (NoDataFoundException, DockerEngineError, DockerUnavailableError, OSError) as e:
+                # The headers are gone already, the stream just ends
+                print(f"Log stream of {container_id} ended: {e}")
+
+    return ClosingStreamingResponse(lines(), media_type="text/plain; charset=utf-8",
+                                    headers={"Cache-Control": "no-cache"})
+
+
+def _stats_range(store, container_id: str, start: float, end: float, step: Optional[float]) -> dict:
+    resolution, records = store.query(container_id, start, end, step)
+    cpu = records["cpu"].tolist()
+    points = [
+        {"t": t, "memory_usage": memory, "memory_max": memory_max,
+         "cpu_percent": None if math.isnan(cpu[i]) else cpu[i], "samples": samples}
+        for i, (t, memory, memory_max, samples) in enumerate(zip(
+            records["t"].tolist(), records["memory"].tolist(),
+            records["memory_max"].tolist(), records["samples"].tolist()))
+    ]
+    return {"container_id": container_id, "resolution": resolution, "step": step, "points": points}
+
+
+@router.get("/{container_id}/stats", response_model=StatsRange)
+async def stats_history(container_id: str,
+                        start: Optional[float] = Query(None, alias="from", description="Unix seconds, default an hour before `to`"),
+                        end: Optional[float] = Query(None, alias="to", description="Unix seconds, default now"),
+                        step: Optional[float] = Query(None, gt=0, description="Bucket width in seconds"),
+                        client: AsyncDockerClient = Depends(get_async_docker_client),
+                        store=Depends(get_stats_history_store)):
+    """
+    Recorded memory and CPU history of a container, served from the on-disk
+    stats store. Without a step the finest resolution that covers the range
+    is returned; removed containers can still be queried by full id.
+    """
+    if store is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Stats history is not enabled.")
+    end = time.time() if end is None else end
+    start = end - 3600 if start is None else start
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must be before 'to'.")
+
+    if not store.has(container_id):
+        # Names and short ids resolve through the engine
+        try:
+            container_id = (await client.inspect_container(container_id))["Id"]
+        except NoDataFoundException as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+        except DockerUnavailableError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error") from e
+
+    # Page faults on the mapped files should not stall the event loop
+    return await asyncio.to_thread(_stats_range, store, container_id, start, end, step)
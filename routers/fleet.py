@@ -0,0 +1,60 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from services.fleet import Fleet
+from services.listing import ListingQuery
+from models.docker_model import FleetContainers, FleetImages, FleetStats, FleetVersions, HostState
+from dependencies import get_docker_fleet
+
+router = APIRouter(
+    prefix="/api/fleet",
+    tags=["fleet"]
+)
+
+
+def _check_answered(result):
+    # Partial results are fine; no host at all is not
+    if result.hosts and not any(host.state == HostState.ok for host in result.hosts):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="No Docker host answered.")
+    return result
+
+
+@router.get("/containers", response_model=FleetContainers, status_code=status.HTTP_200_OK)
+async def read_containers(name: Optional[str] = Query(None, description="Substring of the container name"),
+                          label: List[str] = Query([], description="Label key or key=value, repeatable"),
+                          state: Optional[str] = Query(None, alias="status", description="Container state, e.g. running"),
+                          fleet: Fleet = Depends(get_docker_fleet)):
+    """
+    Containers of every Docker host, tagged by host. Hosts that are slow or
+    offline are listed in `hosts` and make the result `partial`.
+    """
+    query = ListingQuery(name=name, labels=label, status=state)
+    return _check_answered(await fleet.containers(query))
+
+
+@router.get("/images", response_model=FleetImages, status_code=status.HTTP_200_OK)
+async def read_images(name: Optional[str] = Query(None, description="Substring of the image tag"),
+                      label: List[str] = Query([], description="Label key or key=value, repeatable"),
+                      dangling: Optional[bool] = Query(None, description="Only untagged (true) or tagged (false) images"),
+                      fleet: Fleet = Depends(get_docker_fleet)):
+    """
+    Images of every Docker host, tagged by host.
+    """
+    query = ListingQuery(name=name, labels=label, dangling=dangling)
+    return _check_answered(await fleet.images(query))
+
+
+@router.get("/stats", response_model=FleetStats, status_code=status.HTTP_200_OK)
+async def read_stats(fleet: Fleet = Depends(get_docker_fleet)):
+    """
+    One CPU and memory sample of every running container on every host.
+    """
+    return _check_answered(await fleet.stats())
+
+
+@router.get("/version", response_model=FleetVersions, status_code=status.HTTP_200_OK)
+async def read_versions(fleet: Fleet = Depends(get_docker_fleet)):
+    """
+    Docker engine version of every host.
+    """
+    return _check_answered(await fleet.versions())
@@ -1,9 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from services.docker_client import DockerClient
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from services.async_docker_client import AsyncDockerClient
+from services.http_cache import conditional, etag_matches, make_etag, not_modified
+from services.listing import ListingQuery, listing_response, parse_fields
 from models.docker_model import DockerImage
-from dependencies import get_docker_client
-from models.exceptions import NoDataFoundException
+from dependencies import get_async_docker_client
+from models.exceptions import DockerUnavailableError, NoDataFoundException
 
 router = APIRouter(
     prefix="/api/images",      # Všechny cesty budou začínat /items
@@ -12,13 +14,41 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[DockerImage], status_code=status.HTTP_200_OK)
-def read_items(client: DockerClient = Depends(get_docker_client)):
+async def read_items(request: Request,
+                     limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size"),
+                     cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+                     name: Optional[str] = Query(None, description="Substring of the image tag"),
+                     label: List[str] = Query([], description="Label key or key=value, repeatable"),
+                     dangling: Optional[bool] = Query(None, description="Only untagged (true) or tagged (false) images"),
+                     fields: Optional[str] = Query(None, description="Comma separated fields to return"),
+                     client: AsyncDockerClient = Depends(get_async_docker_client)):
+    # The cached inventory's tag changes with every change to it: a client
+    # that has the current version gets a 304 without any listing work
+    tag = client.inventory_tag()
+    etag = make_etag("images", tag, request.url.query) if tag else None
+    if_none_match = request.headers.get("if-none-match")
+    if etag is not None and etag_matches(if_none_match, etag):
+        return not_modified(etag)
     try:
-        return client.list_images()
+        projection = parse_fields(fields, DockerImage)
+        query = ListingQuery(limit=limit, cursor=cursor, name=name, labels=label, dangling=dangling)
+        page = await client.query_images(query)
+        if not page.items and query == ListingQuery(limit=limit):
+            raise NoDataFoundException("No Docker images found.")
+        headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+        # The response model only documents the schema: rows come from the
+        # daemon and are encoded as they are, without a second validation
+        return conditional(listing_response(page.items, projection, headers), if_none_match, etag)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     except NoDataFoundException as e:
         print("Actually, no Docker images found.")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=str(e)) from e
+    except DockerUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
     except Exception as e:
         print(
             f"An unexpected error occurred while listing images: {str(e)}")
@@ -27,5 +57,5 @@ def read_items(client: DockerClient = Depends(get_docker_client)):
 
 
 @router.get("/{item_id}")
-def read_item(item_id: int):
+async def read_item(item_id: int):
     return {"item_id": item_id}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from models.docker_model import Job
+from dependencies import get_job_queue
+from services.job_scheduler import JobScheduler
+
+router = APIRouter(
+    prefix="/api/jobs",
+    tags=["jobs"]
+)
+
+
+@router.get("/{job_id}", response_model=Job, status_code=status.HTTP_200_OK)
+async def read_job(job_id: str, jobs: JobScheduler = Depends(get_job_queue)):
+    """
+    Status and outcome of a queued container operation.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Job '{job_id}' not found.")
+    return job
@@ -0,0 +1,19 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, status
+from models.docker_model import ContainerAnomaly
+from dependencies import get_prediction_manager
+
+router = APIRouter(
+    prefix="/api/predictions",
+    tags=["predictions"]
+)
+
+
+@router.get("/anomalies", response_model=List[ContainerAnomaly], status_code=status.HTTP_200_OK)
+def read_anomalies(flagged: bool = Query(False, description="Only containers flagged as leaking or spiking"),
+                   manager=Depends(get_prediction_manager)):
+    """
+    Memory leak and spike state of every sampled container, flagged
+    containers first, then by projected time to their memory limit.
+    """
+    return manager.anomalies(flagged_only=flagged)
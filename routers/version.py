@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, status
+from models.docker_model import VersionStatus
+from dependencies import get_docker_versions
+from services.version_service import VersionService
+
+router = APIRouter(
+    prefix="/api/version",
+    tags=["version"]
+)
+
+
+@router.get("/", response_model=VersionStatus, status_code=status.HTTP_200_OK)
+async def read_version(versions: VersionService = Depends(get_docker_versions)):
+    """
+    Installed and latest Docker version from the cache. Stale values are
+    refreshed in the background; unknown ones are null until then.
+    """
+    return versions.status()
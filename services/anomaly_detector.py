@@ -0,0 +1,188 @@
+import threading
+from typing import Iterable, Optional
+import numpy as np
+import config
+from models.docker_model import ContainerAnomaly
+
+# Exponentially weighted regression sums, one row per slope window
+SUMS = ("w", "wt", "wy", "wtt", "wty")
+
+
+def _label(seconds: float) -> str:
+    if seconds >= 3600 and seconds % 3600 == 0:
+        return f"{seconds / 3600:.0f}h"
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds:g}s"
+
+
+class AnomalyDetector:
+    """
+    Streaming memory leak and spike detector over all containers.
+
+    Every container has a slot (the same one it has in `StatsHistory`) in a
+    set of flat arrays. Each sampling tick updates all slots in one
+    vectorized pass, O(1) per container and without looking at older
+    samples:
+
+    - a slope per window in `slope_windows`, from an exponentially weighted
+      least-squares fit whose sums decay with that window's time constant;
+    - an EWMA of the reading (`ewma_window`);
+    - an exponentially weighted baseline mean and variance
+      (`baseline_window`), against which each new reading gets a z-score.
+
+    A container is a leak when every window's slope exceeds `leak_slope`
+    (MB/min), and a spike when its z-score exceeds `z_threshold`; both need
+    `min_samples` samples first. With a memory limit and a rising trend the
+    time until the limit is projected from the longest window's slope.
+    """
+
+    def __init__(self, slope_windows: Iterable[float] = config.ANOMALY_SLOPE_WINDOWS,
+                 ewma_window: float = config.ANOMALY_EWMA_WINDOW,
+                 baseline_window: float = config.ANOMALY_BASELINE_WINDOW,
+                 z_threshold: float = config.ANOMALY_Z_THRESHOLD,
+                 leak_slope: float = config.ANOMALY_LEAK_SLOPE,
+                 min_samples: int = config.ANOMALY_MIN_SAMPLES,
+                 capacity: int = 0):
+        self.slope_windows = np.asarray(tuple(slope_windows), dtype=np.float64)
+        self.labels = [_label(window) for window in self.slope_windows]
+        self.ewma_window = ewma_window
+        self.baseline_window = baseline_window
+        self.z_threshold = z_threshold
+        self.leak_slope = leak_slope / 60.0
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self.capacity = 0
+        self.owners: list[Optional[str]] = []
+        self.n = np.zeros(0, dtype=np.int64)
+        for name in ("origin", "last_t", "last_y", "ewma", "mean", "var", "zscore", "limit"):
+            setattr(self, name, np.zeros(0))
+        for name in SUMS:
+            setattr(self, name, np.zeros((len(self.slope_windows), 0)))
+        self.resize(capacity)
+
+    def resize(self, capacity: int):
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        self.owners.extend([None] * extra)
+        self.n = np.concatenate([self.n, np.zeros(extra, dtype=np.int64)])
+        for name in ("origin", "last_t", "last_y", "ewma", "mean", "var", "zscore"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra)]))
+        self.limit = np.concatenate([self.limit, np.full(extra, np.nan)])
+        for name in SUMS:
+            rows = getattr(self, name)
+            setattr(self, name, np.hstack([rows, np.zeros((rows.shape[0], extra))]))
+        self.capacity = capacity
+
+    def update(self, container_ids: list[str], slots: np.ndarray, t: float,
+               values: np.ndarray, limits: Optional[np.ndarray] = None):
+        """
+        Add one reading (MB) per container taken at time `t`. `slots` are
+        the containers' history slots; a slot that changed owner starts over.
+        `limits` are memory limits in MB, NaN when unknown.
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(slots):
+            return
+        with self._lock:
+            self.resize(int(slots.max()) + 1)
+            fresh = np.fromiter((self.owners[slot] != container_id
+                                 for slot, container_id in zip(slots, container_ids)),
+                                dtype=bool, count=len(slots))
+            if fresh.any():
+                new = slots[fresh]
+                for slot, container_id in zip(new, np.asarray(container_ids, dtype=object)[fresh]):
+                    self.owners[slot] = container_id
+                self.n[new] = 0
+                self.origin[new] = t
+                self.last_t[new] = t
+                self.ewma[new] = self.mean[new] = values[fresh]
+                self.var[new] = 0.0
+                for name in SUMS:
+                    getattr(self, name)[:, new] = 0.0
+
+            dt = np.maximum(t - self.last_t[slots], 0.0)
+            # z-score against the baseline before this reading moves it. The
+            # variance starts at zero, so scale it up by the weight it has
+            # accumulated so far (like a bias-corrected EWMA)
+            weight = -np.expm1(-(self.last_t[slots] - self.origin[slots]) / self.baseline_window)
+            std = np.sqrt(self.var[slots] / np.maximum(weight, 1e-12))
+            deviation = values - self.mean[slots]
+            self.zscore[slots] = np.where(std > 1e-9, deviation / np.where(std > 1e-9, std, 1.0), 0.0)
+
+            alpha = -np.expm1(-dt / self.baseline_window)
+            self.mean[slots] += alpha * deviation
+            self.var[slots] = (1 - alpha) * (self.var[slots] + alpha * deviation ** 2)
+            self.ewma[slots] += -np.expm1(-dt / self.ewma_window) * (values - self.ewma[slots])
+
+            decay = np.exp(-dt[None, :] / self.slope_windows[:, None])
+            elapsed = t - self.origin[slots]
+            self.w[:, slots] = self.w[:, slots] * decay + 1.0
+            self.wt[:, slots] = self.wt[:, slots] * decay + elapsed
+            self.wy[:, slots] = self.wy[:, slots] * decay + values
+            self.wtt[:, slots] = self.wtt[:, slots] * decay + elapsed ** 2
+            self.wty[:, slots] = self.wty[:, slots] * decay + elapsed * values
+
+            self.n[slots] += 1
+            self.last_t[slots] = t
+            self.last_y[slots] = values
+            if limits is not None:
+                self.limit[slots] = limits
+
+    def slopes(self, slots: np.ndarray) -> np.ndarray:
+        """
+        Slope (MB/s) of every window for `slots`, shape (windows, slots).
+        """
+        w, wt, wy = self.w[:, slots], self.wt[:, slots], self.wy[:, slots]
+        denominator = w * self.wtt[:, slots] - wt ** 2
+        valid = denominator > 1e-9 * np.maximum(w * self.wtt[:, slots], 1.0)
+        numerator = w * self.wty[:, slots] - wt * wy
+        return np.where(valid, numerator / np.where(valid, denominator, 1.0), 0.0)
+
+    def evaluate(self, container_ids: list[str], names: list[str],
+                 slots: np.ndarray) -> list[ContainerAnomaly]:
+        """
+        Current state of the given containers. Slots without readings of
+        that container are skipped.
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        with self._lock:
+            known = np.fromiter((slot < self.capacity and self.owners[slot] == container_id
+                                 for slot, container_id in zip(slots, container_ids)),
+                                dtype=bool, count=len(slots))
+            index = np.flatnonzero(known)
+            slots = slots[index]
+            if not len(slots):
+                return []
+            slopes = self.slopes(slots)
+            n, ewma, zscore, limit = self.n[slots], self.ewma[slots], self.zscore[slots], self.limit[slots]
+            last_y = self.last_y[slots]
+
+        ready = n >= self.min_samples
+        leak = ready & (slopes > self.leak_slope).all(axis=0)
+        spike = ready & (np.abs(zscore) >= self.z_threshold)
+        rising = slopes[-1] > 0
+        has_limit = ~np.isnan(limit) & (limit > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            to_limit = np.where(rising & has_limit,
+                                np.maximum(limit - ewma, 0.0) / np.where(rising, slopes[-1], 1.0), np.nan)
+
+        per_minute = (slopes * 60).T.tolist()
+        return [
+            ContainerAnomaly(
+                id=container_ids[i],
+                name=names[i],
+                memory_usage=float(last_y[k]),
+                ewma=float(ewma[k]),
+                zscore=float(zscore[k]),
+                slopes_mb_per_min=dict(zip(self.labels, per_minute[k])),
+                memory_limit=None if not has_limit[k] else float(limit[k]),
+                time_to_limit_seconds=None if np.isnan(to_limit[k]) else float(to_limit[k]),
+                samples=int(n[k]),
+                leak=bool(leak[k]),
+                spike=bool(spike[k]),
+            )
+            for k, i in enumerate(index)
+        ]
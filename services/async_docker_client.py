@@ -0,0 +1,532 @@
+import asyncio
+import json
+import os
+import ssl
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from urllib.parse import urlencode, urlsplit
+import config
+from models.docker_model import DockerContainer, DockerImage
+from models.exceptions import DockerEngineError, DockerUnavailableError, NoDataFoundException
+from services.health_monitor import HealthMonitor
+from services.docker_engine import get_engine
+from services.inventory_cache import InventoryCache
+from services.listing import ListingIndex, ListingPage, ListingQuery
+from services.log_stream import FrameDemuxer, LineSplitter, STDOUT, is_multiplexed
+from services.metrics import docker_call, record_cache_lookup
+from services.single_flight import AsyncSingleFlight
+
+
+UNIX_SCHEMES = ("unix", "http+unix")
+# Requests resent on a fresh connection when a reused one fails after sending
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+TCP_SCHEMES = ("tcp", "http", "https")
+
+
+def tls_context(cert_path: str = config.DOCKER_CERT_PATH) -> ssl.SSLContext:
+    """
+    Verifying TLS context for a Docker endpoint: the CA from `cert_path`
+    (ca.pem) or the system's, and the client certificate (cert.pem,
+    key.pem) when there is one.
+    """
+    ca = os.path.join(cert_path, "ca.pem")
+    context = ssl.create_default_context(cafile=ca if os.path.exists(ca) else None)
+    cert, key = os.path.join(cert_path, "cert.pem"), os.path.join(cert_path, "key.pem")
+    if os.path.exists(cert) and os.path.exists(key):
+        context.load_cert_chain(cert, key)
+    return context
+
+
+class _Connection:
+    """
+    One HTTP/1.1 connection to the engine socket.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    async def send(self, method: str, target: str, body: Optional[bytes]):
+        lines = [f"{method} {target} HTTP/1.1", "Host: docker", "User-Agent: doccker-client"]
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        elif method in ("POST", "PUT"):
+            lines.append("Content-Length: 0")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self.writer.drain()
+
+    async def read_head(self) -> tuple[int, dict[str, str]]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Docker engine closed the connection.")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("connection", "").lower() == "close":
+            self.reusable = False
+        return status, headers
+
+    async def iter_body(self, headers: dict[str, str], status: int = 200,
+                        method: str = "GET") -> AsyncIterator[bytes]:
+        """
+        Yield the response body as it arrives (content-length, chunked or until EOF).
+        """
+        if method == "HEAD" or status < 200 or status in (204, 304):
+            # No body, whatever the headers say; the engine sends no length for these
+            return
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await self.reader.readline()
+                if not size_line:
+                    raise ConnectionResetError("Docker engine closed the stream.")
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip the trailer section
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                # A large chunk is passed on in pieces, never buffered whole
+                while size > 0:
+                    piece = await self.reader.readexactly(min(size, 65536))
+                    size -= len(piece)
+                    yield piece
+                await self.reader.readexactly(2)
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                chunk = await self.reader.read(min(remaining, 65536))
+                if not chunk:
+                    raise ConnectionResetError("Docker engine closed the stream.")
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            self.reusable = False
+            while chunk := await self.reader.read(65536):
+                yield chunk
+
+    async def read_body(self, headers: dict[str, str], status: int = 200, method: str = "GET") -> bytes:
+        return b"".join([chunk async for chunk in self.iter_body(headers, status, method)])
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+
+class AsyncDockerEngine:
+    """
+    Minimal asyncio HTTP client for the Docker engine API.
+
+    Requests are sent over the engine's unix socket (or a tcp:// endpoint,
+    with TLS as configured) and connections are kept alive and reused. At most `pool_size`
+    requests are in flight at once; streaming requests use a dedicated
+    connection so a long-lived stream never starves the pool. Concurrent
+    identical GETs share one round trip through `flights`.
+
+    With a `health` circuit breaker (the blocking engine's, in the app) the
+    health state is read from it, requests fail fast with
+    DockerUnavailableError while it is open and connection failures are
+    reported to it.
+    """
+
+    def __init__(self, base_url: str = config.DOCKER_HOST,
+                 pool_size: int = config.DOCKER_POOL_SIZE,
+                 timeout: float = config.DOCKER_TIMEOUT,
+                 health_ttl: float = config.DOCKER_HEALTH_TTL,
+                 health: Optional[HealthMonitor] = None):
+        url = urlsplit(base_url)
+        if url.scheme not in UNIX_SCHEMES + TCP_SCHEMES:
+            raise ValueError(f"Unsupported Docker host '{base_url}': use unix://, tcp://, http:// or https://.")
+        self.base_url = base_url
+        self.socket_path = url.path if url.scheme in UNIX_SCHEMES else None
+        self.tls = url.scheme == "https" or (url.scheme == "tcp" and (url.port == 2376 or config.DOCKER_TLS_VERIFY))
+        self.host, self.port = url.hostname, url.port or (2376 if self.tls else 2375)
+        self._ssl: Optional[ssl.SSLContext] = None
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.health_ttl = health_ttl
+        self.health = health
+        self.flights = AsyncSingleFlight()
+        self._idle: list[_Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._online = False
+        self._checked_at = 0.0
+
+    async def _open(self) -> _Connection:
+        if self.socket_path is not None:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        else:
+            if self.tls and self._ssl is None:
+                self._ssl = tls_context()
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self._ssl if self.tls else None)
+        return _Connection(reader, writer)
+
+    def _target(self, path: str, params: Optional[dict]) -> str:
+        if not params:
+            return path
+        query = {key: (json.dumps(value) if isinstance(value, dict) else
+                       str(value).lower() if isinstance(value, bool) else value)
+                 for key, value in params.items() if value is not None}
+        return f"{path}?{urlencode(query)}"
+
+    async def request(self, method: str, path: str, params: Optional[dict] = None,
+                      body: Optional[dict] = None, timeout: Optional[float] = None):
+        """
+        Send one request over a pooled keep-alive connection.
+        Returns (status, headers, body bytes).
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        self._check_circuit()
+        target = self._target(path, params)
+        payload = json.dumps(body).encode() if body is not None else None
+
+        async with self._slots:
+            try:
+                return await asyncio.wait_for(
+                    self._exchange(method, target, payload), timeout or self.timeout)
+            except (OSError, asyncio.TimeoutError):
+                if self.health is not None:
+                    self.health.record_failure()
+                raise
+
+    def _check_circuit(self):
+        if self.health is not None and not self.health.allow():
+            raise DockerUnavailableError("Docker engine is unavailable (circuit open).")
+
+    async def _exchange(self, method: str, target: str, payload: Optional[bytes]):
+        while True:
+            while self._idle and self._idle[-1].reader.at_eof():
+                # Closed by the engine while idle: never sent on
+                self._idle.pop().close()
+            reused = bool(self._idle)
+            connection = self._idle.pop() if reused else await self._open()
+            sent = False
+            try:
+                await connection.send(method, target, payload)
+                sent = True
+                status, headers = await connection.read_head()
+                data = await connection.read_body(headers, status, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                if reused and (method in IDEMPOTENT_METHODS or not sent):
+                    # The engine closed an idle keep-alive connection; retry on a
+                    # fresh one. Other methods may have reached the engine already
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+
+            if connection.reusable:
+                self._idle.append(connection)
+            else:
+                connection.close()
+            return status, headers, data
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, params: Optional[dict] = None):
+        """
+        Open a streaming request on a dedicated connection.
+        Yields (status, headers, body iterator); the connection is closed on exit.
+        """
+        self._check_circuit()
+        connection = await self._open()
+        try:
+            await connection.send(method, self._target(path, params), None)
+            status, headers = await asyncio.wait_for(connection.read_head(), self.timeout)
+            yield status, headers, connection.iter_body(headers, status, method)
+        finally:
+            connection.close()
+
+    async def is_online(self, force: bool = False) -> bool:
+        """
+        Return the cached health state. Without a circuit breaker the engine
+        is pinged only when the state is older than `health_ttl`.
+        """
+        if self.health is not None:
+            checked_at = self.health.checked_at
+            stale = checked_at is None or time.monotonic() - checked_at >= self.health_ttl
+            if force or (stale and not self.health.running):
+                # The probe uses the blocking client, keep it off the event loop
+                return await asyncio.to_thread(self.health.probe)
+            return self.health.online
+
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.health_ttl:
+            return self._online
+        try:
+            with docker_call("ping", "async"):
+                status, _, _ = await self.request("GET", "/_ping")
+            online = status == 200
+        except (OSError, asyncio.TimeoutError):
+            online = False
+        self._online = online
+        self._checked_at = now
+        return online
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+def _container_from_json(container: dict) -> DockerContainer:
+    return DockerContainer(id=container["Id"],
+                           name=(container.get("Names") or [""])[0].lstrip("/"),
+                           status=container.get("State"),
+                           labels=container.get("Labels") or {})
+
+
+def _image_from_json(image: dict) -> DockerImage:
+    # Use "untagged" if no tags are available
+    return DockerImage(id=image["Id"], name=(image.get("RepoTags") or ["untagged"])[0],
+                       labels=image.get("Labels") or {})
+
+
+def _error_message(data: bytes) -> str:
+    try:
+        return json.loads(data).get("message", "")
+    except (ValueError, AttributeError):
+        return data.decode(errors="replace")
+
+
+class AsyncDockerClient:
+    """
+    Async counterpart of services.docker_client.DockerClient on top of AsyncDockerEngine.
+    """
+
+    def __init__(self, engine: AsyncDockerEngine, cache: Optional[InventoryCache] = None):
+        self.engine = engine
+        self.cache = cache
+
+    async def _json(self, operation: str, method: str, path: str, params: Optional[dict] = None,
+                    not_found: Optional[str] = None, timeout: Optional[float] = None):
+        call = lambda: self._call(operation, method, path, params, not_found, timeout)
+        if method != "GET":
+            return await call()
+        # Identical reads in flight share one call; the decoded result is shared too
+        key = (path, json.dumps(params, sort_keys=True), not_found)
+        return await self.engine.flights.do(key, call)
+
+    async def _call(self, operation: str, method: str, path: str, params: Optional[dict],
+                    not_found: Optional[str], timeout: Optional[float]):
+        with docker_call(operation, "async"):
+            status, _, data = await self.engine.request(method, path, params, timeout=timeout)
+            if status == 404 and not_found:
+                raise NoDataFoundException(not_found)
+            if status >= 400:
+                raise DockerEngineError(status, _error_message(data))
+        return json.loads(data) if data else None
+
+    def _cache_ready(self, kind: str) -> bool:
+        ready = self.cache is not None and self.cache.ready
+        record_cache_lookup(kind, ready)
+        return ready
+
+    def inventory_tag(self) -> Optional[str]:
+        """
+        Tag of the cached inventory's current content, or None while the
+        cache is not fresh enough to be served.
+        """
+        if self.cache is None or not self.cache.ready:
+            return None
+        return self.cache.tag
+
+    async def ping(self) -> bool:
+        return await self.engine.is_online(force=True)
+
+    async def is_docker_online(self) -> bool:
+        """
+        Check if the Docker engine is online (cached health state).
+        """
+        return await self.engine.is_online()
+
+    async def list_images(self) -> list[DockerImage]:
+        """
+        List all Docker images.
+        """
+        if self._cache_ready("images"):
+            images = self.cache.images()
+        else:
+            try:
+                images = [_image_from_json(image) for image in await self._json(
+                    "images.list", "GET", "/images/json", {"all": True})]
+            except (OSError, asyncio.TimeoutError, DockerEngineError) as e:
+                print(f"An error occurred while listing images: {str(e)}")
+                return []
+        if not images:
+            raise NoDataFoundException("No Docker images found.")
+        return images
+
+    async def list_containers(self) -> list[DockerContainer]:
+        """
+        List all Docker containers.
+        """
+        if self._cache_ready("containers"):
+            return self.cache.containers()
+        try:
+            return [_container_from_json(container) for container in await self._json(
+                "containers.list", "GET", "/containers/json", {"all": True})]
+        except (OSError, asyncio.TimeoutError, DockerEngineError) as e:
+            print(f"An error occurred while listing containers: {str(e)}")
+            return []
+
+    async def query_containers(self, query: ListingQuery) -> ListingPage:
+        """
+        Return one page of containers matching `query`.
+        Served from the cache's prebuilt index when it is fresh; otherwise
+        the filters are pushed down to the engine.
+        """
+        if self._cache_ready("containers"):
+            return self.cache.container_index().page(query)
+        rows = [_container_from_json(container) for container in await self._json(
+            "containers.list", "GET", "/containers/json",
+            {"all": True, "filters": query.container_filters()})]
+        return ListingIndex(rows).page(query)
+
+    async def query_images(self, query: ListingQuery) -> ListingPage:
+        """
+        Return one page of images matching `query`.
+        Served from the cache's prebuilt index when it is fresh; otherwise
+        the filters are pushed down to the engine.
+        """
+        if self._cache_ready("images"):
+            return self.cache.image_index().page(query)
+        rows = [_image_from_json(image) for image in await self._json(
+            "images.list", "GET", "/images/json", {"all": True, "filters": query.image_filters()})]
+        return ListingIndex(rows).page(query)
+
+    async def start_container(self, container_name: str):
+        """
+        Start a specific container by name.
+        """
+        await self._json("start", "POST", f"/containers/{container_name}/start",
+                         not_found=f"Container '{container_name}' not found.")
+        print(f"Container {container_name} started.")
+
+    async def stop_container(self, container_name: str, timeout: Optional[int] = None):
+        """
+        Stop a specific container by name.
+        """
+        # The engine waits up to the container's grace period before killing it
+        grace = timeout if timeout is not None else 10
+        await self._json("stop", "POST", f"/containers/{container_name}/stop", {"t": timeout},
+                         not_found=f"Container '{container_name}' not found.",
+                         timeout=self.engine.timeout + grace)
+        print(f"Container {container_name} stopped.")
+
+    async def restart_container(self, container_name: str, timeout: Optional[int] = None):
+        """
+        Restart a specific container by name.
+        """
+        grace = timeout if timeout is not None else 10
+        await self._json("restart", "POST", f"/containers/{container_name}/restart",
+                         {"t": timeout}, not_found=f"Container '{container_name}' not found.",
+                         timeout=self.engine.timeout + grace)
+        print(f"Container {container_name} restarted.")
+
+    async def container_stats(self, container_name: str) -> dict:
+        """
+        Return one stats sample of a container.
+        """
+        return await self._json("stats", "GET", f"/containers/{container_name}/stats",
+                                {"stream": False}, not_found=f"Container '{container_name}' not found.")
+
+    async def stats_stream(self, container_name: str) -> AsyncIterator[dict]:
+        """
+        Yield decoded stats samples of a container as the engine streams them.
+        The upstream connection is closed as soon as the iterator is closed.
+        """
+        async with self.engine.stream("GET", f"/containers/{container_name}/stats",
+                                      {"stream": True}) as (status, _, body):
+            if status == 404:
+                raise NoDataFoundException(f"Container '{container_name}' not found.")
+            if status >= 400:
+                raise DockerEngineError(status, _error_message(b"".join([c async for c in body])))
+            buffer = b""
+            async for chunk in body:
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+
+    async def container_logs(self, container_name: str, follow: bool = False,
+                             since: Optional[float] = None, until: Optional[float] = None,
+                             tail: Optional[int] = None, stdout: bool = True, stderr: bool = True,
+                             timestamps: bool = False,
+                             max_line: int = config.LOGS_MAX_LINE) -> AsyncIterator[list[tuple[int, bytes]]]:
+        """
+        Yield a container's log lines as (stream, line) batches, one batch per
+        read from the engine, demultiplexed and split into lines. Nothing is
+        read ahead of the consumer, and the upstream connection is closed as
+        soon as the iterator is closed.
+        """
+        params = {"follow": follow, "stdout": stdout, "stderr": stderr, "timestamps": timestamps,
+                  "since": since, "until": until, "tail": "all" if tail is None else tail}
+        async with self.engine.stream("GET", f"/containers/{container_name}/logs",
+                                      params) as (status, headers, body):
+            if status == 404:
+                raise NoDataFoundException(f"Container '{container_name}' not found.")
+            if status >= 400:
+                raise DockerEngineError(status, _error_message(b"".join([c async for c in body])))
+            demuxer, lines = None, LineSplitter(max_line)
+            async for chunk in body:
+                if demuxer is None:
+                    # TTY containers send raw output, the others framed stdout/stderr
+                    demuxer = FrameDemuxer() if is_multiplexed(headers.get("content-type", ""), chunk) else False
+                pieces = demuxer.feed(chunk) if demuxer else [(STDOUT, chunk)]
+                batch = [line for stream, data in pieces for line in lines.feed(stream, data)]
+                if batch:
+                    yield batch
+            rest = lines.flush()
+            if rest:
+                yield rest
+
+    async def inspect_container(self, container_name: str) -> dict:
+        """
+        Return the engine's inspect data of a container.
+        """
+        return await self._json("inspect", "GET", f"/containers/{container_name}/json",
+                                not_found=f"Container '{container_name}' not found.")
+
+    async def version(self) -> dict:
+        return await self._json("version", "GET", "/version")
+
+    async def get_local_docker_version(self) -> str:
+        """
+        Returns the version of the local Docker Engine.
+        """
+        version_info = await self.version()
+        return version_info.get('Version', 'Unknown')
+
+
+_engine: Optional[AsyncDockerEngine] = None
+
+
+def get_async_engine() -> AsyncDockerEngine:
+    """
+    Return the process-wide async Docker engine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        # Share the circuit breaker of the blocking engine: one daemon, one health state
+        _engine = AsyncDockerEngine(health=get_engine().health)
+    return _engine
+
+
+async def close_async_engine():
+    """
+    Close the idle connections of the process-wide async Docker engine.
+    """
+    global _engine
+    engine, _engine = _engine, None
+    if engine is not None:
+        await engine.close()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import config
+from models.docker_model import BulkAction, BulkActionRequest, BulkActionResult, BulkItemResult, JobStatus
+from services.async_docker_client import AsyncDockerClient
+from services.job_scheduler import JobScheduler
+
+ITEM_STATUS = {JobStatus.succeeded: "ok", JobStatus.not_found: "not_found", JobStatus.failed: "error"}
+
+
+def prerequisites(ids: list[str], action: BulkAction,
+                  depends_on: dict[str, list[str]]) -> dict[str, set[str]]:
+    """
+    Map every container to the containers of the batch that must finish first.
+
+    Dependencies are started (and restarted) before their dependents and
+    stopped after them. Raises ValueError on a dependency cycle.
+    """
+    batch = set(ids)
+    before = {container_id: set(depends_on.get(container_id, [])) & batch - {container_id}
+              for container_id in ids}
+    if action == BulkAction.stop:
+        reverse = {container_id: set() for container_id in ids}
+        for container_id, deps in before.items():
+            for dep in deps:
+                reverse[dep].add(container_id)
+        before = reverse
+
+    visiting, visited = set(), set()
+
+    def visit(container_id):
+        if container_id in visited:
+            return
+        if container_id in visiting:
+            raise ValueError(f"Dependency cycle involving container '{container_id}'.")
+        visiting.add(container_id)
+        for dep in before[container_id]:
+            visit(dep)
+        visiting.discard(container_id)
+        visited.add(container_id)
+
+    for container_id in ids:
+        visit(container_id)
+    return before
+
+
+async def run_bulk_action(client: AsyncDockerClient, request: BulkActionRequest,
+                          jobs: JobScheduler) -> BulkActionResult:
+    """
+    Apply one lifecycle action to many containers concurrently.
+
+    Every container's action is a job of `jobs`, so it is serialized with
+    the other jobs on that container, counts against the scheduler's
+    concurrency limit and can be polled under /api/jobs. At most
+    `parallelism` (capped by BULK_MAX_PARALLELISM) of the batch's jobs are
+    queued at once. Each container waits for its prerequisites; if one of
+    them failed, the container is skipped. Every container gets its own
+    outcome, timing and job id.
+    """
+    ids = list(dict.fromkeys(request.ids))
+    before = prerequisites(ids, request.action, request.depends_on)
+    limit = min(request.parallelism or config.BULK_MAX_PARALLELISM, config.BULK_MAX_PARALLELISM)
+    slots = asyncio.Semaphore(limit)
+    finished = {container_id: asyncio.Event() for container_id in ids}
+    results: dict[str, BulkItemResult] = {}
+
+    operations = {
+        BulkAction.start: lambda container_id: client.start_container(container_id),
+        BulkAction.stop: lambda container_id: client.stop_container(container_id, request.timeout),
+        BulkAction.restart: lambda container_id: client.restart_container(container_id, request.timeout),
+    }
+    operation = operations[request.action]
+
+    async def run(container_id):
+        try:
+            for dep in before[container_id]:
+                await finished[dep].wait()
+            failed = [dep for dep in before[container_id] if results[dep].status != "ok"]
+            if failed:
+                results[container_id] = BulkItemResult(
+                    status="skipped", detail=f"Dependency failed: {', '.join(sorted(failed))}")
+                return
+
+            async with slots:
+                job = await jobs.wait(jobs.submit(request.action.value, container_id,
+                                                  lambda: operation(container_id)))
+                results[container_id] = BulkItemResult(
+                    status=ITEM_STATUS.get(job.status, "error"), detail=job.detail,
+                    duration_ms=job.duration_ms or 0.0, job_id=job.id)
+        finally:
+            finished[container_id].set()
+
+    started = time.monotonic()
+    await asyncio.gather(*(run(container_id) for container_id in ids))
+    statuses = [results[container_id].status for container_id in ids]
+
+    return BulkActionResult(
+        action=request.action,
+        succeeded=statuses.count("ok"),
+        failed=len(statuses) - statuses.count("ok") - statuses.count("skipped"),
+        skipped=statuses.count("skipped"),
+        duration_ms=round((time.monotonic() - started) * 1000, 2),
+        results={container_id: results[container_id] for container_id in ids},
+    )
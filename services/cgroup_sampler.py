@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from typing import Optional
+import config
+
+# Where Docker puts a container's cgroup, for the systemd and cgroupfs drivers
+_CONTAINER_DIRS = ("system.slice/docker-{id}.scope", "docker/{id}")
+_V1_CPU_CONTROLLERS = ("cpuacct", "cpu,cpuacct", "cpu")
+# cgroup v1 reports "no limit" as a page-rounded LONG_MAX
+_V1_UNLIMITED = 1 << 62
+
+
+class _Handles:
+    """
+    Open file descriptors of one container's counter files.
+    """
+
+    def __init__(self, memory: int, memory_stat: Optional[int], cpu: Optional[int],
+                 limit: Optional[int] = None):
+        self.memory = memory
+        self.memory_stat = memory_stat
+        self.cpu = cpu
+        self.limit = limit
+
+    def close(self):
+        for fd in (self.memory, self.memory_stat, self.cpu, self.limit):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+
+def _open(path: str) -> Optional[int]:
+    try:
+        return os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+
+
+def _read(fd: int) -> bytes:
+    # pread from offset 0 re-reads the live counter without reopening the file
+    return os.pread(fd, 65536, 0)
+
+
+def _stat_value(data: bytes, key: bytes) -> Optional[int]:
+    for line in data.splitlines():
+        name, _, value = line.partition(b" ")
+        if name == key:
+            return int(value)
+    return None
+
+
+class CgroupSampler:
+    """
+    Reads container memory and CPU counters straight from the cgroup
+    filesystem instead of the engine's blocking stats API.
+
+    Supports cgroup v2 (`memory.current`, `memory.stat`, `memory.max`,
+    `cpu.stat`) and v1 (`memory.usage_in_bytes`, `memory.stat`,
+    `memory.limit_in_bytes`, `cpuacct.usage`). A container's cgroup is
+    resolved once; its counter files stay open and are re-read with pread
+    (up to four descriptors per container). `read` returns None
+    when a container's cgroup cannot be found, opened or read, so callers can
+    fall back to the API; such containers are looked up again after
+    `retry_interval` seconds.
+    """
+
+    def __init__(self, root: str = config.STATS_CGROUP_ROOT, retry_interval: float = 60.0):
+        self.root = root
+        self.retry_interval = retry_interval
+        self.version = 2 if os.path.exists(os.path.join(root, "cgroup.controllers")) else 1
+        self._handles: dict[str, _Handles] = {}
+        self._missing: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _find(self, base: str, container_id: str) -> Optional[str]:
+        for pattern in _CONTAINER_DIRS:
+            path = os.path.join(base, pattern.format(id=container_id))
+            if os.path.isdir(path):
+                return path
+        return None
+
+    def _resolve(self, container_id: str) -> Optional[_Handles]:
+        if self.version == 2:
+            path = self._find(self.root, container_id)
+            if path is None:
+                return None
+            memory = _open(os.path.join(path, "memory.current"))
+            if memory is None:
+                return None
+            return _Handles(memory, _open(os.path.join(path, "memory.stat")),
+                            _open(os.path.join(path, "cpu.stat")),
+                            _open(os.path.join(path, "memory.max")))
+
+        path = self._find(os.path.join(self.root, "memory"), container_id)
+        if path is None:
+            return None
+        memory = _open(os.path.join(path, "memory.usage_in_bytes"))
+        if memory is None:
+            return None
+        cpu = None
+        for controller in _V1_CPU_CONTROLLERS:
+            cpu_path = self._find(os.path.join(self.root, controller), container_id)
+            if cpu_path is not None:
+                cpu = _open(os.path.join(cpu_path, "cpuacct.usage"))
+                if cpu is not None:
+                    break
+        return _Handles(memory, _open(os.path.join(path, "memory.stat")), cpu,
+                        _open(os.path.join(path, "memory.limit_in_bytes")))
+
+    def _get(self, container_id: str) -> Optional[_Handles]:
+        handles = self._handles.get(container_id)
+        if handles is not None:
+            return handles
+        missing_since = self._missing.get(container_id)
+        if missing_since is not None and time.monotonic() - missing_since < self.retry_interval:
+            return None
+
+        handles = self._resolve(container_id)
+        with self._lock:
+            if handles is None:
+                self._missing[container_id] = time.monotonic()
+                return None
+            self._missing.pop(container_id, None)
+            existing = self._handles.setdefault(container_id, handles)
+        if existing is not handles:
+            handles.close()
+        return existing
+
+    def read(self, container_id: str) -> Optional[dict]:
+        """
+        Current counters of a container: `memory_usage`,
+        `memory_inactive_file` and `memory_limit` (None when unlimited) in
+        bytes, `cpu_usage_ns` cumulative CPU time.
+        """
+        handles = self._get(container_id)
+        if handles is None:
+            return None
+        try:
+            memory = int(_read(handles.memory))
+            stat = _read(handles.memory_stat) if handles.memory_stat is not None else b""
+            cpu = _read(handles.cpu) if handles.cpu is not None else None
+            limit = _read(handles.limit).strip() if handles.limit is not None else b"max"
+        except (OSError, ValueError):
+            # The cgroup went away (container stopped); resolve again next time
+            self.forget(container_id)
+            return None
+
+        inactive_key = b"inactive_file" if self.version == 2 else b"total_inactive_file"
+        if cpu is None:
+            cpu_ns = None
+        elif self.version == 2:
+            usage_usec = _stat_value(cpu, b"usage_usec")
+            cpu_ns = usage_usec * 1000 if usage_usec is not None else None
+        else:
+            cpu_ns = int(cpu)
+        limit = None if limit == b"max" else int(limit)
+        return {
+            "memory_usage": memory,
+            "memory_inactive_file": _stat_value(stat, inactive_key),
+            "memory_limit": limit if limit is None or limit < _V1_UNLIMITED else None,
+            "cpu_usage_ns": cpu_ns,
+        }
+
+    def forget(self, container_id: str):
+        with self._lock:
+            handles = self._handles.pop(container_id, None)
+            self._missing.pop(container_id, None)
+        if handles is not None:
+            handles.close()
+
+    def retain(self, container_ids):
+        """
+        Close the handles of containers that are no longer listed.
+        """
+        keep = set(container_ids)
+        for container_id in [c for c in (*self._handles, *self._missing) if c not in keep]:
+            self.forget(container_id)
+
+    def close(self):
+        for container_id in list(self._handles):
+            self.forget(container_id)
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
+def default_cgroup_sampler() -> Optional[CgroupSampler]:
+    """
+    Cgroup sampler for the local engine, or None when it is disabled, the
+    engine is remote or no cgroup filesystem is mounted.
+    """
+    local = config.DOCKER_HOST.startswith(("unix://", "http+unix://"))
+    if not config.STATS_CGROUP or not local or not os.path.isdir(config.STATS_CGROUP_ROOT):
+        return None
+    return CgroupSampler(config.STATS_CGROUP_ROOT)
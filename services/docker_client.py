@@ -1,50 +1,59 @@
-from typing import Union
+from typing import Optional, Union
 from urllib3.exceptions import InsecureRequestWarning
-import requests
 import urllib3
 import docker
 import docker.errors
 from models.exceptions import NoDataFoundException
 from models.docker_model import DockerContainer, DockerImage
-from urllib3.exceptions import InsecureRequestWarning
+from services.docker_engine import DockerEngine, is_connection_error
+from services.inventory_cache import InventoryCache, container_row, image_row
+from services.metrics import docker_call, record_cache_lookup
+from services.version_service import VersionService, is_up_to_date
 
 
 # Disable SSL warnings globally for urllib3
 urllib3.disable_warnings(InsecureRequestWarning)
 
+
 class DockerClient:
-    def __init__(self):
-        try:
-            self.client = docker.from_env()
-            # Try pinging the Docker server
-            self.client.ping()
-        except docker.errors.DockerException as e:
-            print(f"[DockerClient] Docker is not available: {e}")
-            self.client = None
+    def __init__(self, engine: Optional[DockerEngine] = None,
+                 cache: Optional[InventoryCache] = None,
+                 versions: Optional[VersionService] = None):
+        # Without a shared engine the client owns a private connection
+        if engine is None:
+            engine = DockerEngine()
+            engine.connect()
+        self.engine = engine
+        self.cache = cache
+        self.versions = versions if versions is not None else VersionService(engine)
+
+    @property
+    def client(self):
+        return self.engine.get_client()
 
     def is_docker_online(self) -> bool:
         """
-        Check if the Docker client is online.
+        Check if the Docker client is online (cached circuit breaker state).
         """
         if not self.client:
             return False
-        try:
-            self.client.ping()
-            return True
-        except docker.errors.DockerException:
-            return False
+        return self.engine.is_online()
 
     def list_images(self) -> list[DockerImage]:
         """
         List all Docker images.
         """
-        if not self.client:
+        if not self.client or not self.engine.is_online():
             print("Docker client not initialized or Docker is offline.")
             return []
 
         try:
-            images = [DockerImage(id=str(image.id), name=(image.tags[0] if image.tags else "untagged"))  # Use "untagged" if no tags are available
-                      for image in self.client.images.list(all=True)]
+            cached = self.cache is not None and self.cache.ready
+            record_cache_lookup("images", cached)
+            if cached:
+                images = self.cache.images()
+            else:
+                images = list(self.engine.flights.do("images.list", self._fetch_images))
             if not images:
                 raise NoDataFoundException("No Docker images found.")
 
@@ -53,90 +62,104 @@ class DockerClient:
             raise e
         except Exception as e:
             print(f"An error occurred while listing images: {str(e)}")
+            self._report(e)
             return []
 
     def list_containers(self) -> list[DockerContainer]:
         """
         List all Docker containers.
         """
-        if not self.client:
+        if not self.client or not self.engine.is_online():
             print("Docker client not initialized or Docker is offline.")
             return []
 
         try:
-            containers = [
-                DockerContainer(id=container.id, name=container.name)
-                for container in self.client.containers.list(all=True)
-            ]
+            cached = self.cache is not None and self.cache.ready
+            record_cache_lookup("containers", cached)
+            if cached:
+                containers = self.cache.containers()
+            else:
+                containers = list(self.engine.flights.do("containers.list", self._fetch_containers))
             if not containers:
                 raise NoDataFoundException("No Docker containers found.")
             return containers
         except Exception as e:
             print(f"An error occurred while listing containers: {str(e)}")
+            self._report(e)
             return []
 
+    def _report(self, error: Exception):
+        # Unreachable or hung daemon errors count towards opening the circuit
+        if is_connection_error(error):
+            self.engine.mark_offline()
+
+    def _fetch_images(self) -> list[DockerImage]:
+        with docker_call("images.list"):
+            listed = self.client.images.list(all=True)
+        return [image_row(image) for image in listed]
+
+    def _fetch_containers(self) -> list[DockerContainer]:
+        with docker_call("containers.list"):
+            listed = self.client.containers.list(all=True, sparse=True)
+        return [container_row(container) for container in listed]
+
     def start_container(self, container_name):
         """
         Start a specific container by name.
         """
-        if not self.client:
+        if not self.client or not self.engine.is_online():
             print("Docker client not initialized or Docker is offline.")
             return
 
         try:
-            container = self.client.containers.get(container_name)
-            if container is None:
-                raise NoDataFoundException(
-                    f"Container {container_name} not found.")
+            with docker_call("start"):
+                container = self.client.containers.get(container_name)
+                if container is None:
+                    raise NoDataFoundException(
+                        f"Container {container_name} not found.")
 
-            container.start()
+                container.start()
             print(f"Container {container_name} started.")
         except docker.errors.NotFound as e:
             raise NoDataFoundException(
                 f"Container '{container_name}' not found.") from e
         except Exception as e:
             print(f"An error occurred while starting the container: {str(e)}")
+            self._report(e)
             raise e
 
     def stop_container(self, container_name):
         """
         Stop a specific container by name.
         """
-        if not self.client:
+        if not self.client or not self.engine.is_online():
             print("Docker client not initialized or Docker is offline.")
             return
 
         try:
-            container = self.client.containers.get(container_name)
-            container.stop()
+            with docker_call("stop"):
+                container = self.client.containers.get(container_name)
+                container.stop()
             print(f"Container {container_name} stopped.")
         except NoDataFoundException as e:
             raise e
         except Exception as e:
             print(f"An error occurred while stopping the container: {str(e)}")
+            self._report(e)
             raise e
 
     def get_latest_docker_version(self) -> Union[str, None]:
         """
-        Fetch the latest Docker version from GitHub releases.
+        Latest Docker version from the release feed (cached; fetched only
+        when nothing is cached yet).
         """
-        url = "https://api.github.com/repos/docker/docker-ce/releases/latest"
-        try:
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            return data.get('tag_name')
-        except requests.RequestException as e:
-            print(f"Failed to get latest version: {e}")
-            return None
+        return self.versions.latest_version(wait=True)
 
     def get_local_docker_version(self) -> str:
         """
-        Returns the version of the local Docker Engine.
+        Returns the version of the local Docker Engine (cached).
         """
-        client = docker.from_env()
-        version_info = client.version()
-        return version_info.get('Version', 'Unknown')
+        return self.versions.installed_version(wait=True)
 
     def is_installed_latest_version(self) -> bool:
         """
@@ -147,4 +170,4 @@ class DockerClient:
             return False
 
         installed_version = self.get_local_docker_version()
-        return installed_version == latest_version
+        return bool(is_up_to_date(installed_version, latest_version))
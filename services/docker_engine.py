@@ -0,0 +1,146 @@
+import threading
+import time
+from typing import Optional
+import docker
+import docker.errors
+import requests
+import config
+from services.health_monitor import HealthMonitor
+from services.metrics import docker_call
+from services.single_flight import SingleFlight
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    True for failures that say the daemon is unreachable or hung, as opposed
+    to errors the daemon answered with (404, 409, ...).
+    """
+    return isinstance(error, (requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout, ConnectionError, TimeoutError))
+
+
+class DockerEngine:
+    """
+    Long-lived connection to the local Docker engine.
+
+    A single `docker.DockerClient` (and therefore a single urllib3 connection
+    pool) is shared by every service that talks to the daemon. Its health is
+    tracked by a HealthMonitor circuit breaker that probes in the background,
+    so callers read a cached state instead of paying a round trip per
+    request, and `flights` lets concurrent identical reads share one daemon
+    call.
+    """
+
+    def __init__(self, pool_size: int = config.DOCKER_POOL_SIZE,
+                 timeout: int = config.DOCKER_TIMEOUT,
+                 health_ttl: float = config.DOCKER_HEALTH_TTL):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.health_ttl = health_ttl
+        self.client = None
+        self.flights = SingleFlight()
+        self.health = HealthMonitor(self._ping, interval=health_ttl)
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self.client is not None:
+                return self.client
+            try:
+                self.client = docker.from_env(
+                    max_pool_size=self.pool_size, timeout=self.timeout)
+            except docker.errors.DockerException as e:
+                print(f"[DockerEngine] Docker is not available: {e}")
+                self.client = None
+            return self.client
+
+    def _ping(self):
+        client = self._open()
+        if client is None:
+            raise docker.errors.DockerException("Docker engine is not available.")
+        with docker_call("ping"):
+            client.ping()
+
+    def connect(self):
+        """
+        Open the engine connection if it is not open yet and ping it once.
+        """
+        if self.client is not None:
+            return self.client
+        client = self._open()
+        if client is not None:
+            self.health.probe()
+        return client
+
+    def get_client(self):
+        """
+        Return the shared docker client, connecting lazily on first use.
+        """
+        if self.client is None:
+            return self.connect()
+        return self.client
+
+    def start_monitoring(self):
+        """
+        Probe the daemon in the background so health reads never block.
+        """
+        self.health.start()
+
+    def is_online(self, force: bool = False) -> bool:
+        """
+        Return the cached health state. Without the background monitor the
+        daemon is pinged only when the state is older than `health_ttl`.
+        """
+        if force:
+            return self.health.probe()
+        if not self.health.running:
+            checked_at = self.health.checked_at
+            if checked_at is None or time.monotonic() - checked_at >= self.health_ttl:
+                return self.health.probe()
+        return self.health.online
+
+    def mark_offline(self):
+        """
+        Record a failed daemon call with the circuit breaker.
+        """
+        self.health.record_failure()
+
+    def close(self):
+        """
+        Stop the health monitor, close the engine connection and release its pooled sockets.
+        """
+        self.health.stop()
+        with self._lock:
+            client, self.client = self.client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                print(f"[DockerEngine] Failed to close Docker client: {e}")
+
+
+_engine: Optional[DockerEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> DockerEngine:
+    """
+    Return the process-wide Docker engine, creating it on first use.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = DockerEngine()
+    return _engine
+
+
+def close_engine():
+    """
+    Close and forget the process-wide Docker engine.
+    """
+    global _engine
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.close()
@@ -0,0 +1,221 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+import config
+from models.docker_model import (FleetContainer, FleetContainers, FleetContainerStats, FleetHostStatus,
+                                 FleetImage, FleetImages, FleetStats, FleetVersion, FleetVersions, HostState)
+from models.exceptions import DockerEngineError, NoDataFoundException
+from services.async_docker_client import (TCP_SCHEMES, UNIX_SCHEMES, AsyncDockerClient, AsyncDockerEngine,
+                                          get_async_engine)
+from services.inventory_cache import get_inventory_cache
+from services.listing import ListingQuery
+from services.stats_broadcaster import summarize_stats
+
+T = TypeVar("T")
+LOCAL = "local"
+# Backoff key of connection failures, which affect every operation on a host
+HOST = "*"
+
+
+def parse_hosts(spec: str) -> dict[str, str]:
+    """
+    Parse DOCKER_HOSTS ("name=url,name=url") into {name: url}. An entry
+    without a name is named after its host. Raises ValueError on an endpoint
+    the engine client cannot speak to (e.g. ssh://).
+    """
+    hosts = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, url = entry.partition("=") if "=" in entry.split("://")[0] else ("", "", entry)
+        url = url.strip()
+        scheme = urlsplit(url).scheme
+        if scheme not in UNIX_SCHEMES + TCP_SCHEMES:
+            raise ValueError(f"Unsupported DOCKER_HOSTS entry '{entry}': use unix://, tcp://, "
+                             f"http:// or https:// (ssh:// is not supported).")
+        name = name.strip() or urlsplit(url).hostname or url
+        if name in hosts:
+            print(f"[Fleet] Ignoring duplicate Docker host '{name}'.")
+            continue
+        hosts[name] = url
+    return hosts
+
+
+class _Host:
+    def __init__(self, name: str, client: AsyncDockerClient, owned: bool):
+        self.name = name
+        self.client = client
+        # The local host shares the app's engine; only owned engines are closed
+        self.owned = owned
+        # Monotonic time until which an operation (or, under HOST, every
+        # operation) is skipped, and the failure that caused it
+        self.down_until: dict[str, float] = {}
+        self.last_error: dict[str, str] = {}
+
+
+class Fleet:
+    """
+    A set of Docker endpoints queried as one.
+
+    Every host has its own AsyncDockerEngine and so its own connection pool.
+    A fleet query runs on all hosts concurrently, each under a `timeout`
+    deadline, and merges the results tagged by host. A host that misses the
+    deadline or cannot be reached is reported as partial instead of failing
+    the request and skipped for `retry_interval` seconds, so later requests
+    do not wait for it again: for every operation when it cannot be reached,
+    only for that operation when it was too slow. A request therefore takes
+    as long as the slowest healthy host, at most `timeout` (`stats_timeout`
+    for the stats sweep, which samples every running container).
+    """
+
+    def __init__(self, clients: dict[str, AsyncDockerClient],
+                 timeout: float = config.FLEET_HOST_TIMEOUT,
+                 retry_interval: float = config.FLEET_RETRY_INTERVAL,
+                 owned: tuple[str, ...] = (),
+                 stats_timeout: float = config.FLEET_STATS_TIMEOUT):
+        self.hosts = [_Host(name, client, name in owned) for name, client in clients.items()]
+        self.timeout = timeout
+        self.stats_timeout = stats_timeout
+        self.retry_interval = retry_interval
+
+    @property
+    def names(self) -> list[str]:
+        return [host.name for host in self.hosts]
+
+    async def _run(self, host: _Host, name: str, operation: Callable[[AsyncDockerClient], Awaitable[T]],
+                   timeout: float):
+        started = time.monotonic()
+        for key in (HOST, name):
+            if started < host.down_until.get(key, 0.0):
+                return None, FleetHostStatus(host=host.name, state=HostState.unavailable,
+                                             detail=f"Skipped after a recent failure: {host.last_error[key]}")
+        try:
+            result = await asyncio.wait_for(operation(host.client), timeout)
+            state, detail = HostState.ok, None
+        except asyncio.TimeoutError:
+            result, state, detail = None, HostState.timeout, f"No response within {timeout:g}s."
+        except (OSError, ConnectionError) as e:
+            # DockerUnavailableError (open circuit) is a ConnectionError too
+            result, state, detail = None, HostState.unavailable, str(e) or type(e).__name__
+        except (DockerEngineError, NoDataFoundException) as e:
+            result, state, detail = None, HostState.error, str(e)
+        except Exception as e:
+            print(f"[Fleet] Unexpected error on host '{host.name}': {str(e)}")
+            result, state, detail = None, HostState.error, str(e)
+
+        if state in (HostState.timeout, HostState.unavailable):
+            # A slow operation says nothing about the host's other operations
+            key = name if state == HostState.timeout else HOST
+            host.down_until[key] = time.monotonic() + self.retry_interval
+            host.last_error[key] = detail
+        return result, FleetHostStatus(host=host.name, state=state, detail=detail,
+                                       duration_ms=round((time.monotonic() - started) * 1000, 2))
+
+    async def gather(self, name: str, operation: Callable[[AsyncDockerClient], Awaitable[T]],
+                     timeout: Optional[float] = None):
+        """
+        Run `operation` (backed off under `name`) on every host concurrently.
+        Returns ({host: result} of the hosts that answered, [status per host]).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        outcomes = await asyncio.gather(*(self._run(host, name, operation, timeout) for host in self.hosts))
+        results = {host.name: result for host, (result, status) in zip(self.hosts, outcomes)
+                   if status.state == HostState.ok}
+        return results, [status for _, status in outcomes]
+
+    async def containers(self, query: Optional[ListingQuery] = None) -> FleetContainers:
+        """
+        Containers of all hosts matching `query`.
+        """
+        query = query or ListingQuery()
+        results, hosts = await self.gather("containers", lambda client: client.query_containers(query))
+        items = [FleetContainer(host=name, **container.model_dump())
+                 for name, page in results.items() for container in page.items]
+        return FleetContainers(items=items, hosts=hosts, partial=len(results) < len(hosts))
+
+    async def images(self, query: Optional[ListingQuery] = None) -> FleetImages:
+        """
+        Images of all hosts matching `query`.
+        """
+        query = query or ListingQuery()
+        results, hosts = await self.gather("images", lambda client: client.query_images(query))
+        items = [FleetImage(host=name, **image.model_dump())
+                 for name, page in results.items() for image in page.items]
+        return FleetImages(items=items, hosts=hosts, partial=len(results) < len(hosts))
+
+    async def stats(self) -> FleetStats:
+        """
+        One stats sample of every running container on all hosts.
+        """
+        results, hosts = await self.gather("stats", _running_stats, self.stats_timeout)
+        items = [FleetContainerStats(host=name, **row) for name, rows in results.items() for row in rows]
+        return FleetStats(items=items, hosts=hosts, partial=len(results) < len(hosts))
+
+    async def versions(self) -> FleetVersions:
+        """
+        Engine version of all hosts.
+        """
+        results, hosts = await self.gather("version", lambda client: client.version())
+        items = [FleetVersion(host=name, version=info.get("Version", "Unknown"),
+                              api_version=info.get("ApiVersion"))
+                 for name, info in results.items()]
+        return FleetVersions(items=items, hosts=hosts, partial=len(results) < len(hosts))
+
+    async def close(self):
+        for host in self.hosts:
+            if host.owned:
+                await host.client.engine.close()
+
+
+async def _running_stats(client: AsyncDockerClient) -> list[dict]:
+    page = await client.query_containers(ListingQuery(status="running"))
+
+    async def sample(container):
+        try:
+            raw = await client.container_stats(container.id)
+        except NoDataFoundException:
+            # Stopped or removed since the listing
+            return None
+        summary = summarize_stats(raw)
+        return {"id": container.id, "name": container.name, "cpu_percent": summary["cpu_percent"],
+                "memory_usage": summary["memory_usage"], "memory_limit": summary["memory_limit"]}
+
+    # The host's engine pool bounds how many samples are in flight
+    rows = await asyncio.gather(*(sample(container) for container in page.items))
+    return [row for row in rows if row is not None]
+
+
+_fleet: Optional[Fleet] = None
+
+
+def get_fleet() -> Fleet:
+    """
+    Return the process-wide fleet, creating it on first use. The local
+    DOCKER_HOST reuses the app's async engine and inventory cache.
+    """
+    global _fleet
+    if _fleet is None:
+        urls = parse_hosts(config.DOCKER_HOSTS)
+        if config.DOCKER_HOST not in urls.values():
+            urls = {LOCAL: config.DOCKER_HOST, **urls}
+        clients, owned = {}, []
+        for name, url in urls.items():
+            if url == config.DOCKER_HOST:
+                clients[name] = AsyncDockerClient(get_async_engine(), get_inventory_cache())
+            else:
+                clients[name] = AsyncDockerClient(AsyncDockerEngine(url))
+                owned.append(name)
+        _fleet = Fleet(clients, owned=tuple(owned))
+    return _fleet
+
+
+async def close_fleet():
+    """
+    Close the connection pools of the fleet's remote hosts.
+    """
+    global _fleet
+    fleet, _fleet = _fleet, None
+    if fleet is not None:
+        await fleet.close()
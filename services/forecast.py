@@ -0,0 +1,119 @@
+from statistics import NormalDist
+import numpy as np
+
+SUMS = ("n", "st", "sy", "stt", "sty", "syy")
+
+
+class TrendForecaster:
+    """
+    Linear trend per container, fitted by least squares over a sliding window.
+
+    Instead of refitting, the forecaster keeps the running sums
+    n, Σt, Σy, Σt², Σty and Σy² for every slot. Adding a sample (and removing
+    the one it evicts from the window) is O(1); fitting and forecasting are
+    closed-form expressions over those sums, vectorized across all slots.
+
+    Time is measured in seconds relative to a per-slot origin to keep the
+    sums numerically stable: the slot's first sample, moved up to its oldest
+    sample in the window whenever the sums are rebuilt by `fit_arrays`.
+    """
+
+    def __init__(self, capacity: int = 0):
+        self.capacity = 0
+        for name in SUMS + ("origin", "last_t"):
+            setattr(self, name, np.zeros(0))
+        self.resize(capacity)
+
+    def resize(self, capacity: int):
+        extra = capacity - self.capacity
+        if extra <= 0:
+            return
+        for name in SUMS + ("origin", "last_t"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra)]))
+        self.origin[self.capacity:] = np.nan
+        self.capacity = capacity
+
+    def reset(self, slot: int):
+        for name in SUMS + ("last_t",):
+            getattr(self, name)[slot] = 0.0
+        self.origin[slot] = np.nan
+
+    def observe(self, slot: int, t: float, y: float,
+                evicted_t: float = np.nan, evicted_y: float = np.nan):
+        """
+        Add one sample to a slot and drop the sample it evicted, if any. O(1).
+        """
+        if np.isnan(self.origin[slot]):
+            self.origin[slot] = t
+        origin = self.origin[slot]
+        if not np.isnan(evicted_y):
+            self._accumulate(slot, evicted_t - origin, evicted_y, -1.0)
+        if not np.isnan(y):
+            self._accumulate(slot, t - origin, y, 1.0)
+            self.last_t[slot] = t - origin
+
+    def _accumulate(self, slot: int, t: float, y: float, sign: float):
+        self.n[slot] += sign
+        self.st[slot] += sign * t
+        self.sy[slot] += sign * y
+        self.stt[slot] += sign * t * t
+        self.sty[slot] += sign * t * y
+        self.syy[slot] += sign * y * y
+
+    def fit_arrays(self, slots: np.ndarray, timestamps: np.ndarray, values: np.ndarray,
+                   mask: np.ndarray):
+        """
+        Rebuild the sums of `slots` from 2D sample arrays in one vectorized pass.
+        `mask` marks the valid samples of each row.
+        """
+        mask = mask & ~np.isnan(values)
+        origin = np.where(mask, timestamps, np.inf).min(axis=1)
+        origin = np.where(np.isfinite(origin), origin, 0.0)
+        t = np.where(mask, timestamps - origin[:, None], 0.0)
+        y = np.where(mask, values, 0.0)
+
+        self.origin[slots] = np.where(mask.any(axis=1), origin, np.nan)
+        self.n[slots] = mask.sum(axis=1)
+        self.st[slots] = t.sum(axis=1)
+        self.sy[slots] = y.sum(axis=1)
+        self.stt[slots] = (t * t).sum(axis=1)
+        self.sty[slots] = (t * y).sum(axis=1)
+        self.syy[slots] = (y * y).sum(axis=1)
+        self.last_t[slots] = np.where(mask, t, -np.inf).max(axis=1).clip(min=0.0)
+
+    def coefficients(self, slots: np.ndarray):
+        """
+        Return (slope, intercept, residual std, n, mean t, Sxx) for `slots`.
+        Slots with fewer than two samples get a flat trend through their mean.
+        """
+        n = self.n[slots]
+        safe_n = np.maximum(n, 1.0)
+        mean_t = self.st[slots] / safe_n
+        mean_y = self.sy[slots] / safe_n
+        sxx = self.stt[slots] - self.st[slots] * mean_t
+        sxy = self.sty[slots] - self.st[slots] * mean_y
+        syy = self.syy[slots] - self.sy[slots] * mean_y
+
+        has_trend = (n >= 2) & (sxx > 1e-9)
+        slope = np.where(has_trend, sxy / np.where(has_trend, sxx, 1.0), 0.0)
+        intercept = mean_y - slope * mean_t
+        sse = np.maximum(syy - slope * sxy, 0.0)
+        std = np.where(n > 2, np.sqrt(sse / np.maximum(n - 2, 1.0)), 0.0)
+        return slope, intercept, std, n, mean_t, np.where(has_trend, sxx, np.inf)
+
+    def forecast(self, slots: np.ndarray, steps: int, step_seconds: float,
+                 confidence: float = 0.95):
+        """
+        Predict the next `steps` values of every slot, `step_seconds` apart.
+        Returns (predicted, lower, upper) arrays of shape (len(slots), steps).
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        slope, intercept, std, n, mean_t, sxx = self.coefficients(slots)
+        horizon = self.last_t[slots][:, None] + step_seconds * np.arange(1, steps + 1)
+
+        predicted = intercept[:, None] + slope[:, None] * horizon
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        spread = std[:, None] * np.sqrt(
+            1.0 + 1.0 / np.maximum(n, 1.0)[:, None] + (horizon - mean_t[:, None]) ** 2 / sxx[:, None])
+        margin = z * spread
+        return predicted, predicted - margin, predicted + margin
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Callable, Optional
+import config
+
+CLOSED = "closed"
+OPEN = "open"
+
+
+class HealthMonitor:
+    """
+    Circuit breaker around the Docker daemon's health.
+
+    The circuit is closed while the daemon answers. Consecutive failures,
+    from background probes or from calls reported with `record_failure`,
+    open it after `failure_threshold`; while it is open callers fail fast
+    instead of waiting out socket timeouts. A background thread probes every
+    `interval` seconds while closed and with exponential backoff (capped at
+    `max_backoff`) while open, closing the circuit on the first success.
+    Readers only ever look at the cached state.
+    """
+
+    def __init__(self, probe: Callable[[], object],
+                 interval: float = config.DOCKER_HEALTH_TTL,
+                 failure_threshold: int = config.DOCKER_FAILURE_THRESHOLD,
+                 max_backoff: float = config.DOCKER_MAX_BACKOFF):
+        self.probe_fn = probe
+        self.interval = interval
+        self.failure_threshold = max(1, failure_threshold)
+        self.max_backoff = max_backoff
+        # Unknown until the first probe, so callers fail fast until then
+        self.state = OPEN
+        self.failures = 0
+        self.checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def online(self) -> bool:
+        return self.state == CLOSED
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def allow(self) -> bool:
+        """
+        True when calls to the daemon should be attempted.
+        """
+        return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.checked_at = time.monotonic()
+            if self.state != CLOSED:
+                self.state = CLOSED
+                print("[HealthMonitor] Docker engine is reachable again, circuit closed.")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.checked_at = time.monotonic()
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.state = OPEN
+                print(f"[HealthMonitor] {self.failures} consecutive Docker failures, circuit opened.")
+                # Switch the prober to backoff right away
+                self._wake.set()
+
+    def adopt(self, state: str):
+        """
+        Take over a state observed elsewhere (e.g. by another worker's
+        monitor) as if it had just been probed.
+        """
+        with self._lock:
+            self.state = state
+            self.failures = 0 if state == CLOSED else max(self.failures, self.failure_threshold)
+            self.checked_at = time.monotonic()
+
+    def probe(self) -> bool:
+        """
+        Ping the daemon once and record the outcome. Returns the new state.
+        """
+        try:
+            self.probe_fn()
+        except Exception:
+            self.record_failure()
+        else:
+            self.record_success()
+        return self.online
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-health", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        backoff = self.interval
+        while not self._stop.is_set():
+            if self.probe():
+                backoff = self.interval
+                delay = self.interval
+            else:
+                delay = backoff
+                backoff = min(backoff * 2, self.max_backoff)
+            self._wake.wait(delay)
+            self._wake.clear()
@@ -0,0 +1,76 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from starlette.responses import Response, StreamingResponse
+import config
+
+
+def make_etag(*parts) -> str:
+    """
+    Weak ETag derived from `parts`, e.g. an inventory tag and the query string.
+    Weak, because the same representation may be sent compressed or not.
+    """
+    digest = hashlib.blake2b("\0".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against `etag`.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def conditional(response: Response, if_none_match: Optional[str], etag: Optional[str] = None) -> Response:
+    """
+    Tag `response` with `etag`, or a hash of its body when no cheaper one is
+    known, and turn it into a 304 when the client already has it. Streamed
+    bodies without a known ETag are passed through untouched.
+    """
+    if etag is None:
+        if isinstance(response, StreamingResponse):
+            return response
+        etag = make_etag(hashlib.blake2b(response.body, digest_size=16).hexdigest())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return response
+
+
+class PageCache:
+    """
+    Small LRU cache of rendered HTML pages keyed by their ETag, so a page is
+    rendered once per inventory version however often it is polled.
+    """
+
+    def __init__(self, max_entries: int = config.PAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._pages: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._pages.get(key)
+            if body is not None:
+                self._pages.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: bytes):
+        with self._lock:
+            self._pages[key] = body
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._pages)
@@ -0,0 +1,303 @@
+import os
+import threading
+import time
+from typing import Optional
+import docker.errors
+import config
+from models.docker_model import DockerContainer, DockerImage
+from services.docker_engine import DockerEngine, get_engine
+from services.listing import ListingIndex
+from services.metrics import docker_call
+
+CONTAINER_ACTIONS = {"create", "destroy", "rename", "update",
+                     "start", "stop", "die", "pause", "unpause"}
+IMAGE_ACTIONS = {"pull", "tag", "untag", "delete", "import", "load"}
+
+
+def _labels(attrs) -> dict:
+    # Listings carry top-level "Labels", inspect results carry "Config.Labels"
+    labels = attrs.get("Labels")
+    if labels is None:
+        labels = (attrs.get("Config") or {}).get("Labels")
+    return labels if isinstance(labels, dict) else {}
+
+
+def container_row(container) -> DockerContainer:
+    """
+    Build a DockerContainer from a full or sparse (`list(sparse=True)`) container.
+    """
+    name = container.name
+    if name is None:
+        names = container.attrs.get("Names") or [""]
+        name = names[0].lstrip("/")
+    status = container.status
+    return DockerContainer(id=container.id, name=name,
+                           status=status if isinstance(status, str) else None,
+                           labels=_labels(container.attrs))
+
+
+def image_row(image) -> DockerImage:
+    # Use "untagged" if no tags are available
+    return DockerImage(id=str(image.id), name=(image.tags[0] if image.tags else "untagged"),
+                       labels=_labels(image.attrs))
+
+
+class InventoryCache:
+    """
+    In-process copy of the container and image inventory.
+
+    The cache is seeded with one full listing and then kept up to date by
+    the Docker `/events` stream: create/destroy/rename and pull/tag/untag/
+    delete events are applied one object at a time. The event subscription is
+    bounded by `resync_interval`; when it ends the cache does a full resync as
+    a safety net against missed events.
+    """
+
+    def __init__(self, engine: DockerEngine,
+                 resync_interval: float = config.INVENTORY_RESYNC_INTERVAL):
+        self.engine = engine
+        self.resync_interval = resync_interval
+        self.version = 0
+        # Versions restart with the process; the epoch tells them apart
+        self.epoch = os.urandom(4).hex()
+        self._containers: dict[str, DockerContainer] = {}
+        self._images: dict[str, DockerImage] = {}
+        self._synced_at: Optional[float] = None
+        self._indexes: dict[str, tuple[int, ListingIndex]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stream = None
+
+    @property
+    def ready(self) -> bool:
+        """
+        True when the cache was synced recently enough to be served.
+        """
+        synced_at = self._synced_at
+        if synced_at is None:
+            return False
+        # One missed resync is tolerated while the event stream reconnects
+        return time.monotonic() - synced_at < 2 * self.resync_interval
+
+    @property
+    def tag(self) -> str:
+        """
+        Identifies the inventory's current content, e.g. for HTTP ETags.
+        """
+        return f"{self.epoch}-{self.version}"
+
+    def containers(self) -> list[DockerContainer]:
+        with self._lock:
+            return list(self._containers.values())
+
+    def images(self) -> list[DockerImage]:
+        with self._lock:
+            return list(self._images.values())
+
+    def _index(self, kind: str, items: dict) -> ListingIndex:
+        with self._lock:
+            version = self.version
+            cached = self._indexes.get(kind)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = list(items.values())
+        index = ListingIndex(rows)
+        self._indexes[kind] = (version, index)
+        return index
+
+    def container_index(self) -> ListingIndex:
+        """
+        Sorted, filterable index of the cached containers, rebuilt once per inventory version.
+        """
+        return self._index("containers", self._containers)
+
+    def image_index(self) -> ListingIndex:
+        """
+        Sorted, filterable index of the cached images, rebuilt once per inventory version.
+        """
+        return self._index("images", self._images)
+
+    def snapshot(self) -> dict:
+        """
+        JSON-serializable copy of the inventory and its version.
+        """
+        with self._lock:
+            return {
+                "version": self.version,
+                "epoch": self.epoch,
+                "containers": [c.model_dump() for c in self._containers.values()],
+                "images": [i.model_dump() for i in self._images.values()],
+            }
+
+    def adopt(self, snapshot: dict):
+        """
+        Replace the inventory with a `snapshot` taken by another cache.
+        """
+        containers = {c["id"]: DockerContainer(**c) for c in snapshot["containers"]}
+        images = {i["id"]: DockerImage(**i) for i in snapshot["images"]}
+        with self._lock:
+            self._containers = containers
+            self._images = images
+            self.version = snapshot["version"]
+            self.epoch = snapshot["epoch"]
+            self._synced_at = time.monotonic()
+
+    def mark_synced(self):
+        """
+        Vouch for the current inventory, e.g. while its source is still alive.
+        """
+        self._synced_at = time.monotonic()
+
+    def resync(self):
+        """
+        Replace the cached inventory with a full listing from the daemon.
+        """
+        client = self.engine.get_client()
+        if client is None:
+            raise docker.errors.DockerException("Docker engine is not available.")
+
+        with docker_call("containers.list"):
+            listed_containers = client.containers.list(all=True, sparse=True)
+        with docker_call("images.list"):
+            listed_images = client.images.list(all=True)
+        containers = {c.id: container_row(c) for c in listed_containers}
+        images = {str(i.id): image_row(i) for i in listed_images}
+        with self._lock:
+            self._containers = containers
+            self._images = images
+            self.version += 1
+            self._synced_at = time.monotonic()
+
+    def apply_event(self, event: dict):
+        """
+        Apply a single decoded Docker event to the cached inventory.
+        """
+        kind = event.get("Type")
+        action = (event.get("Action") or event.get("status") or "").split(":")[0]
+        actor = event.get("Actor") or {}
+        object_id = actor.get("ID") or event.get("id")
+        if not object_id:
+            return
+
+        if kind == "container" and action in CONTAINER_ACTIONS:
+            if action == "destroy":
+                self._discard(self._containers, object_id)
+            elif action == "rename" and actor.get("Attributes", {}).get("name"):
+                existing = self._containers.get(object_id)
+                if existing is None:
+                    self._refresh_container(object_id)
+                else:
+                    # Only the name changes; status and labels stay as cached
+                    self._store(self._containers, object_id, existing.model_copy(
+                        update={"name": actor["Attributes"]["name"].lstrip("/")}))
+            else:
+                self._refresh_container(object_id)
+        elif kind == "image" and action in IMAGE_ACTIONS:
+            if action == "delete":
+                self._discard(self._images, object_id)
+            else:
+                self._refresh_image(object_id)
+
+    def _refresh_container(self, container_id: str):
+        try:
+            container = self.engine.get_client().containers.get(container_id)
+        except docker.errors.NotFound:
+            self._discard(self._containers, container_id)
+            return
+        self._store(self._containers, container.id, container_row(container))
+
+    def _refresh_image(self, image_id: str):
+        try:
+            image = self.engine.get_client().images.get(image_id)
+        except docker.errors.ImageNotFound:
+            self._discard(self._images, image_id)
+            return
+        self._store(self._images, str(image.id), image_row(image))
+
+    def _store(self, items: dict, key: str, value):
+        with self._lock:
+            items[key] = value
+            self.version += 1
+
+    def _discard(self, items: dict, key: str):
+        with self._lock:
+            if items.pop(key, None) is not None:
+                self.version += 1
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="inventory-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                since = int(time.time())
+                self.resync()
+                self._follow_events(since, since + int(self.resync_interval))
+                backoff = 1.0
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"[InventoryCache] Event stream failed, resyncing in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.resync_interval)
+
+    def _follow_events(self, since: int, until: int):
+        client = self.engine.get_client()
+        if client is None:
+            raise docker.errors.DockerException("Docker engine is not available.")
+
+        stream = client.events(
+            since=since, until=until, decode=True,
+            filters={"type": ["container", "image"]})
+        self._stream = stream
+        try:
+            for event in stream:
+                if self._stop.is_set():
+                    break
+                self.apply_event(event)
+        finally:
+            self._stream = None
+            stream.close()
+
+
+_cache: Optional[InventoryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_inventory_cache() -> InventoryCache:
+    """
+    Return the process-wide inventory cache bound to the shared Docker engine.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = InventoryCache(get_engine())
+    return _cache
+
+
+def close_inventory_cache():
+    """
+    Stop following Docker events and forget the process-wide inventory cache.
+    """
+    global _cache
+    with _cache_lock:
+        cache, _cache = _cache, None
+    if cache is not None:
+        cache.stop()
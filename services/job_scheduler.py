@@ -0,0 +1,151 @@
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+import config
+from models.docker_model import Job, JobStatus
+from models.exceptions import NoDataFoundException
+
+FINISHED = (JobStatus.succeeded, JobStatus.failed, JobStatus.not_found)
+
+
+class JobScheduler:
+    """
+    In-process queue for slow container operations.
+
+    Jobs on the same target run one at a time in submission order, and at
+    most `max_concurrency` jobs run at once overall; a job waiting for its
+    target does not hold a global slot. Submitting the same action as the
+    target's latest unfinished job returns that job instead of queueing a
+    duplicate. Finished jobs stay pollable for `retention` seconds, and at
+    most `max_jobs` are kept.
+    """
+
+    def __init__(self, max_concurrency: int = config.JOB_MAX_CONCURRENCY,
+                 retention: float = config.JOB_RETENTION,
+                 max_jobs: int = config.JOB_MAX_HISTORY):
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self.jobs: dict[str, Job] = {}
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        # Per target: its lock, how many jobs hold or wait for it, its latest job
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._users: dict[str, int] = {}
+        self._tails: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._job_tasks: dict[str, asyncio.Task] = {}
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def submit(self, action: str, target: str, operation: Callable[[], Awaitable[object]]) -> Job:
+        """
+        Queue `operation` as a job on `target` and return the job right away.
+        """
+        tail = self._tails.get(target)
+        if tail is not None and tail.action == action and tail.status not in FINISHED:
+            return tail
+
+        self._prune()
+        job = Job(id=uuid.uuid4().hex, action=action, target=target, created_at=time.time())
+        self.jobs[job.id] = job
+        self._tails[target] = job
+        lock = self._locks.get(target)
+        if lock is None:
+            lock = self._locks[target] = asyncio.Lock()
+        self._users[target] = self._users.get(target, 0) + 1
+
+        task = asyncio.get_running_loop().create_task(self._run(job, lock, operation))
+        self._tasks.add(task)
+        self._job_tasks[job.id] = task
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _: self._job_tasks.pop(job.id, None))
+        return job
+
+    async def wait(self, job: Job) -> Job:
+        """
+        Wait until `job` has finished and return it. Cancelling the waiter
+        does not cancel the job.
+        """
+        task = self._job_tasks.get(job.id)
+        if task is not None:
+            await asyncio.wait([task])
+        return job
+
+    async def _run(self, job: Job, lock: asyncio.Lock, operation: Callable[[], Awaitable[object]]):
+        try:
+            async with lock, self._slots:
+                job.status = JobStatus.running
+                job.started_at = time.time()
+                started = time.monotonic()
+                try:
+                    await operation()
+                    job.status = JobStatus.succeeded
+                except NoDataFoundException as e:
+                    job.status, job.detail = JobStatus.not_found, str(e)
+                except asyncio.CancelledError:
+                    job.status, job.detail = JobStatus.failed, "Cancelled"
+                    raise
+                except Exception as e:
+                    job.status, job.detail = JobStatus.failed, str(e) or type(e).__name__
+                finally:
+                    job.finished_at = time.time()
+                    job.duration_ms = round((time.monotonic() - started) * 1000, 2)
+        finally:
+            if job.status not in FINISHED:
+                # Cancelled while still waiting for its turn
+                job.status, job.detail, job.finished_at = JobStatus.failed, "Cancelled", time.time()
+            self._users[job.target] -= 1
+            if not self._users[job.target]:
+                del self._users[job.target], self._locks[job.target]
+            if self._tails.get(job.target) is job:
+                del self._tails[job.target]
+
+    def _prune(self):
+        """
+        Forget finished jobs past their retention, and the oldest finished
+        ones while over `max_jobs`.
+        """
+        expired = time.time() - self.retention
+        excess = len(self.jobs) - self.max_jobs + 1
+        for job_id, job in list(self.jobs.items()):
+            if job.status not in FINISHED:
+                continue
+            if job.finished_at < expired or excess > 0:
+                del self.jobs[job_id]
+                excess -= 1
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def close(self):
+        """
+        Cancel queued and running jobs and wait for them to unwind.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_scheduler: Optional[JobScheduler] = None
+
+
+def get_job_scheduler() -> JobScheduler:
+    """
+    Return the process-wide job scheduler.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = JobScheduler()
+    return _scheduler
+
+
+async def close_job_scheduler():
+    """
+    Cancel outstanding jobs and forget the process-wide scheduler.
+    """
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        await scheduler.close()
@@ -0,0 +1,164 @@
+import re
+import time
+from typing import Callable, Optional
+import anyio
+from starlette.responses import StreamingResponse
+
+STDIN, STDOUT, STDERR = 0, 1, 2
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_log_time(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a `since`/`until` value: unix seconds or a duration before now
+    such as "90s", "15m", "2h" or "1d". Raises ValueError otherwise.
+    """
+    if value is None or value == "":
+        return None
+    match = _DURATION.match(value.strip())
+    if match:
+        return (time.time() if now is None else now) - float(match.group(1)) * _UNITS[match.group(2)]
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r} (use unix seconds or e.g. 15m, 2h)") from None
+
+
+def is_multiplexed(content_type: str, first_chunk: bytes) -> bool:
+    """
+    Whether a logs body uses the engine's 8-byte frame headers. Newer engines
+    say so in the content type; older ones send frames as a raw stream too,
+    so those are recognised by their header (stream 0-2, three zero bytes).
+    """
+    if "multiplexed-stream" in content_type:
+        return True
+    return len(first_chunk) >= 8 and first_chunk[0] in (STDIN, STDOUT, STDERR) and first_chunk[1:4] == b"\0\0\0"
+
+
+class FrameDemuxer:
+    """
+    Splits the engine's multiplexed log stream into (stream, payload) pieces.
+
+    Every frame starts with an 8-byte header: the stream (1 stdout,
+    2 stderr), three zero bytes and the big-endian payload length. Headers
+    may be split across reads; payloads are passed on as they arrive, so a
+    huge frame is never buffered whole.
+    """
+
+    def __init__(self):
+        self._header = b""
+        self._stream = STDOUT
+        self._remaining = 0
+
+    def feed(self, data: bytes) -> list[tuple[int, bytes]]:
+        pieces = []
+        position = 0
+        while position < len(data):
+            if self._remaining:
+                end = min(position + self._remaining, len(data))
+                pieces.append((self._stream, data[position:end]))
+                self._remaining -= end - position
+                position = end
+                continue
+            needed = 8 - len(self._header)
+            self._header += data[position:position + needed]
+            position += needed
+            if len(self._header) == 8:
+                self._stream = self._header[0]
+                self._remaining = int.from_bytes(self._header[4:], "big")
+                self._header = b""
+        return pieces
+
+
+class LineSplitter:
+    """
+    Reassembles lines per stream. Lines longer than `max_line` bytes are cut
+    there and the rest of the line is dropped, which bounds the buffer.
+    """
+
+    def __init__(self, max_line: int):
+        self.max_line = max_line
+        self._partial: dict[int, bytes] = {}
+        self._cut: set[int] = set()
+
+    def feed(self, stream: int, data: bytes) -> list[tuple[int, bytes]]:
+        *complete, rest = data.split(b"\n")
+        limit = self.max_line
+        lines = []
+        if complete:
+            head = self._partial.pop(stream, b"") + complete[0]
+            if stream in self._cut:
+                # The end of a line that was already cut
+                self._cut.discard(stream)
+                complete = complete[1:]
+            else:
+                complete[0] = head
+            lines = [(stream, line if len(line) <= limit else line[:limit]) for line in complete]
+        if rest and stream not in self._cut:
+            pending = self._partial.get(stream, b"") + rest
+            if len(pending) > limit:
+                lines.append((stream, pending[:limit]))
+                self._partial.pop(stream, None)
+                self._cut.add(stream)
+            else:
+                self._partial[stream] = pending
+        return lines
+
+    def flush(self) -> list[tuple[int, bytes]]:
+        lines = [(stream, pending) for stream, pending in self._partial.items() if pending]
+        self._partial.clear()
+        self._cut.clear()
+        return lines
+
+
+def line_matcher(grep: Optional[str] = None, regex: Optional[str] = None,
+                 ignore_case: bool = False) -> Optional[Callable[[bytes], bool]]:
+    """
+    Predicate over raw log lines for a substring and/or a regular expression,
+    or None when nothing is filtered. Raises ValueError on an invalid regex.
+    """
+    tests = []
+    if grep:
+        needle = grep.encode()
+        if ignore_case:
+            needle = needle.lower()
+            tests.append(lambda line: needle in line.lower())
+        else:
+            tests.append(lambda line: needle in line)
+    if regex:
+        try:
+            pattern = re.compile(regex.encode(), re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            raise ValueError(f"Invalid regex: {e}") from e
+        tests.append(lambda line: pattern.search(line) is not None)
+    if not tests:
+        return None
+    if len(tests) == 1:
+        return tests[0]
+    return lambda line: all(test(line) for test in tests)
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that notices a client going away even while the body
+    is waiting for data (e.g. a quiet followed log), and always closes the
+    body iterator, so whatever it holds upstream is released right away.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            async with anyio.create_task_group() as task_group:
+                async def stream():
+                    try:
+                        await self.stream_response(send)
+                    except OSError:
+                        # The client is gone
+                        pass
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream)
+                await self.listen_for_disconnect(receive)
+                task_group.cancel_scope.cancel()
+        finally:
+            await self.body_iterator.aclose()
@@ -0,0 +1,276 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+# Request and Docker API latencies, in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Child:
+    """
+    One labelled series.
+
+    Every thread records into its own shard (a plain list of counters), so
+    recording never takes a lock and allocates nothing once the thread's shard
+    exists. Shards are only summed when the registry is rendered.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: list[list] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> list:
+        shard = [0] * self._size
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def totals(self) -> list:
+        with self._lock:
+            shards = list(self._shards)
+        totals = [0] * self._size
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild(_Child):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[0] += amount
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+
+class _HistogramChild(_Child):
+    def __init__(self, buckets: tuple):
+        # One slot per bucket, one for +Inf and one for the running sum
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value: float):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[bisect_left(self._buckets, value)] += 1
+        shard[-1] += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, _Child] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> _Child:
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Return the series of the given label values, creating it on first use.
+        The lookup builds and hashes a label tuple: hot paths look their
+        series up once and keep them.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_text(self, values: tuple, extra: tuple = ()) -> str:
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple, child: _Child) -> list[str]:
+        return [f"{self.name}{self._label_text(values)} {_number(child.totals()[0])}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, values: tuple, child: _Child) -> list[str]:
+        totals = child.totals()
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (math.inf,), totals[:-1]):
+            cumulative += count
+            le = "+Inf" if bound == math.inf else _number(bound)
+            lines.append(f"{self.name}_bucket{self._label_text(values, (('le', le),))} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_number(totals[-1])}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently.")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+HTTP_REQUEST_ERRORS = registry.counter(
+    "http_request_errors_total", "HTTP responses with a 4xx/5xx status by route template.",
+    ("method", "route", "status"))
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.")
+DOCKER_CALL_SECONDS = registry.histogram(
+    "docker_api_call_duration_seconds", "Docker engine API call latency by operation.",
+    ("client", "operation"))
+DOCKER_CALL_ERRORS = registry.counter(
+    "docker_api_call_errors_total", "Failed Docker engine API calls by operation.",
+    ("client", "operation"))
+DOCKER_CALLS_IN_FLIGHT = registry.gauge(
+    "docker_api_calls_in_flight", "Docker engine API calls currently waiting for the daemon.",
+    ("client",))
+INVENTORY_CACHE_LOOKUPS = registry.counter(
+    "inventory_cache_lookups_total", "Listings served from the inventory cache (hit) or the daemon (miss).",
+    ("kind", "result"))
+
+
+class _DockerCallTimer:
+    __slots__ = ("series", "started")
+
+    def __init__(self, series: tuple):
+        # (latency histogram, error counter, in-flight gauge) of the call
+        self.series = series
+        self.started = 0.0
+
+    def __enter__(self):
+        self.series[2].inc()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds, errors, in_flight = self.series
+        seconds.observe(time.perf_counter() - self.started)
+        in_flight.dec()
+        if exc_type is not None:
+            errors.inc()
+        return False
+
+
+# client -> operation -> series of docker_call, so a call does no label lookups
+_docker_series: dict[str, dict[str, tuple]] = {}
+
+
+def docker_call(operation: str, client: str = "sync") -> _DockerCallTimer:
+    """
+    Time one Docker engine API call; a call that raises is counted as an error.
+
+        with docker_call("containers.list"):
+            client.containers.list()
+    """
+    by_operation = _docker_series.get(client)
+    if by_operation is None:
+        by_operation = _docker_series.setdefault(client, {})
+    series = by_operation.get(operation)
+    if series is None:
+        series = by_operation[operation] = (DOCKER_CALL_SECONDS.labels(client, operation),
+                                             DOCKER_CALL_ERRORS.labels(client, operation),
+                                             DOCKER_CALLS_IN_FLIGHT.labels(client))
+    return _DockerCallTimer(series)
+
+
+def record_cache_lookup(kind: str, hit: bool):
+    INVENTORY_CACHE_LOOKUPS.labels(kind, "hit" if hit else "miss").inc()
+
+
+def render_metrics(target: Optional[MetricsRegistry] = None) -> str:
+    """
+    Render the process-wide (or given) registry in the Prometheus text format.
+    """
+    return (target or registry).render()
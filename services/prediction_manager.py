@@ -1,86 +1,425 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
 import docker
-from docker import DockerClient
-from docker.errors import DockerException
+import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from models.docker_model import PredictionResult, ContainerStats
+import config
+from models.docker_model import ContainerAnomaly, PredictionResult, ContainerStats, ContainerForecast
+from services.anomaly_detector import AnomalyDetector
+from services.cgroup_sampler import CgroupSampler, default_cgroup_sampler
+from services.docker_engine import DockerEngine, get_engine
+from services.metrics import docker_call
+from services.stats_broadcaster import summarize_stats
+from services.stats_history import StatsHistory
+from services.stats_sampler import StatsSampler
+from services.stats_store import StatsStore, get_stats_store
+
+STATS_COLUMNS = ["id", "name", "memory_usage", "partial"]
+
+_executors: dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Return a process-wide stats worker pool of the given size.
+    Hung stats calls keep their worker busy, so pools are shared rather than
+    created per request.
+    """
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="container-stats")
+            _executors[max_workers] = executor
+        return executor
 
 
 class ContainerMemoryManager:
-    def __init__(self):
-        try:
-            self.client = docker.from_env()
-        except DockerException as e:
-            print(f"[DockerClient] Docker is not available: {e}")
-            self.client = None
+    def __init__(self, engine: Optional[DockerEngine] = None,
+                 max_workers: int = config.STATS_MAX_WORKERS,
+                 stats_timeout: float = config.STATS_TIMEOUT,
+                 cgroup: Optional[CgroupSampler] = None,
+                 store: Optional[StatsStore] = None):
+        # Without a shared engine the manager owns a private connection
+        self.engine = engine if engine is not None else DockerEngine()
+        self.max_workers = max(1, max_workers)
+        self.stats_timeout = stats_timeout
+        self.cgroup = cgroup
+        self.store = store
+        # Last (monotonic time, cumulative CPU ns) per container, for cgroup CPU rates
+        self._cpu_seen: dict[str, tuple[float, int]] = {}
+        # Host RAM, which the stats API reports as the limit of unlimited containers
+        self._host_memory: Optional[int] = None
 
+        self.history = StatsHistory()
+        self.detector = AnomalyDetector()
+        self.sampler: Optional[StatsSampler] = None
+        self.last_round: Optional[tuple[list[dict], float]] = None
         self.df = pd.DataFrame()
-        self.model = LinearRegression()
 
     def get_client(self):
-        if self.client is None:
-            try:
-                self.client = docker.from_env()
-            except DockerException as e:
-                print(f"[DockerClient] Docker is not available: {e}")
-                return None
-        return self.client
+        return self.engine.get_client()
 
-    def fetch_container_stats(self):
+    def start_sampling(self, interval: float = config.STATS_SAMPLE_INTERVAL):
+        """
+        Start polling container stats in the background into `self.history`.
+        """
+        if self.sampler is None:
+            self.sampler = StatsSampler(self, interval)
+        self.sampler.start()
+
+    def stop_sampling(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def _list_and_collect(self) -> list[dict]:
+        # The sampler and concurrent prediction requests share one stats sweep
+        return self.engine.flights.do("stats.sweep", self._sweep)
+
+    def _sweep(self) -> list[dict]:
         client = self.get_client()
         if client is None:
             raise RuntimeError(
                 "Docker client unavailable. Cannot fetch stats.")
 
-        try:
-            client.ping()
-        except Exception as e:
-            raise RuntimeError(
-                "Docker is not running or not accessible.") from e
+        if not self.engine.is_online():
+            raise RuntimeError("Docker is not running or not accessible.")
+
+        with docker_call("containers.list"):
+            containers = client.containers.list()
+        return self.collect_stats(containers)
+
+    def sample(self):
+        """
+        Take one sampling round and store it in the ring-buffer history and,
+        when configured, the on-disk stats store.
+        """
+        self.record(self._list_and_collect(), time.time())
 
-        containers = client.containers.list()
-        data = []
+    def record(self, rows: list[dict], timestamp: float):
+        """
+        Feed one sampling round into the history, the anomaly detector and
+        the stats store. Rounds sampled by another worker come in here too.
+        """
+        self.last_round = (rows, timestamp)
+        self.history.record(rows, timestamp)
+        self._detect(rows, timestamp)
+        if self.store is not None:
+            self.store.append(rows, timestamp)
 
+    def _detect(self, rows: list[dict], timestamp: float):
+        ids, slots, values, limits = [], [], [], []
+        for row in rows:
+            slot = self.history.slot_of(row["id"])
+            if row.get("partial") or row.get("memory_usage") is None or slot is None:
+                continue
+            ids.append(row["id"])
+            slots.append(slot)
+            values.append(row["memory_usage"])
+            limit = row.get("memory_limit")
+            limits.append(np.nan if limit is None else limit)
+        self.detector.update(ids, np.array(slots, dtype=np.int64), timestamp,
+                             np.array(values), np.array(limits))
+
+    def fetch_container_stats(self):
+        data = self._list_and_collect()
+        self.record(data, time.time())
+
+        self.df = pd.DataFrame(data, columns=STATS_COLUMNS)
+        self.df['index'] = self.df.index
+
+    def collect_stats(self, containers) -> list[dict]:
+        """
+        Read the memory usage of all containers.
+
+        With a cgroup sampler, containers whose cgroup can be read locally
+        are sampled from it directly; the rest go through the stats API.
+        """
+        if self.cgroup is None or not containers:
+            return self._collect_from_api(containers)
+
+        self.cgroup.retain(container.id for container in containers)
+        listed = {container.id for container in containers}
+        for container_id in [c for c in self._cpu_seen if c not in listed]:
+            del self._cpu_seen[container_id]
+
+        local, remaining = {}, []
         for container in containers:
-            try:
-                stats = container.stats(stream=False)
-                memory_mb = stats["memory_stats"]["usage"] / (1024 ** 2)
-                data.append({
+            counters = self.cgroup.read(container.id)
+            if counters is None:
+                remaining.append(container)
+            else:
+                limit = counters["memory_limit"]
+                local[container.id] = {
+                    "id": container.id,
                     "name": container.name,
-                    "memory_usage": memory_mb
-                })
+                    "memory_usage": counters["memory_usage"] / (1024 ** 2),
+                    "memory_limit": limit / (1024 ** 2) if limit is not None else None,
+                    "cpu_percent": self._cpu_percent(container.id, counters["cpu_usage_ns"]),
+                    "partial": False,
+                }
+        if not remaining:
+            return list(local.values())
+
+        from_api = {row["id"]: row for row in self._collect_from_api(remaining)}
+        return [local.get(container.id) or from_api[container.id]
+                for container in containers
+                if container.id in local or container.id in from_api]
+
+    def _cpu_percent(self, container_id: str, usage_ns: Optional[int]) -> Optional[float]:
+        """
+        CPU use since the container's previous reading, in percent of one
+        core (like `docker stats`). None on the first reading.
+        """
+        if usage_ns is None:
+            return None
+        now = time.monotonic()
+        previous = self._cpu_seen.get(container_id)
+        self._cpu_seen[container_id] = (now, usage_ns)
+        if previous is None or now <= previous[0] or usage_ns < previous[1]:
+            return None
+        return (usage_ns - previous[1]) / ((now - previous[0]) * 1e9) * 100
+
+    def _collect_from_api(self, containers) -> list[dict]:
+        """
+        Read stats for all containers concurrently through the stats API.
+
+        At most `max_workers` stats calls run at once and each gets
+        `stats_timeout` seconds once it has started. Containers that miss
+        their deadline are returned as partial rows without a memory reading;
+        containers whose stats call fails are skipped.
+        """
+        if not containers:
+            return []
+
+        executor = _get_executor(self.max_workers)
+        started: dict[int, float] = {}
+
+        def read(index, container):
+            started[index] = time.monotonic()
+            return self._read_container_stats(container)
+
+        futures = {executor.submit(read, i, c): i
+                   for i, c in enumerate(containers)}
+        results: dict[int, dict] = {}
+        pending = set(futures)
+        # Hard stop for containers still queued behind hung ones
+        waves = -(-len(containers) // self.max_workers)
+        hard_deadline = time.monotonic() + self.stats_timeout * waves
+
+        while pending:
+            now = time.monotonic()
+            deadlines = [started[futures[f]] + self.stats_timeout
+                         for f in pending if futures[f] in started]
+            next_deadline = min(deadlines + [hard_deadline])
+            done, pending = wait(pending, timeout=max(0.0, next_deadline - now),
+                                 return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = futures[future]
+                container = containers[index]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(
+                        f"⚠️ Could not fetch stats for container {container.name}: {e}")
+
+            now = time.monotonic()
+            for future in list(pending):
+                index = futures[future]
+                expired = now >= hard_deadline or (
+                    index in started and now - started[index] >= self.stats_timeout)
+                if expired:
+                    future.cancel()
+                    pending.discard(future)
+                    container = containers[index]
+                    print(
+                        f"⚠️ Stats for container {container.name} timed out after {self.stats_timeout}s.")
+                    results[index] = {
+                        "id": container.id,
+                        "name": container.name,
+                        "memory_usage": None,
+                        "partial": True,
+                    }
+
+        return [results[i] for i in sorted(results)]
+
+    def _read_container_stats(self, container) -> dict:
+        with docker_call("stats"):
+            stats = container.stats(stream=False)
+        memory_mb = stats["memory_stats"]["usage"] / (1024 ** 2)
+        limit = self._memory_limit(container, stats["memory_stats"].get("limit"))
+        return {
+            "id": container.id,
+            "name": container.name,
+            "memory_usage": memory_mb,
+            "memory_limit": limit / (1024 ** 2) if limit else None,
+            "cpu_percent": summarize_stats(stats)["cpu_percent"] if "cpu_stats" in stats else None,
+            "partial": False,
+        }
+
+    def _memory_limit(self, container, reported: Optional[int]) -> Optional[int]:
+        """
+        The container's memory limit in bytes, None when it has none. The
+        stats API reports host RAM for unlimited containers, so the limit is
+        taken from the inspect data (0 means unlimited) when the container
+        has it, and a reported limit equal to host RAM is ignored otherwise.
+        """
+        attrs = container.attrs if isinstance(getattr(container, "attrs", None), dict) else {}
+        configured = (attrs.get("HostConfig") or {}).get("Memory")
+        if isinstance(configured, int):
+            return configured or None
+        if not reported:
+            return None
+        if self._host_memory is None:
+            try:
+                with docker_call("info"):
+                    total = self.get_client().info().get("MemTotal")
+                self._host_memory = total if isinstance(total, int) else 0
             except Exception as e:
-                print(
-                    f"⚠️ Could not fetch stats for container {container.name}: {e}")
+                print(f"⚠️ Could not read the host's memory: {e}")
+                return reported
+        return None if reported == self._host_memory else reported
 
-        self.df = pd.DataFrame(data)
-        self.df['index'] = self.df.index
+    def forecast(self, steps: int = config.FORECAST_STEPS,
+                 confidence: float = config.FORECAST_CONFIDENCE) -> list[ContainerForecast]:
+        """
+        Forecast the next `steps` memory readings of every sampled container.
+        The per-container trends are solved together from the history's
+        running least-squares sums.
+        """
+        ids, names, slots = self.history.active()
+        if not ids:
+            return []
+
+        step_seconds = self.sampler.interval if self.sampler else config.STATS_SAMPLE_INTERVAL
+        predicted, lower, upper = self.history.trend.forecast(
+            slots, steps, step_seconds, confidence)
+        slope, *_ = self.history.trend.coefficients(slots)
+        samples = self.history.trend.n[slots]
+        predicted, lower = np.maximum(predicted, 0.0), np.maximum(lower, 0.0)
+
+        return [
+            ContainerForecast(
+                id=container_id,
+                name=name,
+                samples=int(samples[i]),
+                slope_mb_per_min=float(slope[i] * 60),
+                step_seconds=step_seconds,
+                predicted=predicted[i].tolist(),
+                lower=lower[i].tolist(),
+                upper=upper[i].tolist(),
+            )
+            for i, (container_id, name) in enumerate(zip(ids, names))
+            if samples[i] > 0
+        ]
+
+    def anomalies(self, flagged_only: bool = False) -> list[ContainerAnomaly]:
+        """
+        Leak and spike state of every sampled container, worst first:
+        flagged containers, then by time to their memory limit.
+        """
+        ids, names, slots = self.history.active()
+        anomalies = self.detector.evaluate(ids, names, slots)
+        if flagged_only:
+            anomalies = [a for a in anomalies if a.leak or a.spike]
+        return sorted(anomalies, key=lambda a: (
+            not (a.leak or a.spike),
+            a.time_to_limit_seconds if a.time_to_limit_seconds is not None else float("inf")))
 
     def predict_memory_usage(self) -> PredictionResult:
-        if self.df.empty:
+        if not len(self.history) and self.df.empty:
             self.fetch_container_stats()
 
-        container_data = [
-            ContainerStats(name=row['name'], memory_usage=row['memory_usage'])
-            for _, row in self.df.iterrows()
-        ]
+        forecasts, anomalies = [], []
+        if len(self.history):
+            # Served from the sampler's ring buffers, no daemon round trip
+            container_data = [
+                ContainerStats(name=row['name'], memory_usage=row['memory_usage'],
+                               partial=row['memory_usage'] is None)
+                for row in self.history.latest()
+            ]
+            forecasts = self.forecast()
+            anomalies = self.anomalies()
+        else:
+            container_data = [
+                ContainerStats(name=row['name'],
+                               memory_usage=None if pd.isna(row['memory_usage']) else row['memory_usage'],
+                               partial=bool(row.get('partial', False)))
+                for _, row in self.df.iterrows()
+            ]
 
-        predicted = max(0, self.df['memory_usage'].mean())
+        if forecasts:
+            next_values = [forecast.predicted[0] for forecast in forecasts]
+        else:
+            next_values = [stats.memory_usage for stats in container_data if not stats.partial]
+        predicted = max(0.0, sum(next_values) / len(next_values)) if next_values else 0.0
 
         summary_lines = [
-            f"- Container **{row['name']}** is currently using {row['memory_usage']:.2f} MB of memory."
-            for _, row in self.df.iterrows()
+            f"- Container **{stats.name}** did not report stats in time."
+            if stats.partial else
+            f"- Container **{stats.name}** is currently using {stats.memory_usage:.2f} MB of memory."
+            for stats in container_data
         ]
+        summary_lines.extend(
+            f"- Container **{forecast.name}** is trending {forecast.slope_mb_per_min:+.2f} MB/min, "
+            f"next reading {forecast.predicted[0]:.2f} MB "
+            f"({forecast.lower[0]:.2f}–{forecast.upper[0]:.2f} MB)."
+            for forecast in forecasts if forecast.samples > 1
+        )
+        for anomaly in anomalies:
+            if anomaly.leak:
+                eta = (f", reaching its limit in {anomaly.time_to_limit_seconds / 60:.0f} min"
+                       if anomaly.time_to_limit_seconds is not None else "")
+                summary_lines.append(f"- ⚠️ Container **{anomaly.name}** looks like it is leaking memory{eta}.")
+            if anomaly.spike:
+                summary_lines.append(
+                    f"- ⚠️ Container **{anomaly.name}** memory spiked (z-score {anomaly.zscore:+.1f}).")
 
         summary_lines.append(
             f"\n🔮 Predicted memory usage for the next container or time step: **{predicted:.2f} MB**."
         )
         summary_lines.append(
-            f"\n📢 Summary: Based on current average usage, next memory reading is estimated around {predicted:.1f} MB."
+            f"\n📢 Summary: Based on per-container trends, next average memory reading is estimated around {predicted:.1f} MB."
         )
 
         return PredictionResult(
             data=container_data,
             predicted_next=predicted,
-            summary="\n".join(summary_lines)
+            summary="\n".join(summary_lines),
+            forecasts=forecasts,
+            anomalies=anomalies
         )
+
+
+_manager: Optional[ContainerMemoryManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_memory_manager() -> ContainerMemoryManager:
+    """
+    Return the process-wide memory manager bound to the shared Docker engine.
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ContainerMemoryManager(get_engine(), cgroup=default_cgroup_sampler(),
+                                                  store=get_stats_store())
+    return _manager
+
+
+def close_memory_manager():
+    """
+    Stop the background sampler and forget the process-wide memory manager.
+    """
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.stop_sampling()
+        if manager.cgroup is not None:
+            manager.cgroup.close()
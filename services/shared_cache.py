@@ -0,0 +1,278 @@
+import fcntl
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Optional
+import config
+from services.docker_engine import DockerEngine, get_engine
+from services.inventory_cache import InventoryCache, get_inventory_cache
+
+# magic, sequence, payload length, payload crc32, publish time (unix seconds)
+_HEADER = struct.Struct("<8sQQQd")
+_MAGIC = b"DKSHM001"
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_READ_ATTEMPTS = 100
+
+
+class Segment:
+    """
+    One JSON document in a memory-mapped file, published by a single writer
+    and read by any number of processes without locks.
+
+    Writes follow a seqlock: the sequence number is made odd, the payload
+    and its checksum are written, then the sequence is made even again.
+    Readers copy the payload between two reads of the sequence and retry
+    when it changed, was odd or the checksum does not match. A reader whose
+    sequence is unchanged gets its cached, already decoded document back
+    after reading only the header.
+    """
+
+    def __init__(self, path: str, initial_size: int = 64 * 1024):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < _HEADER.size:
+            os.ftruncate(self._fd, _HEADER.size + initial_size)
+        self._map = mmap.mmap(self._fd, 0)
+        self._seen = 0
+        self._value: Any = None
+        self.published: Optional[float] = None
+
+    def _remap(self):
+        self._map.close()
+        self._map = mmap.mmap(self._fd, 0)
+
+    def write(self, value: Any):
+        payload = json.dumps(value, separators=(",", ":")).encode()
+        magic, seq, *_ = _HEADER.unpack_from(self._map, 0)
+        # A previous leader may have died mid-write and left the sequence odd
+        seq = seq + seq % 2 if magic == _MAGIC else 0
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, seq + 1)
+        if _HEADER.size + len(payload) > len(self._map):
+            # Files only ever grow: readers may still map the old size
+            size = os.fstat(self._fd).st_size
+            if _HEADER.size + len(payload) > size:
+                os.ftruncate(self._fd, _HEADER.size + 2 * len(payload))
+            self._remap()
+        self._map[_HEADER.size:_HEADER.size + len(payload)] = payload
+        _HEADER.pack_into(self._map, 0, _MAGIC, seq + 1, len(payload),
+                          zlib.crc32(payload), time.time())
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, seq + 2)
+        self._seen, self._value = seq + 2, value
+
+    def read(self) -> Any:
+        """
+        The latest published document, or None before the first write.
+        """
+        for _ in range(_READ_ATTEMPTS):
+            magic, seq, length, crc, published = _HEADER.unpack_from(self._map, 0)
+            if magic != _MAGIC or seq == 0:
+                return None
+            if seq == self._seen:
+                return self._value
+            if seq % 2:
+                time.sleep(0)
+                continue
+            if _HEADER.size + length > len(self._map):
+                self._remap()
+                continue
+            payload = self._map[_HEADER.size:_HEADER.size + length]
+            if _SEQ.unpack_from(self._map, _SEQ_OFFSET)[0] == seq and zlib.crc32(payload) == crc:
+                self._seen, self._value, self.published = seq, json.loads(payload), published
+                return self._value
+        return self._value
+
+    @property
+    def sequence(self) -> int:
+        return self._seen
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+class SharedCache:
+    """
+    Lets several worker processes share one set of Docker pollers.
+
+    The worker holding the directory's lock is the leader: it runs the
+    inventory cache's event stream, the health monitor and (once any worker
+    asked for predictions) the stats sampler, and publishes their state to
+    memory-mapped `Segment`s every `interval` seconds. The other workers
+    follow: they run none of these pollers and load the published inventory,
+    health and stats into their own in-process copies, so adding workers does
+    not add Docker API traffic. When the leader exits its lock is released
+    and the next follower to try takes over.
+    """
+
+    def __init__(self, path: str, engine: DockerEngine, inventory: InventoryCache,
+                 interval: float = config.SHARED_CACHE_INTERVAL):
+        self.path = path
+        self.engine = engine
+        self.inventory = inventory
+        self.interval = interval
+        os.makedirs(path, exist_ok=True)
+        self.segments = {name: Segment(os.path.join(path, f"{name}.seg"))
+                         for name in ("inventory", "health", "stats")}
+        self.leader = False
+        self._lock_fd = os.open(os.path.join(path, "leader.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        self._wanted = os.path.join(path, "stats.wanted")
+        self._published_version: Optional[str] = None
+        self._published_round: Optional[float] = None
+        self._mirrored_round: Optional[float] = None
+        self._tick_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _try_lead(self) -> bool:
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        self.leader = True
+        print(f"[SharedCache] Worker {os.getpid()} is now the leader.")
+        self._start_sources()
+        return True
+
+    def _start_sources(self):
+        self.engine.start_monitoring()
+        self.inventory.start()
+        if self.stats_wanted():
+            self._start_sampling()
+
+    def _start_sampling(self):
+        from services.prediction_manager import get_memory_manager
+
+        get_memory_manager().start_sampling()
+
+    def stats_wanted(self) -> bool:
+        return "services.prediction_manager" in sys.modules or os.path.exists(self._wanted)
+
+    def request_stats(self):
+        """
+        Ask the leader to start sampling container stats.
+        """
+        if not os.path.exists(self._wanted):
+            with open(self._wanted, "a"):
+                pass
+
+    def publish(self):
+        """
+        Leader: publish health every tick, inventory and stats when they changed.
+        """
+        self.segments["health"].write({
+            "state": self.engine.health.state,
+            "inventory_ready": self.inventory.ready,
+            "pid": os.getpid(),
+        })
+        if self.inventory.tag != self._published_version:
+            self._published_version = self.inventory.tag
+            self.segments["inventory"].write(self.inventory.snapshot())
+
+        manager = self._local_manager()
+        if manager is None and os.path.exists(self._wanted):
+            self._start_sampling()
+        elif manager is not None and manager.last_round is not None:
+            rows, timestamp = manager.last_round
+            if timestamp != self._published_round:
+                self._published_round = timestamp
+                self.segments["stats"].write({"timestamp": timestamp, "rows": rows})
+
+    def mirror(self):
+        """
+        Follower: load what the leader published, if it is still alive.
+        """
+        health = self.segments["health"].read()
+        published = self.segments["health"].published
+        if health is None or published is None or time.time() - published > max(2.0, 4 * self.interval):
+            return
+        self.engine.health.adopt(health["state"])
+
+        inventory = self.segments["inventory"].read()
+        if inventory is not None and f"{inventory['epoch']}-{inventory['version']}" != self.inventory.tag:
+            self.inventory.adopt(inventory)
+        if health["inventory_ready"]:
+            self.inventory.mark_synced()
+
+        manager = self._local_manager()
+        stats = self.segments["stats"].read()
+        if manager is not None and stats is not None and stats["timestamp"] != self._mirrored_round:
+            self._mirrored_round = stats["timestamp"]
+            manager.record(stats["rows"], stats["timestamp"])
+
+    @staticmethod
+    def _local_manager():
+        module = sys.modules.get("services.prediction_manager")
+        return module._manager if module is not None else None
+
+    def tick(self):
+        # Also called from request threads, e.g. to pick up stats right away
+        with self._tick_lock:
+            if not self.leader:
+                self._try_lead()
+            if self.leader:
+                self.publish()
+            else:
+                self.mirror()
+
+    def start(self):
+        """
+        Elect a leader right away, then keep publishing or mirroring in the
+        background.
+        """
+        self.tick()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shared-cache", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"[SharedCache] Tick failed: {e}")
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        for segment in self.segments.values():
+            segment.close()
+        # Closing the descriptor releases the leader lock
+        os.close(self._lock_fd)
+        self.leader = False
+
+
+_shared: Optional[SharedCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """
+    Return the process-wide shared cache, or None when SHARED_CACHE_PATH is
+    not configured.
+    """
+    global _shared
+    if not config.SHARED_CACHE_PATH:
+        return None
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = SharedCache(config.SHARED_CACHE_PATH, get_engine(), get_inventory_cache())
+    return _shared
+
+
+def close_shared_cache():
+    global _shared
+    with _shared_lock:
+        shared, _shared = _shared, None
+    if shared is not None:
+        shared.close()
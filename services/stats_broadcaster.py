@@ -0,0 +1,135 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import config
+from services.async_docker_client import AsyncDockerClient, get_async_engine
+
+# Published to subscribers when the upstream stream ends
+END_OF_STREAM = None
+
+
+def summarize_stats(raw: dict) -> dict:
+    """
+    Reduce an engine stats sample to CPU, memory and network figures.
+    """
+    cpu, precpu = raw.get("cpu_stats") or {}, raw.get("precpu_stats") or {}
+    cpu_delta = (cpu.get("cpu_usage", {}).get("total_usage", 0)
+                 - precpu.get("cpu_usage", {}).get("total_usage", 0))
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online_cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or [1])
+    cpu_percent = cpu_delta / system_delta * online_cpus * 100 if system_delta > 0 and cpu_delta > 0 else 0.0
+
+    memory = raw.get("memory_stats") or {}
+    networks = (raw.get("networks") or {}).values()
+    return {
+        "read": raw.get("read"),
+        "cpu_percent": round(cpu_percent, 2),
+        "memory_usage": round(memory.get("usage", 0) / (1024 ** 2), 2),
+        "memory_limit": round(memory.get("limit", 0) / (1024 ** 2), 2),
+        "network_rx_bytes": sum(n.get("rx_bytes", 0) for n in networks),
+        "network_tx_bytes": sum(n.get("tx_bytes", 0) for n in networks),
+    }
+
+
+class _Channel:
+    def __init__(self, container_id: str):
+        self.container_id = container_id
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+
+class StatsBroadcaster:
+    """
+    Fans one upstream `stats(stream=True)` subscription per container out to
+    any number of subscribers.
+
+    Every subscriber gets a bounded queue; when a slow subscriber's queue is
+    full the oldest sample is dropped so the upstream never waits. The
+    upstream stream is opened with the first subscriber and closed when the
+    last one leaves, so daemon load does not grow with the audience.
+    """
+
+    def __init__(self, client: AsyncDockerClient, queue_size: int = config.STATS_STREAM_QUEUE_SIZE):
+        self.client = client
+        self.queue_size = queue_size
+        self._channels: dict[str, _Channel] = {}
+
+    @property
+    def upstreams(self) -> int:
+        return len(self._channels)
+
+    @asynccontextmanager
+    async def subscribe(self, container_id: str) -> AsyncIterator[asyncio.Queue]:
+        """
+        Subscribe to the samples of a container. Yields a queue of summarized
+        samples; END_OF_STREAM is queued when the upstream ends.
+        """
+        channel = self._channels.get(container_id)
+        if channel is None:
+            channel = self._channels[container_id] = _Channel(container_id)
+            channel.task = asyncio.create_task(self._pump(channel))
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        channel.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.subscribers:
+                await self._teardown(channel)
+
+    def _publish(self, channel: _Channel, item):
+        for queue in channel.subscribers:
+            if queue.full():
+                # Drop the oldest sample rather than block the upstream
+                queue.get_nowait()
+                channel.dropped += 1
+            queue.put_nowait(item)
+
+    async def _pump(self, channel: _Channel):
+        try:
+            async for raw in self.client.stats_stream(channel.container_id):
+                self._publish(channel, summarize_stats(raw))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[StatsBroadcaster] Stats stream of {channel.container_id} failed: {e}")
+            self._publish(channel, {"error": str(e)})
+        if self._channels.get(channel.container_id) is channel:
+            del self._channels[channel.container_id]
+        self._publish(channel, END_OF_STREAM)
+
+    async def _teardown(self, channel: _Channel):
+        if self._channels.get(channel.container_id) is channel:
+            del self._channels[channel.container_id]
+        if channel.task is not None and not channel.task.done():
+            channel.task.cancel()
+            await asyncio.gather(channel.task, return_exceptions=True)
+
+    async def close(self):
+        for channel in list(self._channels.values()):
+            await self._teardown(channel)
+
+
+_broadcaster: Optional[StatsBroadcaster] = None
+
+
+def get_stats_broadcaster() -> StatsBroadcaster:
+    """
+    Return the process-wide stats broadcaster bound to the async Docker engine.
+    """
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = StatsBroadcaster(AsyncDockerClient(get_async_engine()))
+    return _broadcaster
+
+
+async def close_stats_broadcaster():
+    """
+    Close every upstream stats stream and forget the process-wide broadcaster.
+    """
+    global _broadcaster
+    broadcaster, _broadcaster = _broadcaster, None
+    if broadcaster is not None:
+        await broadcaster.close()
@@ -0,0 +1,213 @@
+import threading
+from typing import Iterable, Optional
+import numpy as np
+import config
+from services.forecast import TrendForecaster
+
+BYTES_PER_VALUE = np.dtype(np.float64).itemsize
+
+
+class StatsHistory:
+    """
+    Ring buffers of container samples.
+
+    Every container gets one slot (a row) in a set of 2D float64 arrays: one
+    for timestamps and one per metric, each `window` samples wide. Appending
+    a sample overwrites the oldest one in place. The arrays start with
+    `initial_capacity` rows and grow by doubling, up to `max_containers`,
+    when a new container finds no free slot; only then does an append
+    allocate (and copy the arrays). Slots of containers that disappear are
+    freed and reused.
+
+    Memory use is bounded by:
+
+        max_containers * window * (1 + len(metrics)) * 8 bytes
+
+    e.g. 500 containers * 360 samples * 2 arrays * 8 B = 2.9 MB.
+
+    The `trend_metric` is additionally tracked by a TrendForecaster whose
+    running sums are updated in O(1) on every append, and rebuilt from the
+    buffers every `refit_every` recorded rounds (see `refit`).
+    """
+
+    def __init__(self, window: int = config.STATS_WINDOW,
+                 max_containers: int = config.STATS_MAX_CONTAINERS,
+                 metrics: Iterable[str] = ("memory_usage",),
+                 trend_metric: str = "memory_usage",
+                 initial_capacity: int = 16,
+                 refit_every: int = config.STATS_REFIT_ROUNDS):
+        self.window = window
+        self.refit_every = refit_every
+        self._rounds = 0
+        self.max_containers = max_containers
+        self.metrics = tuple(metrics)
+        self.trend_metric = trend_metric
+        self.trend = TrendForecaster()
+        self._lock = threading.RLock()
+        self._slots: dict[str, int] = {}
+        self._names: list[Optional[str]] = []
+        self._free: list[int] = []
+        self._capacity = 0
+        self.timestamps = np.empty((0, window))
+        self.values = {metric: np.empty((0, window)) for metric in self.metrics}
+        self.head = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self._grow(min(initial_capacity, max_containers))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes held by the sample arrays at their current capacity.
+        """
+        return self._capacity * self.window * (1 + len(self.metrics)) * BYTES_PER_VALUE
+
+    def _grow(self, capacity: int):
+        extra = capacity - self._capacity
+        if extra <= 0:
+            return
+        self.timestamps = np.vstack([self.timestamps, np.zeros((extra, self.window))])
+        for metric in self.metrics:
+            self.values[metric] = np.vstack(
+                [self.values[metric], np.zeros((extra, self.window))])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.trend.resize(capacity)
+        self._names.extend([None] * extra)
+        self._free.extend(range(capacity - 1, self._capacity - 1, -1))
+        self._capacity = capacity
+
+    def _allocate(self, container_id: str, name: str) -> Optional[int]:
+        if not self._free:
+            if self._capacity >= self.max_containers:
+                return None
+            self._grow(min(self._capacity * 2 or 1, self.max_containers))
+        slot = self._free.pop()
+        self._slots[container_id] = slot
+        self._names[slot] = name
+        self.head[slot] = 0
+        self.count[slot] = 0
+        self.trend.reset(slot)
+        return slot
+
+    def slot_of(self, container_id: str) -> Optional[int]:
+        return self._slots.get(container_id)
+
+    def append(self, container_id: str, name: str, timestamp: float, **values: float) -> Optional[int]:
+        """
+        Append one sample for a container, evicting its oldest sample when full.
+        Returns the container's slot, or None when `max_containers` is reached.
+        """
+        with self._lock:
+            slot = self._slots.get(container_id)
+            if slot is None:
+                slot = self._allocate(container_id, name)
+                if slot is None:
+                    print(f"[StatsHistory] Dropping sample for {name}: "
+                          f"history is full ({self.max_containers} containers).")
+                    return None
+            self._names[slot] = name
+
+            position = self.head[slot]
+            trend_values = self.values[self.trend_metric]
+            if self.count[slot] == self.window:
+                evicted_t = self.timestamps[slot, position]
+                evicted_y = trend_values[slot, position]
+            else:
+                evicted_t = evicted_y = np.nan
+            self.trend.observe(slot, timestamp, values.get(self.trend_metric, np.nan),
+                               evicted_t, evicted_y)
+
+            self.timestamps[slot, position] = timestamp
+            for metric in self.metrics:
+                self.values[metric][slot, position] = values.get(metric, np.nan)
+            self.head[slot] = (position + 1) % self.window
+            self.count[slot] = min(self.count[slot] + 1, self.window)
+            return slot
+
+    def evict(self, container_id: str):
+        """
+        Forget a container and release its slot.
+        """
+        with self._lock:
+            slot = self._slots.pop(container_id, None)
+            if slot is None:
+                return
+            self._names[slot] = None
+            self.count[slot] = 0
+            self.head[slot] = 0
+            self.trend.reset(slot)
+            self._free.append(slot)
+
+    def record(self, rows: list[dict], timestamp: float):
+        """
+        Store one sampling round. Containers missing from `rows` are evicted;
+        partial rows keep their slot but add no sample.
+        """
+        with self._lock:
+            seen = {row["id"] for row in rows}
+            for container_id in [cid for cid in self._slots if cid not in seen]:
+                self.evict(container_id)
+
+            for row in rows:
+                if row.get("partial"):
+                    continue
+                self.append(row["id"], row["name"], timestamp,
+                            **{metric: row.get(metric, np.nan) for metric in self.metrics})
+
+            self._rounds += 1
+            if self.refit_every and self._rounds % self.refit_every == 0:
+                self.refit()
+
+    def active(self):
+        """
+        Return (ids, names, slots) of all tracked containers.
+        """
+        with self._lock:
+            ids = list(self._slots)
+            slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(ids))
+            return ids, [self._names[slot] for slot in slots], slots
+
+    def refit(self):
+        """
+        Rebuild the trend sums of every container from the buffers in one
+        vectorized pass, discarding floating point drift of the running sums.
+        Each container's time origin moves to its oldest buffered sample, so
+        the time offsets (and Σt²) stay as small as the window.
+        """
+        with self._lock:
+            _, _, slots = self.active()
+            if not len(slots):
+                return
+            mask = np.arange(self.window)[None, :] < self.count[slots][:, None]
+            self.trend.fit_arrays(slots, self.timestamps[slots],
+                                  self.values[self.trend_metric][slots], mask)
+
+    def latest(self, metric: str = "memory_usage") -> list[dict]:
+        """
+        Return the most recent value of `metric` for every tracked container.
+        """
+        with self._lock:
+            rows = []
+            for container_id, slot in self._slots.items():
+                if self.count[slot] == 0:
+                    value = None
+                else:
+                    value = float(self.values[metric][slot, (self.head[slot] - 1) % self.window])
+                rows.append({"id": container_id, "name": self._names[slot],
+                             "slot": slot, metric: value})
+            return rows
+
+    def series(self, container_id: str, metric: str = "memory_usage"):
+        """
+        Return (timestamps, values) for one container in chronological order.
+        """
+        with self._lock:
+            slot = self._slots.get(container_id)
+            if slot is None:
+                return np.empty(0), np.empty(0)
+            count = self.count[slot]
+            order = (self.head[slot] - count + np.arange(count)) % self.window
+            return self.timestamps[slot, order].copy(), self.values[metric][slot, order].copy()
@@ -0,0 +1,45 @@
+import threading
+import time
+import config
+
+
+class StatsSampler:
+    """
+    Background thread that samples container stats on a fixed interval.
+    Each round is handed to `manager.sample()`, which stores it in the
+    manager's in-memory history.
+    """
+
+    def __init__(self, manager, interval: float = config.STATS_SAMPLE_INTERVAL):
+        self.manager = manager
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stats-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.manager.sample()
+            except Exception as e:
+                print(f"[StatsSampler] Sampling failed: {e}")
+            elapsed = time.monotonic() - started
+            self._stop.wait(max(0.0, self.interval - elapsed))
@@ -0,0 +1,302 @@
+import fcntl
+import math
+import os
+import threading
+import time
+from typing import Optional
+import numpy as np
+import config
+
+# One fixed-width little-endian record per sample (or per rolled-up bucket)
+RECORD = np.dtype([
+    ("t", "<f8"),            # unix seconds; bucket start for rollups
+    ("memory", "<f4"),       # mean memory usage, MB
+    ("memory_max", "<f4"),   # peak memory usage, MB
+    ("cpu", "<f4"),          # mean CPU percent, NaN when unknown
+    ("samples", "<u4"),      # raw samples behind the record
+])
+
+# Tiers from finest to coarsest, with their bucket width in seconds
+RESOLUTIONS = {"raw": 0, "1m": 60, "1h": 3600}
+# Finest tier that can still answer a range without returning more points
+MAX_POINTS = 5000
+# Files are only rewritten for retention once this share of them has expired
+_COMPACT_RATIO = 0.1
+
+
+def aggregate(records: np.ndarray, step: float) -> np.ndarray:
+    """
+    Downsample time-ordered records into `step`-second buckets in one
+    vectorized pass. Memory and CPU are averaged weighted by sample count.
+    """
+    if not len(records) or step <= 0:
+        return np.array(records, dtype=RECORD)
+    buckets = np.floor(records["t"] / step) * step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+
+    samples = records["samples"].astype(np.float64)
+    cpu = records["cpu"].astype(np.float64)
+    has_cpu = ~np.isnan(cpu)
+    cpu_weight = np.add.reduceat(np.where(has_cpu, samples, 0.0), starts)
+    cpu_sum = np.add.reduceat(np.where(has_cpu, cpu * samples, 0.0), starts)
+    total = np.add.reduceat(samples, starts)
+
+    out = np.empty(len(starts), dtype=RECORD)
+    out["t"] = buckets[starts]
+    out["memory"] = np.add.reduceat(records["memory"] * samples, starts) / total
+    out["memory_max"] = np.maximum.reduceat(records["memory_max"], starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["cpu"] = np.where(cpu_weight > 0, cpu_sum / cpu_weight, np.nan)
+    out["samples"] = total
+    return out
+
+
+def _map(path: str) -> np.ndarray:
+    """
+    Memory-map a record file read-only. A torn record left by a crash at
+    the end of the file is ignored.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return np.empty(0, dtype=RECORD)
+    count = size // RECORD.itemsize
+    if not count:
+        return np.empty(0, dtype=RECORD)
+    return np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+
+
+class StatsStore:
+    """
+    Append-only on-disk history of container samples.
+
+    Every container has one file of fixed-width `RECORD`s per resolution
+    (`<path>/<resolution>/<container id>.bin`), ordered by time. Samples are
+    appended to the raw tier; a background thread rolls complete buckets up
+    into the 1 minute and 1 hour tiers and drops records older than each
+    tier's retention. Reads memory-map the files and binary-search the
+    timestamps, so a range query only touches the pages it returns.
+
+    Only one process may write a store: the first to take the directory's
+    lock. Stores opened by other processes (e.g. further uvicorn workers)
+    are read-only and skip appends, rollups and retention.
+    """
+
+    def __init__(self, path: str = config.STATS_STORE_PATH,
+                 retention: Optional[dict[str, float]] = None,
+                 rollup_interval: float = config.STATS_STORE_ROLLUP_INTERVAL):
+        self.path = path
+        self.retention = retention or {
+            "raw": config.STATS_STORE_RETENTION_RAW,
+            "1m": config.STATS_STORE_RETENTION_1M,
+            "1h": config.STATS_STORE_RETENTION_1H,
+        }
+        self.rollup_interval = rollup_interval
+        for resolution in RESOLUTIONS:
+            os.makedirs(os.path.join(path, resolution), exist_ok=True)
+        self._lock = threading.Lock()
+        self._lock_file = open(os.path.join(path, ".writer.lock"), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.writable = True
+        except OSError:
+            self.writable = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _file(self, resolution: str, container_id: str) -> str:
+        # Ids come from the engine but also from URLs; never leave the store
+        if not container_id or "/" in container_id or container_id.startswith("."):
+            raise ValueError(f"Invalid container id: {container_id!r}")
+        return os.path.join(self.path, resolution, f"{container_id}.bin")
+
+    def _append(self, resolution: str, container_id: str, records: np.ndarray):
+        with open(self._file(resolution, container_id), "ab") as file:
+            size = file.tell()
+            if size % RECORD.itemsize:
+                # Drop a record torn by a crash so the file stays aligned
+                file.truncate(size - size % RECORD.itemsize)
+            file.write(records.tobytes())
+
+    def append(self, rows: list[dict], timestamp: float):
+        """
+        Store one sampling round in the raw tier. Partial rows are skipped.
+        """
+        if not self.writable:
+            return
+        record = np.empty(1, dtype=RECORD)
+        with self._lock:
+            for row in rows:
+                memory = row.get("memory_usage")
+                if row.get("partial") or memory is None:
+                    continue
+                cpu = row.get("cpu_percent")
+                record[0] = (timestamp, memory, memory, np.nan if cpu is None else cpu, 1)
+                self._append("raw", row["id"], record)
+
+    def containers(self) -> list[str]:
+        """
+        Ids of all containers with stored history.
+        """
+        return sorted({name[:-4] for resolution in RESOLUTIONS
+                       for name in os.listdir(os.path.join(self.path, resolution))
+                       if name.endswith(".bin")})
+
+    def has(self, container_id: str) -> bool:
+        try:
+            return any(os.path.exists(self._file(resolution, container_id))
+                       for resolution in RESOLUTIONS)
+        except ValueError:
+            return False
+
+    def read(self, container_id: str, resolution: str,
+             start: float, end: float) -> np.ndarray:
+        """
+        Records of one tier with `start <= t < end`, as a zero-copy view of
+        the mapped file.
+        """
+        records = _map(self._file(resolution, container_id))
+        times = records["t"]
+        lo, hi = np.searchsorted(times, [start, end])
+        return records[lo:hi]
+
+    def pick_resolution(self, start: float, end: float, step: Optional[float] = None,
+                        now: Optional[float] = None) -> str:
+        """
+        Finest tier whose retention still covers `start`, whose records are
+        no wider than `step` and that answers with at most MAX_POINTS
+        records. Coarser tiers only hold complete buckets.
+        """
+        now = time.time() if now is None else now
+        span = max(0.0, end - start)
+        usable = [resolution for resolution, seconds in RESOLUTIONS.items()
+                  if step is None or seconds <= step]
+        covering = [resolution for resolution in usable
+                    if now - self.retention[resolution] <= start]
+        for resolution in covering:
+            width = RESOLUTIONS[resolution] or config.STATS_SAMPLE_INTERVAL
+            if span / width <= MAX_POINTS:
+                return resolution
+        return (covering or usable)[-1]
+
+    def query(self, container_id: str, start: float, end: float,
+              step: Optional[float] = None) -> tuple[str, np.ndarray]:
+        """
+        Return (resolution, records) for a time range, downsampled to `step`
+        seconds when it is coarser than the tier that answered.
+        """
+        resolution = self.pick_resolution(start, end, step)
+        records = self.read(container_id, resolution, start, end)
+        if step is not None and step > RESOLUTIONS[resolution]:
+            records = aggregate(records, step)
+        return resolution, records
+
+    def rollup(self, now: Optional[float] = None):
+        """
+        Roll complete buckets of every tier up into the next coarser tier.
+        """
+        if not self.writable:
+            return
+        now = time.time() if now is None else now
+        tiers = list(RESOLUTIONS)
+        for source, target in zip(tiers, tiers[1:]):
+            step = RESOLUTIONS[target]
+            complete = math.floor(now / step) * step
+            for name in os.listdir(os.path.join(self.path, source)):
+                if not name.endswith(".bin"):
+                    continue
+                container_id = name[:-4]
+                done = _map(self._file(target, container_id))
+                rolled = done["t"][-1] + step if len(done) else -np.inf
+                pending = self.read(container_id, source, rolled, complete)
+                if len(pending):
+                    with self._lock:
+                        self._append(target, container_id, aggregate(pending, step))
+
+    def enforce_retention(self, now: Optional[float] = None):
+        """
+        Drop records older than each tier's retention. A file is rewritten
+        only once enough of it has expired, and removed once all of it has.
+        """
+        if not self.writable:
+            return
+        now = time.time() if now is None else now
+        for resolution in RESOLUTIONS:
+            cutoff = now - self.retention[resolution]
+            directory = os.path.join(self.path, resolution)
+            for name in os.listdir(directory):
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(directory, name)
+                with self._lock:
+                    records = _map(path)
+                    expired = int(np.searchsorted(records["t"], cutoff))
+                    if expired == len(records):
+                        os.remove(path)
+                    elif expired and expired >= len(records) * _COMPACT_RATIO:
+                        # Readers keep their mapping of the old file
+                        temporary = path + ".tmp"
+                        records[expired:].tofile(temporary)
+                        os.replace(temporary, path)
+                    del records
+
+    def maintain(self, now: Optional[float] = None):
+        self.rollup(now)
+        self.enforce_retention(now)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running or not self.writable:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-rollup", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self._lock_file.close()
+        self.writable = False
+
+    def _run(self):
+        while not self._stop.wait(self.rollup_interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"[StatsStore] Rollup failed: {e}")
+
+
+_store: Optional[StatsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_stats_store() -> Optional[StatsStore]:
+    """
+    Return the process-wide stats store, or None when STATS_STORE_PATH is
+    not configured.
+    """
+    global _store
+    if not config.STATS_STORE_PATH:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = StatsStore(config.STATS_STORE_PATH)
+                _store.start()
+    return _store
+
+
+def close_stats_store():
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        store.close()
@@ -0,0 +1,250 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+import docker.errors
+import requests
+from packaging.version import InvalidVersion, Version
+import config
+from models.docker_model import VersionStatus
+from services.docker_engine import DockerEngine, get_engine
+from services.metrics import docker_call
+
+
+def parse_version(value: str) -> Optional[Version]:
+    """
+    Parse an engine or release version ("25.0.2", "v25.0.2", "20.10.24+dfsg1").
+    """
+    try:
+        return Version(value.strip().lstrip("vV"))
+    except (InvalidVersion, AttributeError):
+        return None
+
+
+def is_up_to_date(installed: Optional[str], latest: Optional[str]) -> Optional[bool]:
+    """
+    True when `installed` is at least `latest`, None when either is unknown.
+    """
+    if not installed or not latest:
+        return None
+    installed_version, latest_version = parse_version(installed), parse_version(latest)
+    if installed_version is None or latest_version is None:
+        return installed.strip().lstrip("vV") == latest.strip().lstrip("vV")
+    return installed_version.release >= latest_version.release
+
+
+def _header(headers, name: str) -> Optional[str]:
+    value = headers.get(name) if headers is not None else None
+    return value if isinstance(value, str) else None
+
+
+def _retry_at(headers) -> Optional[float]:
+    """
+    Wall-clock time the feed asks us to wait for (Retry-After or an
+    exhausted X-RateLimit-Remaining with its X-RateLimit-Reset).
+    """
+    retry_after = _header(headers, "Retry-After")
+    if retry_after:
+        try:
+            return time.time() + float(retry_after)
+        except ValueError:
+            try:
+                return parsedate_to_datetime(retry_after).timestamp()
+            except (TypeError, ValueError):
+                pass
+    if _header(headers, "X-RateLimit-Remaining") == "0":
+        try:
+            return float(_header(headers, "X-RateLimit-Reset") or "")
+        except ValueError:
+            pass
+    return None
+
+
+class _Cached:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.value: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        # Monotonic time the value goes stale, or the next attempt is allowed
+        self.due = 0.0
+
+    def stale(self) -> bool:
+        return time.monotonic() >= self.due
+
+    def store(self, value: Optional[str]):
+        self.value = value
+        self.checked_at = time.time()
+        self.due = time.monotonic() + self.ttl
+
+
+class VersionService:
+    """
+    Cached installed engine version and latest released version.
+
+    Both values are kept for their TTL and refreshed by a background thread,
+    started on first use, so reading them never waits for the network. The
+    release feed is polled with If-None-Match and its rate-limit headers are
+    honoured; a failed fetch keeps the previous value and is retried after
+    `retry_interval`. Only a caller asking to `wait` on a cold cache fetches
+    in its own thread, and not again before the retry interval is over.
+    """
+
+    def __init__(self, engine: DockerEngine, feed_url: str = config.VERSION_FEED_URL,
+                 latest_ttl: float = config.VERSION_LATEST_TTL,
+                 installed_ttl: float = config.VERSION_INSTALLED_TTL,
+                 retry_interval: float = config.VERSION_RETRY_INTERVAL,
+                 timeout: float = config.VERSION_FEED_TIMEOUT):
+        self.engine = engine
+        self.feed_url = feed_url
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+        self.latest = _Cached(latest_ttl)
+        self.installed = _Cached(installed_ttl)
+        self._etag: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh_latest(self):
+        """
+        Fetch the latest release tag from the feed (conditionally).
+        """
+        headers = {"Accept": "application/vnd.github+json"}
+        if self._etag is not None:
+            headers["If-None-Match"] = self._etag
+        try:
+            response = requests.get(self.feed_url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Failed to get latest version: {e}")
+            self.latest.due = time.monotonic() + self.retry_interval
+            return
+
+        retry_at = _retry_at(response.headers)
+        if response.status_code == 304:
+            self.latest.store(self.latest.value)
+        elif response.status_code in (403, 429) and retry_at is not None:
+            print(f"Release feed rate limited, retrying in {retry_at - time.time():.0f}s.")
+            self.latest.due = time.monotonic() + max(retry_at - time.time(), self.retry_interval)
+            return
+        else:
+            try:
+                response.raise_for_status()
+                tag = response.json().get("tag_name")
+            except (requests.RequestException, ValueError) as e:
+                print(f"Failed to get latest version: {e}")
+                self.latest.due = time.monotonic() + self.retry_interval
+                return
+            self._etag = _header(response.headers, "ETag")
+            self.latest.store(tag)
+
+        if _header(response.headers, "X-RateLimit-Remaining") == "0" and retry_at is not None:
+            # Out of requests for now: not before the window resets
+            self.latest.due = max(self.latest.due, time.monotonic() + retry_at - time.time())
+
+    def refresh_installed(self):
+        """
+        Read the installed engine version. Raises DockerException when the
+        engine is not available.
+        """
+        client = self.engine.get_client()
+        if client is None or not self.engine.is_online():
+            self.installed.due = time.monotonic() + self.retry_interval
+            raise docker.errors.DockerException("Docker engine is not available.")
+        try:
+            with docker_call("version"):
+                version_info = client.version()
+        except Exception:
+            # Not again before the retry interval, however often it is asked
+            self.installed.due = time.monotonic() + self.retry_interval
+            raise
+        self.installed.store(version_info.get("Version", "Unknown"))
+
+    def _read(self, cached: _Cached, refresh: Callable[[], None], wait: bool) -> Optional[str]:
+        if cached.checked_at is None and wait and cached.stale():
+            with self._lock:
+                if cached.checked_at is None and cached.stale():
+                    refresh()
+            return cached.value
+        if cached.stale():
+            self._kick()
+        return cached.value
+
+    def latest_version(self, wait: bool = False) -> Optional[str]:
+        """
+        Latest released version, e.g. "v25.0.2", or None while unknown.
+        """
+        return self._read(self.latest, self.refresh_latest, wait)
+
+    def installed_version(self, wait: bool = False) -> Optional[str]:
+        """
+        Version of the installed engine, or None while unknown.
+        """
+        return self._read(self.installed, self.refresh_installed, wait)
+
+    def status(self) -> VersionStatus:
+        """
+        Both versions and whether the engine is up to date, from the cache.
+        """
+        installed, latest = self.installed_version(), self.latest_version()
+        return VersionStatus(installed=installed, latest=latest,
+                             up_to_date=is_up_to_date(installed, latest),
+                             installed_checked_at=self.installed.checked_at,
+                             latest_checked_at=self.latest.checked_at)
+
+    def _kick(self):
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="version-refresh", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            for cached, refresh in ((self.installed, self.refresh_installed),
+                                    (self.latest, self.refresh_latest)):
+                if cached.stale():
+                    try:
+                        with self._lock:
+                            refresh()
+                    except Exception as e:
+                        print(f"[VersionService] Refresh failed: {e}")
+            next_due = min(self.installed.due, self.latest.due) - time.monotonic()
+            self._wake.wait(max(next_due, 1.0))
+            self._wake.clear()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_service: Optional[VersionService] = None
+_service_lock = threading.Lock()
+
+
+def get_version_service() -> VersionService:
+    """
+    Return the process-wide version service, creating it on first use.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = VersionService(get_engine())
+    return _service
+
+
+def close_version_service():
+    global _service
+    with _service_lock:
+        service, _service = _service, None
+    if service is not None:
+        service.stop()
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+
+async def call_async(app, method: str, path: str, headers=None, body: bytes = b""):
+    """
+    Send one HTTP request straight into an ASGI app.
+    Returns (status, headers, body) with lower-cased header names.
+    """
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {"status": None, "headers": {}, "body": []}
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], b"".join(response["body"])
+
+
+def call(app, method: str, path: str, headers=None, body: bytes = b""):
+    return asyncio.run(call_async(app, method, path, headers, body))
+
+
+def call_json(app, method: str, path: str, headers=None, body=None):
+    payload = json.dumps(body).encode() if body is not None else b""
+    if body is not None:
+        headers = {"content-type": "application/json", **(headers or {})}
+    status, response_headers, data = call(app, method, path, headers, payload)
+    return status, response_headers, json.loads(data) if data else None
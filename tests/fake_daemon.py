@@ -0,0 +1,338 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+VERSION_PREFIX = re.compile(r"^/v\d+\.\d+")
+
+
+class FakeDockerDaemon:
+    """
+    Stand-in Docker engine serving a small subset of the engine API over HTTP
+    on a unix socket. Runs its own event loop in a background thread, so it
+    can be used by both the docker SDK and the asyncio client.
+
+        with FakeDockerDaemon(containers={"abc": "web"}) as daemon:
+            engine = AsyncDockerEngine(daemon.url)
+
+    `latency` delays every response and `stats_latency` additionally delays
+    stats samples, the way the real engine blocks while it takes two CPU
+    readings. Lifecycle actions are published on `/events`, and lines added
+    with `log()` are served, framed like the engine's, on `/logs`.
+    """
+
+    def __init__(self, containers=None, images=None, socket_path=None, stats_interval=0.05,
+                 stats_latency=0.0, latency=0.0):
+        self.socket_path = socket_path or os.path.join(
+            tempfile.mkdtemp(prefix="fake-docker-"), "docker.sock")
+        self.containers = {
+            container_id: {"name": name, "running": False, "labels": {}}
+            for container_id, name in (containers or {}).items()
+        }
+        self.images = dict(images or {})
+        self.stats_interval = stats_interval
+        self.stats_latency = stats_latency
+        self.latency = latency
+        self.open_streams = 0
+        self.requests = []
+        self.connections = 0
+        self.events = []
+        self.logs: dict[str, list] = {}
+        self._subscribers: set[asyncio.Queue] = set()
+        self._log_followers: dict[str, set[asyncio.Queue]] = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @classmethod
+    def generate(cls, containers=0, images=0, running=0.5, **kwargs):
+        """
+        Daemon with `containers` containers (the first `running` fraction of
+        them running) and `images` images, ids shaped like the engine's.
+        """
+        daemon = cls(containers={f"{i:064x}": f"app-{i}" for i in range(containers)},
+                     images={f"sha256:{i:064x}": [f"image-{i}:latest"] if i % 10 else []
+                             for i in range(images)},
+                     **kwargs)
+        for i, container in enumerate(daemon.containers.values()):
+            container["running"] = i < containers * running
+            container["labels"] = {"com.example.group": f"group-{i % 4}"}
+        return daemon
+
+    @property
+    def url(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="fake-docker", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_unix_server(self._serve, path=self.socket_path))
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            self._loop.close()
+
+    def emit(self, kind, action, object_id, attributes=None):
+        """
+        Publish an engine event to the `/events` subscribers (thread-safe).
+        """
+        event = {"Type": kind, "Action": action, "status": action, "id": object_id,
+                 "Actor": {"ID": object_id, "Attributes": attributes or {}},
+                 "time": int(time.time()), "timeNano": time.time_ns()}
+        if self._loop is None or threading.current_thread() is self._thread:
+            self._publish(event)
+        else:
+            self._loop.call_soon_threadsafe(self._publish, event)
+
+    def _publish(self, event):
+        self.events.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    def log(self, container_id, text, stream=1, timestamp=None):
+        """
+        Append output of a container and pass it to followers (thread-safe).
+        `stream` is 1 for stdout and 2 for stderr.
+        """
+        entry = (stream, time.time() if timestamp is None else timestamp,
+                 text.encode() if isinstance(text, str) else text)
+        if self._loop is None or threading.current_thread() is self._thread:
+            self._append_log(container_id, entry)
+        else:
+            self._loop.call_soon_threadsafe(self._append_log, container_id, entry)
+
+    def _append_log(self, container_id, entry):
+        self.logs.setdefault(container_id, []).append(entry)
+        for queue in self._log_followers.get(container_id, ()):
+            queue.put_nowait(entry)
+
+    async def _logs_stream(self, container_id, query):
+        tty = self.containers[container_id].get("tty", False)
+        streams = {stream for stream, name in ((1, "stdout"), (2, "stderr"))
+                   if query.get(name, "false") == "true"}
+        since = float(query.get("since", 0))
+        until = float(query["until"]) if "until" in query else None
+
+        def frame(entry):
+            stream, timestamp, data = entry
+            if stream not in streams or timestamp < since or (until is not None and timestamp > until):
+                return b""
+            if query.get("timestamps") == "true":
+                data = time.strftime("%Y-%m-%dT%H:%M:%SZ ", time.gmtime(timestamp)).encode() + data
+            return data if tty else bytes([stream, 0, 0, 0]) + len(data).to_bytes(4, "big") + data
+
+        entries = self.logs.get(container_id, [])
+        tail = query.get("tail", "all")
+        if tail != "all":
+            entries = entries[len(entries) - int(tail):] if int(tail) else []
+        queue = asyncio.Queue()
+        self._log_followers.setdefault(container_id, set()).add(queue)
+        try:
+            for entry in entries:
+                if data := frame(entry):
+                    yield data
+            while query.get("follow") == "true":
+                if data := frame(await queue.get()):
+                    yield data
+        finally:
+            self._log_followers[container_id].discard(queue)
+
+    async def _events_stream(self, query):
+        since = int(query.get("since", 0))
+        until = int(query["until"]) if "until" in query else None
+        types = json.loads(query.get("filters", "{}")).get("type")
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            for event in [event for event in self.events if event["time"] >= since]:
+                queue.put_nowait(event)
+            while True:
+                timeout = None if until is None else until - time.time()
+                if timeout is not None and timeout <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    return
+                if not types or event["Type"] in types:
+                    yield json.dumps(event).encode() + b"\n"
+        finally:
+            self._subscribers.discard(queue)
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                url = urlsplit(target)
+                path = VERSION_PREFIX.sub("", url.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                self.requests.append((method, path))
+
+                status, payload = await self.handle(method, path, query, body)
+                await self._respond(writer, status, payload)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload):
+        if hasattr(payload, "__aiter__"):
+            await self._respond_stream(writer, status, payload)
+            return
+        if payload is None:
+            data, content_type = b"", "text/plain"
+        elif isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain"
+        else:
+            data, content_type = json.dumps(payload).encode(), "application/json"
+        if status in (204, 304):
+            # Like dockerd: no body and no Content-Length
+            head, data = f"HTTP/1.1 {status} X\r\n\r\n", b""
+        else:
+            head = (f"HTTP/1.1 {status} X\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n")
+        writer.write(head.encode() + data)
+        await writer.drain()
+
+    async def _respond_stream(self, writer, status, chunks):
+        writer.write((f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                      f"Transfer-Encoding: chunked\r\n\r\n").encode())
+        self.open_streams += 1
+        try:
+            async for chunk in chunks:
+                writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await chunks.aclose()
+            self.open_streams -= 1
+
+    def stats_sample(self, container_id, sequence=0):
+        return {
+            "read": f"2026-01-01T00:00:{sequence % 60:02d}Z",
+            "cpu_stats": {"cpu_usage": {"total_usage": 2_000_000 * (sequence + 1)},
+                          "system_cpu_usage": 100_000_000 * (sequence + 1), "online_cpus": 2},
+            "precpu_stats": {"cpu_usage": {"total_usage": 2_000_000 * sequence},
+                             "system_cpu_usage": 100_000_000 * sequence, "online_cpus": 2},
+            "memory_stats": {"usage": 64 * 1024 ** 2, "limit": 512 * 1024 ** 2},
+            "networks": {"eth0": {"rx_bytes": 1000 * sequence, "tx_bytes": 500 * sequence}},
+        }
+
+    async def _stats_stream(self, container_id):
+        sequence = 0
+        await asyncio.sleep(self.stats_latency)
+        while True:
+            yield json.dumps(self.stats_sample(container_id, sequence)).encode() + b"\n"
+            sequence += 1
+            await asyncio.sleep(self.stats_interval)
+
+    def _container(self, container_id):
+        if container_id in self.containers:
+            return container_id
+        for key, container in self.containers.items():
+            if container["name"] == container_id:
+                return key
+        return None
+
+    def _container_json(self, container_id):
+        container = self.containers[container_id]
+        state = "running" if container["running"] else "exited"
+        return {"Id": container_id, "Names": [f"/{container['name']}"],
+                "Image": "busybox", "State": state, "Status": state,
+                "Labels": container["labels"]}
+
+    async def handle(self, method, path, query, body):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if path == "/_ping":
+            return 200, "OK"
+        if path == "/version":
+            return 200, {"Version": "25.0.1", "ApiVersion": "1.44", "MinAPIVersion": "1.24"}
+        if path == "/containers/json":
+            return 200, [self._container_json(container_id) for container_id in self.containers]
+        if path == "/images/json":
+            return 200, [{"Id": image_id, "RepoTags": tags} for image_id, tags in self.images.items()]
+        if path == "/events":
+            return 200, self._events_stream(query)
+
+        match = re.fullmatch(r"/images/(.+)/json", path)
+        if match:
+            if match.group(1) not in self.images:
+                return 404, {"message": f"No such image: {match.group(1)}"}
+            return 200, {"Id": match.group(1), "RepoTags": self.images[match.group(1)]}
+
+        match = re.fullmatch(r"/containers/([^/]+)/(\w+)", path)
+        if match:
+            container_id = self._container(match.group(1))
+            if container_id is None:
+                return 404, {"message": f"No such container: {match.group(1)}"}
+            container, action = self.containers[container_id], match.group(2)
+            if action == "json":
+                data = self._container_json(container_id)
+                data["Name"] = "/" + container["name"]
+                data["State"] = {"Status": data["State"], "Running": container["running"]}
+                return 200, data
+            if action in ("start", "stop"):
+                running = action == "start"
+                if container["running"] == running:
+                    return 304, None
+                container["running"] = running
+                self.emit("container", action, container_id, {"name": container["name"]})
+                return 204, None
+            if action == "restart":
+                container["running"] = True
+                self.emit("container", "restart", container_id, {"name": container["name"]})
+                return 204, None
+            if action == "stats":
+                if query.get("stream", "true") == "true":
+                    return 200, self._stats_stream(container_id)
+                await asyncio.sleep(self.stats_latency)
+                return 200, self.stats_sample(container_id)
+            if action == "logs":
+                return 200, self._logs_stream(container_id, query)
+        return 404, {"message": f"page not found: {path}"}
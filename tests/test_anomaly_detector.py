@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from asgi import call, call_json
+from dependencies import get_prediction_manager
+from main import app
+from services.anomaly_detector import AnomalyDetector
+from services.prediction_manager import ContainerMemoryManager
+
+
+def _feed(detector, series, interval=10.0, limits=None):
+    """
+    Feed one column of `series` (ticks x containers) per tick.
+    """
+    ids = [f"c{i}" for i in range(series.shape[1])]
+    slots = np.arange(series.shape[1])
+    for tick, values in enumerate(series):
+        detector.update(ids, slots, tick * interval, values, limits)
+    return ids, slots
+
+
+def test_flags_steady_growth_as_leak_with_time_to_limit():
+    detector = AnomalyDetector(slope_windows=(300, 1800), min_samples=30)
+    ticks = np.arange(360)[:, None]
+    # 2 MB/min growth next to a flat, noisy container
+    series = np.hstack([100 + ticks * 2 / 6, 100 + np.sin(ticks)])
+    ids, slots = _feed(detector, series, limits=np.array([1000.0, np.nan]))
+
+    leaking, flat = detector.evaluate(ids, ids, slots)
+
+    assert leaking.leak and not flat.leak
+    assert leaking.slopes_mb_per_min["5m"] == pytest.approx(2.0, rel=0.01)
+    assert leaking.slopes_mb_per_min["30m"] == pytest.approx(2.0, rel=0.01)
+    remaining = 1000 - leaking.ewma
+    assert leaking.time_to_limit_seconds == pytest.approx(remaining / 2 * 60, rel=0.02)
+    assert flat.time_to_limit_seconds is None and flat.memory_limit is None
+
+
+def test_flags_spike_against_baseline():
+    detector = AnomalyDetector(min_samples=30)
+    rng = np.random.default_rng(1)
+    series = 200 + rng.normal(0, 1, size=(100, 2))
+    series[-1, 0] = 260
+    ids, slots = _feed(detector, series)
+
+    spiking, calm = detector.evaluate(ids, ids, slots)
+
+    assert spiking.spike and spiking.zscore > 10
+    assert not calm.spike and abs(calm.zscore) < 4
+
+
+def test_needs_min_samples_and_resets_reused_slots():
+    detector = AnomalyDetector(min_samples=30)
+    _feed(detector, 100 + np.arange(20)[:, None] * 50.0)
+    assert not detector.evaluate(["c0"], ["c0"], [0])[0].leak
+
+    # Another container takes over the slot
+    detector.update(["other"], [0], 1000.0, np.array([5.0]))
+    assert detector.evaluate(["c0"], ["c0"], [0]) == []
+    state, = detector.evaluate(["other"], ["other"], [0])
+    assert state.samples == 1 and state.ewma == 5.0
+
+
+def test_manager_reports_anomalies_on_page_and_api():
+    manager = ContainerMemoryManager()
+    manager.detector = AnomalyDetector(slope_windows=(300,), min_samples=5)
+    for t in range(40):
+        manager.record([{"id": "a", "name": "leaky", "memory_usage": 100.0 + 5 * t, "memory_limit": 1024.0},
+                         {"id": "b", "name": "steady", "memory_usage": 50.0}], 1000.0 + t * 10)
+
+    result = manager.predict_memory_usage()
+    assert [a.name for a in result.anomalies] == ["leaky", "steady"]
+    assert result.anomalies[0].leak
+    assert "**leaky** looks like it is leaking memory" in result.summary
+
+    app.dependency_overrides[get_prediction_manager] = lambda: manager
+    try:
+        status, _, body = call_json(app, "GET", "/api/predictions/anomalies?flagged=true")
+        assert status == 200
+        assert [a["name"] for a in body] == ["leaky"]
+
+        status, _, page = call(app, "GET", "/pages/predictions")
+        assert status == 200
+        assert b"Leak" in page and b"Trend 5m" in page
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,152 @@
+import asyncio
+import pytest
+from fake_daemon import FakeDockerDaemon
+from models.exceptions import NoDataFoundException
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+
+
+@pytest.fixture
+def daemon():
+    with FakeDockerDaemon(containers={"abc123": "web", "def456": "db"},
+                          images={"sha256:1": ["nginx:latest"], "sha256:2": []}) as daemon:
+        yield daemon
+
+
+def _client(daemon):
+    return AsyncDockerClient(AsyncDockerEngine(daemon.url, pool_size=2))
+
+
+def test_list_containers_and_images(daemon):
+    async def scenario():
+        client = _client(daemon)
+        return await client.list_containers(), await client.list_images()
+
+    containers, images = asyncio.run(scenario())
+
+    assert [(c.id, c.name) for c in containers] == [("abc123", "web"), ("def456", "db")]
+    assert [(i.id, i.name) for i in images] == [("sha256:1", "nginx:latest"), ("sha256:2", "untagged")]
+
+
+def test_start_stop_and_not_found(daemon):
+    async def scenario():
+        client = _client(daemon)
+        await client.start_container("web")
+        await client.stop_container("abc123")
+        with pytest.raises(NoDataFoundException, match="missing"):
+            await client.start_container("missing")
+
+    asyncio.run(scenario())
+
+    assert ("POST", "/containers/web/start") in daemon.requests
+    assert daemon.containers["abc123"]["running"] is False
+
+
+def test_bodiless_replies_return_promptly_on_one_connection(daemon):
+    async def scenario():
+        client = AsyncDockerClient(AsyncDockerEngine(daemon.url, pool_size=1, timeout=2))
+        started = asyncio.get_running_loop().time()
+        # 204 and then 304 (already in that state), both without Content-Length
+        for _ in range(2):
+            await client.start_container("web")
+        for _ in range(2):
+            await client.stop_container("web")
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(scenario()) < 1
+    assert daemon.connections == 1
+
+
+def test_only_idempotent_requests_are_resent_after_a_dropped_connection(tmp_path):
+    async def scenario():
+        received = []
+
+        async def serve(reader, writer):
+            # Answers the first request of each connection, then drops it
+            # after reading the next one
+            answered = False
+            while request_line := await reader.readline():
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                received.append(request_line.split()[0].decode())
+                if answered:
+                    break
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nOK")
+                await writer.drain()
+                answered = True
+            writer.close()
+
+        server = await asyncio.start_unix_server(serve, path=str(tmp_path / "engine.sock"))
+        engine = AsyncDockerEngine(f"unix://{tmp_path / 'engine.sock'}")
+        try:
+            await engine.request("GET", "/_ping")
+            status, _, _ = await engine.request("GET", "/_ping")
+            await engine.request("GET", "/_ping")
+            with pytest.raises(ConnectionError):
+                await engine.request("POST", "/containers/web/start")
+            return status, received
+        finally:
+            server.close()
+
+    status, received = asyncio.run(scenario())
+    # The dropped GET was resent on a new connection, the dropped POST was not
+    assert status == 200
+    assert received == ["GET"] * 5 + ["POST"]
+
+
+def test_connections_are_kept_alive(daemon):
+    async def scenario():
+        client = _client(daemon)
+        for _ in range(10):
+            assert await client.ping() is True
+        # Raw engine requests: the client would coalesce identical reads
+        await asyncio.gather(*(client.engine.request("GET", "/version") for _ in range(10)))
+
+    asyncio.run(scenario())
+
+    assert len(daemon.requests) == 20
+    assert daemon.connections <= 2
+
+
+def test_version_and_stats(daemon):
+    async def scenario():
+        client = _client(daemon)
+        return await client.get_local_docker_version(), await client.container_stats("web")
+
+    version, stats = asyncio.run(scenario())
+
+    assert version == "25.0.1"
+    assert stats["memory_stats"]["usage"] == 64 * 1024 ** 2
+
+
+def test_offline_engine_reports_not_online(tmp_path):
+    engine = AsyncDockerEngine(f"unix://{tmp_path}/missing.sock")
+
+    assert asyncio.run(AsyncDockerClient(engine).is_docker_online()) is False
+
+
+def test_concurrent_identical_reads_share_one_daemon_call():
+    with FakeDockerDaemon(containers={"abc123": "web"}, latency=0.05) as daemon:
+        async def scenario():
+            client = _client(daemon)
+            first = await asyncio.gather(*(client.list_containers() for _ in range(50)),
+                                         *(client.container_stats("web") for _ in range(50)))
+            second = await client.list_containers()
+            return first, second
+
+        results, again = asyncio.run(scenario())
+
+    assert all(result == results[0] for result in results[:50])
+    assert daemon.requests.count(("GET", "/containers/json")) == 2
+    assert daemon.requests.count(("GET", "/containers/web/stats")) == 1
+
+
+def test_coalesced_errors_reach_every_caller(daemon):
+    async def scenario():
+        client = _client(daemon)
+        return await asyncio.gather(*(client.inspect_container("missing") for _ in range(10)),
+                                    return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+
+    assert all(isinstance(error, NoDataFoundException) for error in errors)
+    assert daemon.requests.count(("GET", "/containers/missing/json")) == 1
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from models.docker_model import BulkAction, BulkActionRequest
+from models.exceptions import NoDataFoundException
+from services.bulk_operations import prerequisites, run_bulk_action
+from services.job_scheduler import JobScheduler
+
+
+def _client(delay=0.0, fail=(), missing=()):
+    calls = []
+
+    async def operation(container_id, *args):
+        calls.append(container_id)
+        await asyncio.sleep(delay)
+        if container_id in missing:
+            raise NoDataFoundException(f"Container '{container_id}' not found.")
+        if container_id in fail:
+            raise RuntimeError("boom")
+
+    client = AsyncMock()
+    client.start_container.side_effect = operation
+    client.stop_container.side_effect = operation
+    client.restart_container.side_effect = operation
+    return client, calls
+
+
+def test_bulk_runs_concurrently_with_per_item_results():
+    client, _ = _client(delay=0.1, fail={"b"}, missing={"c"})
+    request = BulkActionRequest(ids=["a", "b", "c", "d"], action="restart", parallelism=4)
+
+    result = asyncio.run(run_bulk_action(client, request, JobScheduler()))
+
+    assert result.duration_ms < 300
+    assert {cid: item.status for cid, item in result.results.items()} == \
+        {"a": "ok", "b": "error", "c": "not_found", "d": "ok"}
+    assert (result.succeeded, result.failed, result.skipped) == (2, 2, 0)
+
+
+def test_bulk_respects_dependency_order_and_skips_dependents():
+    client, calls = _client(fail={"db"})
+    request = BulkActionRequest(ids=["web", "db", "cache"], action="start",
+                                depends_on={"web": ["db", "cache"]})
+
+    result = asyncio.run(run_bulk_action(client, request, JobScheduler()))
+
+    assert calls.index("db") < len(calls) and "web" not in calls
+    assert result.results["web"].status == "skipped"
+    assert result.results["cache"].status == "ok"
+
+
+def test_bulk_items_are_jobs_serialized_with_single_jobs():
+    client, calls = _client(delay=0.05)
+
+    async def scenario():
+        jobs = JobScheduler()
+        single = jobs.submit("start", "a", lambda: client.start_container("single-a"))
+        result = await run_bulk_action(client, BulkActionRequest(ids=["a", "b"], action="stop"), jobs)
+        return jobs, single, result
+
+    jobs, single, result = asyncio.run(scenario())
+
+    # The bulk stop of "a" waited for the queued start of "a"
+    assert calls.index("single-a") < calls.index("a")
+    assert single.status == "succeeded"
+    assert all(jobs.get(item.job_id).status == "succeeded" for item in result.results.values())
+    assert result.results["a"].duration_ms >= 50
+
+
+def test_stop_reverses_dependency_order():
+    before = prerequisites(["web", "db"], BulkAction.stop, {"web": ["db"]})
+    assert before == {"web": set(), "db": {"web"}}
+
+    with pytest.raises(ValueError, match="cycle"):
+        prerequisites(["a", "b"], BulkAction.start, {"a": ["b"], "b": ["a"]})
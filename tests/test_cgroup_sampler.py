@@ -0,0 +1,104 @@
+import os
+import shutil
+from unittest.mock import MagicMock
+from services.cgroup_sampler import CgroupSampler
+from services.prediction_manager import ContainerMemoryManager
+
+MB = 1024 ** 2
+
+
+def _v2_container(root, container_id, memory, usage_usec=5000):
+    path = root / "system.slice" / f"docker-{container_id}.scope"
+    path.mkdir(parents=True)
+    (path / "memory.current").write_text(f"{memory}\n")
+    (path / "memory.stat").write_text(f"anon 100\ninactive_file {memory // 4}\nactive_file 7\n")
+    (path / "cpu.stat").write_text(f"usage_usec {usage_usec}\nuser_usec 1\nsystem_usec 2\n")
+    (path / "memory.max").write_text("max\n")
+    return path
+
+
+def _v2_root(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu memory\n")
+    return tmp_path
+
+
+def _container(container_id, name):
+    container = MagicMock(id=container_id)
+    container.name = name
+    container.stats.return_value = {"memory_stats": {"usage": 10 * MB}}
+    return container
+
+
+def test_reads_cgroup_v2_counters(tmp_path):
+    root = _v2_root(tmp_path)
+    path = _v2_container(root, "abc", 64 * MB, usage_usec=1500)
+    sampler = CgroupSampler(str(root))
+
+    assert sampler.version == 2
+    assert sampler.read("abc") == {"memory_usage": 64 * MB, "memory_inactive_file": 16 * MB,
+                                   "memory_limit": None, "cpu_usage_ns": 1_500_000}
+
+    # The open handles see new values without re-resolving the cgroup
+    (path / "memory.current").write_text(f"{80 * MB}\n")
+    (path / "memory.max").write_text(f"{256 * MB}\n")
+    assert sampler.read("abc")["memory_usage"] == 80 * MB
+    assert sampler.read("abc")["memory_limit"] == 256 * MB
+    assert len(sampler) == 1
+
+
+def test_reads_cgroup_v1_counters(tmp_path):
+    memory = tmp_path / "memory" / "docker" / "abc"
+    cpu = tmp_path / "cpu,cpuacct" / "docker" / "abc"
+    memory.mkdir(parents=True)
+    cpu.mkdir(parents=True)
+    (memory / "memory.usage_in_bytes").write_text(f"{32 * MB}\n")
+    (memory / "memory.stat").write_text("cache 1\ntotal_inactive_file 4096\n")
+    (memory / "memory.limit_in_bytes").write_text("9223372036854771712\n")
+    (cpu / "cpuacct.usage").write_text("123456789\n")
+    sampler = CgroupSampler(str(tmp_path))
+
+    assert sampler.version == 1
+    assert sampler.read("abc") == {"memory_usage": 32 * MB, "memory_inactive_file": 4096,
+                                   "memory_limit": None, "cpu_usage_ns": 123456789}
+
+
+def test_unknown_or_removed_cgroups_return_none(tmp_path):
+    root = _v2_root(tmp_path)
+    path = _v2_container(root, "abc", MB)
+    sampler = CgroupSampler(str(root))
+
+    assert sampler.read("missing") is None
+    assert sampler.read("abc") is not None
+
+    # A removed cgroup fails reads (ENODEV on cgroupfs); handles are dropped
+    shutil.rmtree(path)
+    os.close(sampler._handles["abc"].memory)
+    assert sampler.read("abc") is None
+    assert len(sampler) == 0
+
+
+def test_retain_closes_handles_of_gone_containers(tmp_path):
+    root = _v2_root(tmp_path)
+    _v2_container(root, "abc", MB)
+    _v2_container(root, "def", MB)
+    sampler = CgroupSampler(str(root))
+    sampler.read("abc")
+    sampler.read("def")
+
+    sampler.retain(["def"])
+
+    assert len(sampler) == 1
+    assert sampler.read("def") is not None
+
+
+def test_manager_uses_cgroups_and_falls_back_to_api(tmp_path):
+    root = _v2_root(tmp_path)
+    _v2_container(root, "local", 64 * MB)
+    local, remote = _container("local", "web"), _container("remote", "db")
+    manager = ContainerMemoryManager(engine=MagicMock(), cgroup=CgroupSampler(str(root)))
+
+    rows = manager.collect_stats([local, remote])
+
+    assert [(row["name"], row["memory_usage"]) for row in rows] == [("web", 64.0), ("db", 10.0)]
+    local.stats.assert_not_called()
+    remote.stats.assert_called_once()
@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+import time
+import pytest
+from asgi import call, call_async
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_async_docker_client
+from main import app
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.log_stream import FrameDemuxer, LineSplitter, line_matcher, parse_log_time
+
+
+@pytest.fixture
+def daemon():
+    with FakeDockerDaemon(containers={"abc123": "web", "tty456": "shell"}) as daemon:
+        daemon.containers["tty456"]["tty"] = True
+        app.dependency_overrides[get_async_docker_client] = \
+            lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        yield daemon
+        app.dependency_overrides.clear()
+
+
+def test_demuxer_and_splitter_handle_split_frames_and_long_lines():
+    frames = (bytes([1, 0, 0, 0, 0, 0, 0, 9]) + b"one\ntwo\nt"
+              + bytes([2, 0, 0, 0, 0, 0, 0, 4]) + b"err\n"
+              + bytes([1, 0, 0, 0, 0, 0, 0, 5]) + b"hree\n")
+    demuxer, splitter = FrameDemuxer(), LineSplitter(max_line=8)
+    lines = []
+    # Byte by byte: headers and payloads split anywhere
+    for i in range(len(frames)):
+        for stream, data in demuxer.feed(frames[i:i + 1]):
+            lines += splitter.feed(stream, data)
+    assert lines == [(1, b"one"), (1, b"two"), (2, b"err"), (1, b"three")]
+
+    lines = splitter.feed(1, b"x" * 20) + splitter.feed(1, b"y" * 20 + b"\nnext\npart")
+    assert lines == [(1, b"x" * 8), (1, b"next")]
+    assert splitter.flush() == [(1, b"part")]
+
+
+def test_filters_and_times():
+    assert line_matcher() is None
+    matches = line_matcher(grep="Error", regex=r"code=\d+", ignore_case=True)
+    assert matches(b"ERROR code=500") and not matches(b"error code=x")
+    with pytest.raises(ValueError, match="Invalid regex"):
+        line_matcher(regex="(")
+    assert parse_log_time("15m", now=1000.0) == 100.0
+    assert parse_log_time("1700000000.5") == 1700000000.5
+    with pytest.raises(ValueError):
+        parse_log_time("yesterday")
+
+
+def test_streams_filtered_lines(daemon):
+    for i in range(10):
+        daemon.log("abc123", f"GET /item/{i} {'500' if i % 3 == 0 else '200'}\n", timestamp=1000 + i)
+    daemon.log("abc123", "boom\n", stream=2, timestamp=1010)
+
+    status, headers, body = call(app, "GET", "/api/containers/web/logs")
+    assert status == 200 and headers["content-type"].startswith("text/plain")
+    assert body.count(b"\n") == 11 and body.endswith(b"boom\n")
+
+    _, _, body = call(app, "GET", "/api/containers/web/logs?grep=500&stderr=false")
+    assert body == b"GET /item/0 500\nGET /item/3 500\nGET /item/6 500\nGET /item/9 500\n"
+    _, _, body = call(app, "GET", r"/api/containers/web/logs?regex=item/[12]\b")
+    assert body == b"GET /item/1 200\nGET /item/2 200\n"
+    _, _, body = call(app, "GET", "/api/containers/web/logs?tail=2")
+    assert body == b"GET /item/9 500\nboom\n"
+    _, _, body = call(app, "GET", "/api/containers/web/logs?since=1004&until=1005.5")
+    assert body == b"GET /item/4 200\nGET /item/5 200\n"
+
+
+def test_tty_output_and_compression(daemon):
+    daemon.log("tty456", "".join(f"line {i}\n" for i in range(2000)))
+    status, headers, body = call(app, "GET", "/api/containers/shell/logs", {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body).splitlines()[-1] == b"line 1999"
+
+
+def test_errors(daemon):
+    assert call(app, "GET", "/api/containers/missing/logs")[0] == 404
+    assert call(app, "GET", "/api/containers/web/logs?regex=(")[0] == 400
+    assert call(app, "GET", "/api/containers/web/logs?since=soon")[0] == 400
+    assert call(app, "GET", "/api/containers/web/logs?tail=-1")[0] == 422
+
+
+def test_abandoned_follow_closes_the_daemon_stream(daemon):
+    daemon.log("abc123", "first\n")
+
+    async def scenario():
+        gone = asyncio.Event()
+        received = []
+
+        async def receive():
+            if not received:
+                received.append(b"")
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await gone.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                received.append(message["body"])
+                gone.set()
+
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                 "scheme": "http", "path": "/api/containers/web/logs", "raw_path": b"",
+                 "root_path": "", "query_string": b"follow=true", "headers": [],
+                 "client": ("127.0.0.1", 50000), "server": ("testserver", 80)}
+        await asyncio.wait_for(app(scope, receive, send), 5)
+        return received[1:]
+
+    assert asyncio.run(scenario()) == [b"first\n"]
+
+    # The daemon sees the connection closed the next time it writes
+    deadline = time.monotonic() + 5
+    while daemon.open_streams:
+        assert time.monotonic() < deadline
+        daemon.log("abc123", "more\n")
+        time.sleep(0.02)
+    assert not daemon._log_followers["abc123"]
+
+
+def test_follow_streams_new_lines(daemon):
+    async def scenario():
+        client = AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        batches = client.container_logs("abc123", follow=True, tail=0)
+        lines = []
+        task = asyncio.ensure_future(batches.__anext__())
+        await asyncio.sleep(0.05)
+        daemon.log("abc123", "later\n")
+        lines += await asyncio.wait_for(task, 5)
+        await batches.aclose()
+        return lines
+
+    assert asyncio.run(scenario()) == [(1, b"later")]
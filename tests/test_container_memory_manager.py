@@ -1,3 +1,4 @@
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 from services.prediction_manager import ContainerMemoryManager
@@ -62,3 +63,91 @@ def test_get_client_handles_exception(mock_from_env):
 
     manager = ContainerMemoryManager()
     assert manager.get_client() is None
+
+
+def _slow_container(name, delay, usage=104857600):
+    container = MagicMock()
+    container.id = f"id-{name}"
+    container.name = name
+
+    def stats(stream=False):
+        time.sleep(delay)
+        return {"memory_stats": {"usage": usage}}
+
+    container.stats.side_effect = stats
+    return container
+
+
+def test_collect_stats_runs_concurrently():
+    manager = ContainerMemoryManager(max_workers=8, stats_timeout=5)
+    containers = [_slow_container(f"c{i}", 0.2) for i in range(8)]
+
+    started = time.monotonic()
+    data = manager.collect_stats(containers)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.2 * 4
+    assert [row["name"] for row in data] == [f"c{i}" for i in range(8)]
+    assert all(not row["partial"] for row in data)
+
+
+def test_collect_stats_marks_hung_container_partial():
+    manager = ContainerMemoryManager(max_workers=4, stats_timeout=0.2)
+    containers = [_slow_container("fast", 0.0), _slow_container("hung", 2.0)]
+
+    started = time.monotonic()
+    data = manager.collect_stats(containers)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 1.0
+    assert data[0]["memory_usage"] == 100.0
+    assert data[1]["partial"] is True
+    assert data[1]["memory_usage"] is None
+
+
+def test_predict_memory_usage_reads_from_history():
+    manager = ContainerMemoryManager()
+    manager.history.record([{"id": "a", "name": "container1", "memory_usage": 100.0},
+                            {"id": "b", "name": "container2", "memory_usage": 300.0}], 1.0)
+
+    with patch.object(manager, "fetch_container_stats") as mock_fetch:
+        result = manager.predict_memory_usage()
+
+    mock_fetch.assert_not_called()
+    assert result.predicted_next == 200.0
+    assert [stats.name for stats in result.data] == ["container1", "container2"]
+
+
+def test_predict_memory_usage_includes_forecasts():
+    manager = ContainerMemoryManager()
+    for t in range(5):
+        manager.history.record([{"id": "a", "name": "growing", "memory_usage": 100.0 + 10 * t}],
+                               1000.0 + t * 10)
+
+    result = manager.predict_memory_usage()
+
+    assert len(result.forecasts) == 1
+    assert result.forecasts[0].slope_mb_per_min == pytest.approx(60.0)
+    assert result.predicted_next == pytest.approx(result.forecasts[0].predicted[0])
+
+
+@patch("services.prediction_manager.docker.from_env")
+def test_stats_api_limit_ignores_host_memory(mock_from_env):
+    host_memory = 16 * 1024 ** 3
+    mock_from_env.return_value.info.return_value = {"MemTotal": host_memory}
+
+    def container(name, limit, host_config=None):
+        mock = MagicMock(id=name, attrs={"HostConfig": host_config} if host_config else {})
+        mock.name = name
+        mock.stats.return_value = {"memory_stats": {"usage": 64 * 1024 ** 2, "limit": limit}}
+        return mock
+
+    manager = ContainerMemoryManager()
+    rows = manager._collect_from_api([
+        container("unlimited", host_memory),
+        container("limited", 512 * 1024 ** 2),
+        container("inspected", host_memory, {"Memory": 0}),
+        container("inspected-limited", host_memory, {"Memory": 256 * 1024 ** 2}),
+    ])
+
+    assert [row["memory_limit"] for row in rows] == [None, 512.0, None, 256.0]
@@ -52,7 +52,7 @@ def test_list_containers_success(mock_from_env):
     assert containers[0].name == "my_container"
 
 
-@patch('services.docker_client.requests.get')
+@patch('services.version_service.requests.get')
 def test_get_latest_docker_version_success(mock_requests_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
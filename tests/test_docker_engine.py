@@ -0,0 +1,55 @@
+from unittest.mock import patch, MagicMock
+from services.docker_engine import DockerEngine
+from services.docker_client import DockerClient
+from services.prediction_manager import ContainerMemoryManager
+from docker.errors import DockerException
+
+
+@patch("services.docker_engine.docker.from_env")
+def test_engine_is_shared_between_services(mock_from_env):
+    mock_client = MagicMock()
+    mock_from_env.return_value = mock_client
+
+    engine = DockerEngine(pool_size=4, timeout=7)
+    engine.connect()
+
+    assert DockerClient(engine).client is mock_client
+    assert ContainerMemoryManager(engine).get_client() is mock_client
+    mock_from_env.assert_called_once_with(max_pool_size=4, timeout=7)
+
+
+@patch("services.docker_engine.docker.from_env")
+def test_health_state_is_cached(mock_from_env):
+    mock_client = MagicMock()
+    mock_from_env.return_value = mock_client
+
+    engine = DockerEngine(health_ttl=60)
+    engine.connect()
+    client = DockerClient(engine)
+
+    for _ in range(5):
+        assert client.is_docker_online() is True
+
+    assert mock_client.ping.call_count == 1
+
+
+@patch("services.docker_engine.docker.from_env")
+def test_engine_offline_when_docker_unavailable(mock_from_env):
+    mock_from_env.side_effect = DockerException("Docker failure")
+
+    engine = DockerEngine()
+    assert engine.connect() is None
+    assert engine.is_online(force=True) is False
+
+
+@patch("services.docker_engine.docker.from_env")
+def test_close_releases_client(mock_from_env):
+    mock_client = MagicMock()
+    mock_from_env.return_value = mock_client
+
+    engine = DockerEngine()
+    engine.connect()
+    engine.close()
+
+    mock_client.close.assert_called_once()
+    assert engine.client is None
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import shutil
+import ssl
+import subprocess
+import time
+import pytest
+from asgi import call_async
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_docker_fleet
+from main import app
+from models.docker_model import HostState
+from services import async_docker_client
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.fleet import Fleet, parse_hosts
+
+
+def test_parse_hosts():
+    assert parse_hosts(" build=tcp://10.0.0.5:2375, tcp://edge:2375,,build=unix:///x.sock") == {
+        "build": "tcp://10.0.0.5:2375",
+        "edge": "tcp://edge:2375",
+    }
+
+    with pytest.raises(ValueError, match="ssh:// is not supported"):
+        parse_hosts("build=tcp://10.0.0.5:2375,edge=ssh://ops@edge")
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="needs the openssl CLI")
+def test_tls_endpoints_are_spoken_to_over_tls(tmp_path):
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost",
+                    "-keyout", str(tmp_path / "server-key.pem"), "-out", str(tmp_path / "ca.pem")],
+                   check=True, capture_output=True)
+
+    async def scenario():
+        async def serve(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nOK")
+            await writer.drain()
+            writer.close()
+
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(tmp_path / "ca.pem", tmp_path / "server-key.pem")
+        server = await asyncio.start_server(serve, "localhost", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            engine = AsyncDockerEngine(f"https://localhost:{port}")
+            engine._ssl = async_docker_client.tls_context(str(tmp_path))
+            return engine.tls, await engine.request("GET", "/_ping")
+        finally:
+            server.close()
+
+    tls, (status, _, body) = asyncio.run(scenario())
+    assert tls and (status, body) == (200, b"OK")
+    assert AsyncDockerEngine("tcp://edge:2376").tls and AsyncDockerEngine("tcp://edge").port == 2375
+
+
+def _fleet(*daemons, offline=None, **kwargs):
+    clients = {f"h{i}": AsyncDockerClient(AsyncDockerEngine(daemon.url)) for i, daemon in enumerate(daemons)}
+    if offline:
+        clients["offline"] = AsyncDockerClient(AsyncDockerEngine(f"unix://{offline}"))
+    return Fleet(clients, owned=tuple(clients), **kwargs)
+
+
+def test_merges_hosts_and_reports_slow_and_offline_ones_as_partial(tmp_path):
+    async def scenario(fast, other, slow):
+        fleet = _fleet(fast, other, slow, offline=tmp_path / "missing.sock", timeout=0.3, retry_interval=60)
+        try:
+            started = time.monotonic()
+            listing = await fleet.containers()
+            elapsed = time.monotonic() - started
+
+            # The slow host is now skipped for listings without waiting for it again
+            started = time.monotonic()
+            again = await fleet.containers()
+            skipped = time.monotonic() - started
+
+            # Its slow listing does not mark it down for other operations;
+            # the unreachable host is skipped for everything
+            versions = await fleet.versions()
+            return listing, elapsed, again, skipped, versions
+        finally:
+            await fleet.close()
+
+    with FakeDockerDaemon(containers={"a1": "web"}) as fast, \
+            FakeDockerDaemon(containers={"b1": "db", "b2": "cache"}, latency=0.05) as other, \
+            FakeDockerDaemon(containers={"c1": "slow"}, latency=2.0) as slow:
+        listing, elapsed, again, skipped, versions = asyncio.run(scenario(fast, other, slow))
+
+    assert elapsed < 1.0
+    assert listing.partial
+    assert [(c.host, c.name) for c in listing.items] == [("h0", "web"), ("h1", "db"), ("h1", "cache")]
+    states = {host.host: host.state for host in listing.hosts}
+    assert states == {"h0": HostState.ok, "h1": HostState.ok,
+                      "h2": HostState.timeout, "offline": HostState.unavailable}
+
+    assert skipped < 0.2
+    assert again.hosts[2].detail.startswith("Skipped after a recent failure")
+
+    assert [v.host for v in versions.items] == ["h0", "h1"]
+    assert versions.items[0].version == "25.0.1"
+    assert versions.hosts[2].state == HostState.timeout
+    assert versions.hosts[3].detail.startswith("Skipped after a recent failure")
+
+
+def test_fleet_routes():
+    async def scenario(first, second, fleet_timeout):
+        fleet = _fleet(first, second, timeout=fleet_timeout)
+        app.dependency_overrides[get_docker_fleet] = lambda: fleet
+        try:
+            status, _, body = await call_async(app, "GET", "/api/fleet/stats")
+            stats = json.loads(body)
+            status_images, _, images = await call_async(app, "GET", "/api/fleet/images?dangling=false")
+            return status, stats, status_images, json.loads(images)
+        finally:
+            app.dependency_overrides.clear()
+            await fleet.close()
+
+    with FakeDockerDaemon(containers={"a1": "web", "a2": "idle"}, images={"sha256:1": ["nginx:1"]}) as first, \
+            FakeDockerDaemon(containers={"b1": "db"}, images={"sha256:2": ["redis:7"]}) as second:
+        first.containers["a1"]["running"] = True
+        second.containers["b1"]["running"] = True
+        status, stats, status_images, images = asyncio.run(scenario(first, second, 5.0))
+
+    assert status == 200 and not stats["partial"]
+    assert [(row["host"], row["name"]) for row in stats["items"]] == [("h0", "web"), ("h1", "db")]
+    assert stats["items"][0]["memory_usage"] > 0
+    assert status_images == 200
+    assert [(row["host"], row["name"]) for row in images["items"]] == [("h0", "nginx:1"), ("h1", "redis:7")]
+
+
+def test_no_host_answering_is_503(tmp_path):
+    async def scenario():
+        fleet = _fleet(offline=tmp_path / "missing.sock")
+        app.dependency_overrides[get_docker_fleet] = lambda: fleet
+        try:
+            return await call_async(app, "GET", "/api/fleet/version")
+        finally:
+            app.dependency_overrides.clear()
+
+    status, _, _ = asyncio.run(scenario())
+    assert status == 503
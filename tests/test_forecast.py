@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from services.forecast import TrendForecaster
+from services.stats_history import StatsHistory
+
+
+def test_forecast_recovers_linear_trend():
+    forecaster = TrendForecaster(capacity=2)
+    for t in range(10):
+        forecaster.observe(0, 1000.0 + t, 50.0 + 2.0 * t)
+        forecaster.observe(1, 1000.0 + t, 80.0)
+
+    predicted, lower, upper = forecaster.forecast(np.array([0, 1]), steps=3, step_seconds=1.0)
+
+    assert predicted[0] == pytest.approx([70.0, 72.0, 74.0])
+    assert predicted[1] == pytest.approx([80.0, 80.0, 80.0])
+    assert lower[0] == pytest.approx(predicted[0])
+    assert upper[0] == pytest.approx(predicted[0])
+
+
+def test_confidence_interval_widens_with_horizon():
+    rng = np.random.default_rng(0)
+    forecaster = TrendForecaster(capacity=1)
+    for t in range(50):
+        forecaster.observe(0, float(t), 100.0 + t + rng.normal(0, 5))
+
+    predicted, lower, upper = forecaster.forecast(np.array([0]), steps=5, step_seconds=10.0)
+    width = upper[0] - lower[0]
+
+    assert np.all(width > 0)
+    assert np.all(np.diff(width) > 0)
+    assert np.all((lower[0] < predicted[0]) & (predicted[0] < upper[0]))
+
+
+def test_incremental_sums_match_batch_refit():
+    history = StatsHistory(window=8, max_containers=4)
+    rng = np.random.default_rng(1)
+    for t in range(30):
+        for container in ("a", "b", "c"):
+            history.append(container, container, 1_700_000_000.0 + t * 10,
+                           memory_usage=float(rng.uniform(10, 500)))
+
+    _, _, slots = history.active()
+    slope, _, std, *_ = history.trend.coefficients(slots)
+    predicted, _, _ = history.trend.forecast(slots, steps=3, step_seconds=10.0)
+    history.refit()
+    batch_slope, _, batch_std, *_ = history.trend.coefficients(slots)
+    batch_predicted, _, _ = history.trend.forecast(slots, steps=3, step_seconds=10.0)
+
+    assert slope == pytest.approx(batch_slope, rel=1e-6)
+    assert std == pytest.approx(batch_std, rel=1e-6)
+    assert predicted == pytest.approx(batch_predicted, rel=1e-6)
+
+
+def test_record_refits_and_rebases_periodically():
+    history = StatsHistory(window=4, max_containers=2, refit_every=5)
+    for t in range(12):
+        history.record([{"id": "a", "name": "a", "memory_usage": 100.0 + t}], 1000.0 + t * 10)
+
+    # Refit after round 10: the origin is the oldest of the 4 buffered samples
+    assert history.trend.origin[0] == 1000.0 + 6 * 10
+    slope, *_ = history.trend.coefficients(np.array([0]))
+    assert slope[0] == pytest.approx(0.1)
+
+
+def test_single_sample_forecast_is_flat():
+    forecaster = TrendForecaster(capacity=1)
+    forecaster.observe(0, 5.0, 42.0)
+
+    predicted, lower, upper = forecaster.forecast(np.array([0]), steps=2, step_seconds=1.0)
+
+    assert list(predicted[0]) == [42.0, 42.0]
+    assert list(lower[0]) == [42.0, 42.0]
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from unittest.mock import patch, MagicMock
+import pytest
+from fake_daemon import FakeDockerDaemon
+from models.exceptions import DockerUnavailableError
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.docker_engine import DockerEngine
+from services.health_monitor import HealthMonitor
+
+
+def test_circuit_opens_after_consecutive_failures():
+    monitor = HealthMonitor(lambda: None, failure_threshold=3)
+    monitor.probe()
+    assert monitor.online
+
+    monitor.record_failure()
+    monitor.record_failure()
+    assert monitor.allow()
+    monitor.record_success()
+    monitor.record_failure()
+    monitor.record_failure()
+    assert monitor.allow()
+    monitor.record_failure()
+
+    assert not monitor.allow()
+    assert monitor.state == "open"
+
+
+def test_background_probe_backs_off_and_closes_on_recovery():
+    probes = []
+
+    def probe():
+        probes.append(time.monotonic())
+        if len(probes) <= 4:
+            raise ConnectionError("daemon hung")
+
+    monitor = HealthMonitor(probe, interval=0.02, failure_threshold=1, max_backoff=0.08)
+    monitor.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not monitor.online:
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+    finally:
+        monitor.stop()
+
+    # 0.02s, then doubling up to the 0.08s cap
+    gaps = [later - earlier for earlier, later in zip(probes, probes[1:])]
+    assert gaps[0] < gaps[1] < gaps[2]
+    assert 0.07 <= gaps[3] < 0.12
+
+
+@patch("services.docker_engine.docker.from_env")
+def test_engine_reads_cached_state_while_monitored(mock_from_env):
+    client = mock_from_env.return_value
+    engine = DockerEngine(health_ttl=60)
+    engine.connect()
+    engine.start_monitoring()
+    try:
+        calls = client.ping.call_count
+        for _ in range(100):
+            assert engine.is_online() is True
+        assert client.ping.call_count == calls
+    finally:
+        engine.close()
+
+
+def test_async_engine_fails_fast_while_circuit_is_open():
+    with FakeDockerDaemon(containers={"abc": "web"}) as daemon:
+        health = HealthMonitor(MagicMock(side_effect=ConnectionError("down")))
+        client = AsyncDockerClient(AsyncDockerEngine(daemon.url, health=health))
+
+        async def scenario():
+            with pytest.raises(DockerUnavailableError):
+                await client.inspect_container("abc")
+            online = await client.is_docker_online()
+            health.record_success()
+            return online, await client.inspect_container("abc")
+
+        online, container = asyncio.run(scenario())
+
+    assert online is False
+    assert container["Id"] == "abc"
+    assert daemon.requests == [("GET", "/containers/abc/json")]
+
+
+def test_async_connection_failures_open_the_circuit(tmp_path):
+    health = HealthMonitor(lambda: None, failure_threshold=2)
+    health.probe()
+    engine = AsyncDockerEngine(f"unix://{tmp_path}/missing.sock", health=health)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(OSError):
+                await engine.request("GET", "/_ping")
+        with pytest.raises(DockerUnavailableError):
+            await engine.request("GET", "/_ping")
+
+    asyncio.run(scenario())
+    assert not health.online
@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+from starlette.responses import PlainTextResponse, StreamingResponse
+from asgi import call, call_async
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_async_docker_client
+from main import app, page_cache, templates
+from middlewares import compressionMiddleware
+from middlewares.compressionMiddleware import CompressionMiddleware, negotiate
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.http_cache import etag_matches, make_etag
+from services.inventory_cache import InventoryCache
+
+
+def test_etag_matching_and_encoding_negotiation(monkeypatch):
+    etag = make_etag("containers", "abc-1", "")
+    assert etag.startswith('W/"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag) and not etag_matches(None, etag)
+
+    monkeypatch.setattr(compressionMiddleware, "brotli", None)
+    assert negotiate("gzip, deflate, br") == "gzip"
+    assert negotiate("br;q=1, gzip;q=0") is None
+    assert negotiate("identity") is None
+    monkeypatch.setattr(compressionMiddleware, "brotli", MagicMock())
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("br;q=0.5, gzip") == "gzip"
+    assert negotiate("*") == "br"
+
+
+def _cached_client(count=3):
+    engine = MagicMock()
+    listed = []
+    for i in range(count):
+        container = MagicMock(id=f"c{i}", status="running", attrs={})
+        container.name = f"app-{i}"
+        listed.append(container)
+    engine.get_client.return_value.containers.list.return_value = listed
+    engine.get_client.return_value.images.list.return_value = []
+    cache = InventoryCache(engine)
+    cache.resync()
+    async_engine = MagicMock()
+    async_engine.is_online = AsyncMock(return_value=True)
+    return AsyncDockerClient(async_engine, cache), cache
+
+
+@pytest.fixture
+def cached():
+    client, cache = _cached_client()
+    app.dependency_overrides[get_async_docker_client] = lambda: client
+    yield cache
+    app.dependency_overrides.clear()
+
+
+def test_listing_etag_follows_the_inventory_version(cached, monkeypatch):
+    status, headers, body = call(app, "GET", "/api/containers/?limit=2")
+    etag = headers["etag"]
+    assert status == 200 and b"app-0" in body
+
+    # Matching tag: 304 without touching the inventory
+    monkeypatch.setattr(cached, "container_index", MagicMock(side_effect=AssertionError))
+    status, headers, body = call(app, "GET", "/api/containers/?limit=2", {"If-None-Match": etag})
+    assert (status, body, headers["etag"]) == (304, b"", etag)
+    monkeypatch.undo()
+
+    # Another query or another inventory version is another representation
+    status, headers, _ = call(app, "GET", "/api/containers/?limit=1", {"If-None-Match": etag})
+    assert status == 200 and headers["etag"] != etag
+    cached.resync()
+    status, headers, _ = call(app, "GET", "/api/containers/?limit=2", {"If-None-Match": etag})
+    assert status == 200 and headers["etag"] != etag
+
+
+def test_page_is_rendered_once_per_inventory_version(cached, monkeypatch):
+    renders = []
+    template_response = templates.TemplateResponse
+    monkeypatch.setattr(templates, "TemplateResponse",
+                        lambda *args, **kwargs: renders.append(args[1]) or template_response(*args, **kwargs))
+
+    status, headers, first = call(app, "GET", "/pages/containers")
+    assert status == 200 and b"app-2" in first
+    status, _, again = call(app, "GET", "/pages/containers")
+    assert again == first and renders == ["containers.html"]
+
+    status, _, body = call(app, "GET", "/pages/containers", {"If-None-Match": headers["etag"]})
+    assert (status, body) == (304, b"")
+
+    cached.resync()
+    call(app, "GET", "/pages/containers")
+    assert renders == ["containers.html"] * 2
+    assert len(page_cache) >= 2
+
+
+def test_uncached_listing_is_tagged_by_content():
+    with FakeDockerDaemon(containers={"abc": "web"}) as daemon:
+        app.dependency_overrides[get_async_docker_client] = \
+            lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        try:
+            _, headers, _ = call(app, "GET", "/api/containers/")
+            status, _, body = call(app, "GET", "/api/containers/", {"If-None-Match": headers["etag"]})
+            assert (status, body) == (304, b"")
+            daemon.containers["def"] = {"name": "db", "running": False, "labels": {}}
+            status, _, _ = call(app, "GET", "/api/containers/", {"If-None-Match": headers["etag"]})
+            assert status == 200
+        finally:
+            app.dependency_overrides.clear()
+
+
+def test_compresses_large_and_streamed_bodies_only(monkeypatch):
+    monkeypatch.setattr(compressionMiddleware, "brotli", None)
+
+    async def endpoint(scope, receive, send):
+        path = scope["path"]
+        if path == "/small":
+            response = PlainTextResponse("tiny")
+        elif path == "/large":
+            response = PlainTextResponse("x" * 5000)
+        elif path == "/events":
+            response = StreamingResponse(iter([b"data: 1\n\n"]), media_type="text/event-stream")
+        else:
+            response = StreamingResponse(iter([b"[1", b",2", b"]"]), media_type="application/json")
+        await response(scope, receive, send)
+
+    middleware = CompressionMiddleware(endpoint, minimum_size=100)
+    gzip_ok = {"Accept-Encoding": "gzip"}
+
+    status, headers, body = asyncio.run(call_async(middleware, "GET", "/large", gzip_ok))
+    assert headers["content-encoding"] == "gzip" and headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body) < 100
+    assert gzip.decompress(body) == b"x" * 5000
+
+    _, headers, body = asyncio.run(call_async(middleware, "GET", "/stream", gzip_ok))
+    assert headers["content-encoding"] == "gzip" and "content-length" not in headers
+    assert gzip.decompress(body) == b"[1,2]"
+
+    for path, request_headers in (("/small", gzip_ok), ("/events", gzip_ok), ("/large", {})):
+        _, headers, body = asyncio.run(call_async(middleware, "GET", path, request_headers))
+        assert "content-encoding" not in headers
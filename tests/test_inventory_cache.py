@@ -0,0 +1,127 @@
+import time
+from unittest.mock import MagicMock
+import docker.errors
+from fake_daemon import FakeDockerDaemon
+from services.docker_client import DockerClient
+from services.docker_engine import DockerEngine
+from services.inventory_cache import InventoryCache
+from services.listing import ListingQuery
+
+
+def _container(container_id, name):
+    container = MagicMock()
+    container.id = container_id
+    container.name = name
+    return container
+
+
+def _image(image_id, tags):
+    image = MagicMock()
+    image.id = image_id
+    image.tags = tags
+    return image
+
+
+def _cache():
+    engine = MagicMock()
+    client = engine.get_client.return_value
+    sparse = _container("c1", None)
+    sparse.attrs = {"Names": ["/web"]}
+    client.containers.list.return_value = [sparse]
+    client.images.list.return_value = [_image("sha256:i1", ["nginx:latest"])]
+    cache = InventoryCache(engine, resync_interval=60)
+    cache.resync()
+    return cache, client
+
+
+def test_resync_seeds_inventory():
+    cache, client = _cache()
+
+    assert cache.ready
+    assert [(c.id, c.name) for c in cache.containers()] == [("c1", "web")]
+    assert [(i.id, i.name) for i in cache.images()] == [("sha256:i1", "nginx:latest")]
+    client.containers.list.assert_called_once_with(all=True, sparse=True)
+
+
+def test_container_events_are_applied_incrementally():
+    cache, client = _cache()
+    client.containers.get.return_value = _container("c2", "db")
+    version = cache.version
+
+    cache.apply_event({"Type": "container", "Action": "create", "Actor": {"ID": "c2"}})
+    cache.apply_event({"Type": "container", "Action": "rename",
+                       "Actor": {"ID": "c1", "Attributes": {"name": "/frontend"}}})
+    cache.apply_event({"Type": "container", "Action": "exec_start", "Actor": {"ID": "c1"}})
+
+    assert sorted((c.id, c.name) for c in cache.containers()) == [("c1", "frontend"), ("c2", "db")]
+    assert cache.version == version + 2
+
+    cache.apply_event({"Type": "container", "Action": "destroy", "Actor": {"ID": "c2"}})
+    assert [c.id for c in cache.containers()] == ["c1"]
+
+
+def test_rename_keeps_status_and_labels():
+    cache, client = _cache()
+    labelled = _container("c3", "api")
+    labelled.status = "running"
+    labelled.attrs = {"Labels": {"tier": "web"}}
+    client.containers.get.return_value = labelled
+    cache.apply_event({"Type": "container", "Action": "start", "Actor": {"ID": "c3"}})
+
+    cache.apply_event({"Type": "container", "Action": "rename",
+                       "Actor": {"ID": "c3", "Attributes": {"name": "/api-v2"}}})
+
+    page = cache.container_index().page(ListingQuery(status="running", labels=["tier=web"]))
+    assert [(c.id, c.name, c.status, c.labels) for c in page.items] == \
+        [("c3", "api-v2", "running", {"tier": "web"})]
+    assert client.containers.get.call_count == 1
+
+
+def test_image_events_are_applied_incrementally():
+    cache, client = _cache()
+    client.images.get.return_value = _image("sha256:i1", ["nginx:1.27"])
+
+    cache.apply_event({"Type": "image", "Action": "tag", "Actor": {"ID": "sha256:i1"}})
+    assert cache.images()[0].name == "nginx:1.27"
+
+    client.images.get.side_effect = docker.errors.ImageNotFound("gone")
+    cache.apply_event({"Type": "image", "Action": "untag", "Actor": {"ID": "sha256:i1"}})
+    assert cache.images() == []
+
+
+def test_docker_client_serves_listings_from_cache():
+    cache, client = _cache()
+    client.containers.list.reset_mock()
+    client.images.list.reset_mock()
+
+    docker_client = DockerClient(cache.engine, cache)
+
+    assert [c.name for c in docker_client.list_containers()] == ["web"]
+    assert [i.name for i in docker_client.list_images()] == ["nginx:latest"]
+    client.containers.list.assert_not_called()
+    client.images.list.assert_not_called()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_cache_follows_daemon_events(monkeypatch):
+    with FakeDockerDaemon.generate(containers=3, images=2, running=0) as daemon:
+        monkeypatch.setenv("DOCKER_HOST", daemon.url)
+        engine = DockerEngine()
+        cache = InventoryCache(engine, resync_interval=60)
+        cache.start()
+        try:
+            _wait_for(lambda: cache.ready)
+            container_id = next(iter(daemon.containers))
+            engine.get_client().containers.get(container_id).start()
+
+            _wait_for(lambda: {c.id: c.status for c in cache.containers()}[container_id] == "running")
+            assert len(cache.images()) == 2
+        finally:
+            cache.stop()
+            engine.close()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from asgi import call_async
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_async_docker_client, get_job_queue
+from main import app
+from models.docker_model import JobStatus
+from models.exceptions import NoDataFoundException
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.job_scheduler import JobScheduler
+
+
+def test_serializes_per_target_and_limits_concurrency():
+    async def scenario():
+        scheduler = JobScheduler(max_concurrency=2)
+        running, peak, order = set(), [0], []
+
+        def operation(name, target):
+            async def run():
+                running.add(name)
+                peak[0] = max(peak[0], len(running))
+                assert not any(other.startswith(target) for other in running - {name})
+                await asyncio.sleep(0.02)
+                order.append(name)
+                running.discard(name)
+            return run
+
+        jobs = [scheduler.submit(action, target, operation(f"{target}-{action}", target))
+                for target in ("a", "b", "c") for action in ("stop", "start")]
+        await asyncio.gather(*scheduler._tasks)
+        return scheduler, jobs, peak[0], order
+
+    scheduler, jobs, peak, order = asyncio.run(scenario())
+
+    assert peak == 2
+    assert all(job.status == JobStatus.succeeded and job.duration_ms >= 20 for job in jobs)
+    for target in ("a", "b", "c"):
+        assert order.index(f"{target}-stop") < order.index(f"{target}-start")
+    assert not scheduler._locks and not scheduler._tails
+
+
+def test_deduplicates_only_the_latest_pending_job():
+    async def scenario():
+        scheduler = JobScheduler()
+        calls = []
+
+        def operation(name):
+            async def run():
+                calls.append(name)
+                await asyncio.sleep(0.01)
+            return run
+
+        first = scheduler.submit("stop", "a", operation("stop-1"))
+        duplicate = scheduler.submit("stop", "a", operation("stop-2"))
+        start = scheduler.submit("start", "a", operation("start"))
+        # Not the tail any more: merging it would reorder the operations
+        stop_again = scheduler.submit("stop", "a", operation("stop-3"))
+        await asyncio.gather(*scheduler._tasks)
+        after = scheduler.submit("stop", "a", operation("stop-4"))
+        await asyncio.gather(*scheduler._tasks)
+        return first, duplicate, start, stop_again, after, calls
+
+    first, duplicate, start, stop_again, after, calls = asyncio.run(scenario())
+
+    assert duplicate is first
+    assert stop_again is not first and after is not stop_again
+    assert calls == ["stop-1", "start", "stop-3", "stop-4"]
+
+
+def test_records_failures_and_prunes_finished_jobs():
+    async def scenario():
+        scheduler = JobScheduler(max_jobs=2)
+
+        async def missing():
+            raise NoDataFoundException("Container 'x' not found.")
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        jobs = [scheduler.submit("start", "x", missing), scheduler.submit("start", "y", broken)]
+        await asyncio.gather(*scheduler._tasks)
+        later = scheduler.submit("start", "z", missing)
+        await asyncio.gather(*scheduler._tasks)
+        return scheduler, jobs, later
+
+    scheduler, (missing, broken), later = asyncio.run(scenario())
+
+    assert (missing.status, missing.detail) == (JobStatus.not_found, "Container 'x' not found.")
+    assert (broken.status, broken.detail) == (JobStatus.failed, "boom")
+    assert scheduler.get(missing.id) is None
+    assert scheduler.get(later.id) is later
+
+
+def test_start_and_stop_return_202_with_a_pollable_job():
+    async def scenario(daemon):
+        scheduler = JobScheduler()
+        app.dependency_overrides[get_async_docker_client] = \
+            lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        app.dependency_overrides[get_job_queue] = lambda: scheduler
+        try:
+            status, headers, body = await call_async(app, "POST", "/api/containers/web/stop")
+            job = json.loads(body)
+            assert status == 202
+            assert headers["location"] == f"/api/jobs/{job['id']}"
+            assert job["status"] == "queued"
+
+            await asyncio.gather(*scheduler._tasks)
+            status, _, body = await call_async(app, "GET", headers["location"])
+            assert status == 200
+            assert json.loads(body)["status"] == "succeeded"
+
+            _, _, body = await call_async(app, "POST", "/api/containers/missing/start")
+            await asyncio.gather(*scheduler._tasks)
+            _, _, body = await call_async(app, "GET", f"/api/jobs/{json.loads(body)['id']}")
+            assert json.loads(body)["status"] == "not_found"
+
+            status, _, _ = await call_async(app, "GET", "/api/jobs/unknown")
+            assert status == 404
+        finally:
+            app.dependency_overrides.clear()
+
+    with FakeDockerDaemon(containers={"abc": "web"}) as daemon:
+        asyncio.run(scenario(daemon))
+        assert ("POST", "/containers/web/stop") in daemon.requests
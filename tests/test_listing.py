@@ -0,0 +1,98 @@
+import asyncio
+import json
+import pytest
+from starlette.responses import StreamingResponse
+from models.docker_model import DockerContainer, DockerImage
+from services import listing
+from services.listing import (ListingIndex, ListingQuery, decode_cursor, encode_cursor,
+                              listing_response, parse_fields, project)
+
+
+def _containers():
+    return [
+        DockerContainer(id=f"c{i:02d}", name=f"app-{i}",
+                        status="running" if i % 2 else "exited",
+                        labels={"tier": "web" if i < 5 else "db"})
+        for i in range(10)
+    ]
+
+
+def test_cursor_pagination_walks_all_rows_once():
+    index = ListingIndex(list(reversed(_containers())))
+    seen, cursor = [], None
+    while True:
+        page = index.page(ListingQuery(limit=3, cursor=cursor))
+        seen += [row.id for row in page.items]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == [f"c{i:02d}" for i in range(10)]
+
+
+def test_filters_use_status_and_label_index():
+    index = ListingIndex(_containers())
+
+    page = index.page(ListingQuery(status="running", labels=["tier=web"]))
+    assert [row.id for row in page.items] == ["c01", "c03"]
+
+    page = index.page(ListingQuery(labels=["tier"], name="app-9"))
+    assert [row.id for row in page.items] == ["c09"]
+
+
+def test_dangling_filter_for_images():
+    index = ListingIndex([DockerImage(id="sha256:a", name="untagged"),
+                          DockerImage(id="sha256:b", name="nginx:latest")])
+
+    assert [row.id for row in index.page(ListingQuery(dangling=True)).items] == ["sha256:a"]
+    assert [row.id for row in index.page(ListingQuery(dangling=False)).items] == ["sha256:b"]
+
+
+def test_filters_are_pushed_down_in_engine_format():
+    query = ListingQuery(name="web", labels=["tier=db"], status="running", dangling=True)
+
+    assert query.container_filters() == {"name": ["web"], "label": ["tier=db"], "status": ["running"]}
+    assert query.image_filters() == {"label": ["tier=db"], "dangling": ["true"]}
+
+
+def test_projection_and_cursor_helpers():
+    assert parse_fields("id, name", DockerContainer) == ["id", "name"]
+    with pytest.raises(ValueError, match="Unknown fields: size"):
+        parse_fields("id,size", DockerContainer)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("%%%")
+
+    assert project(_containers()[:1], ["id"]) == [{"id": "c00"}]
+    assert decode_cursor(encode_cursor("sha256:abc")) == "sha256:abc"
+
+
+def _body(response):
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    if isinstance(response, StreamingResponse):
+        return asyncio.run(read())
+    return response.body
+
+
+@pytest.mark.parametrize("fast_encoder", [True, False])
+def test_listing_response_matches_validated_serialization(monkeypatch, fast_encoder):
+    if not fast_encoder:
+        monkeypatch.setattr(listing, "orjson", None)
+    rows = _containers()
+    expected = [row.model_dump() for row in rows]
+
+    small = listing_response(rows, headers={"X-Next-Cursor": "abc"})
+    assert not isinstance(small, StreamingResponse)
+    assert small.headers["x-next-cursor"] == "abc"
+    assert json.loads(_body(small)) == expected
+
+    # Longer than a chunk: streamed, still one JSON array
+    for chunk_size in (1, 3, 5):
+        streamed = listing_response(rows, chunk_size=chunk_size)
+        assert isinstance(streamed, StreamingResponse)
+        assert json.loads(_body(streamed)) == expected
+
+    projected = listing_response(rows, ["id", "status"], chunk_size=4)
+    assert json.loads(_body(projected)) == project(rows, ["id", "status"])
+    assert json.loads(_body(listing_response([]))) == []
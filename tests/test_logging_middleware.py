@@ -0,0 +1,73 @@
+import asyncio
+import json
+from asgi import call
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from middlewares.loggingMiddleware import AccessLogWriter, LoggingMiddleware
+
+
+async def hello(request):
+    return PlainTextResponse("hello", status_code=201)
+
+
+async def stream(request):
+    async def chunks():
+        for i in range(3):
+            yield f"chunk{i};"
+            await asyncio.sleep(0)
+    return StreamingResponse(chunks())
+
+
+def _app(writer):
+    app = Starlette(routes=[Route("/hello", hello), Route("/stream", stream)])
+    return LoggingMiddleware(app, writer=writer)
+
+
+def test_records_are_written_in_background(tmp_path):
+    writer = AccessLogWriter(path=str(tmp_path / "access.log"), flush_interval=0.01)
+    app = _app(writer)
+
+    status, _, body = call(app, "GET", "/hello?x=1")
+    writer.stop()
+
+    record = json.loads((tmp_path / "access.log").read_text().splitlines()[0])
+    assert (status, body) == (201, b"hello")
+    assert record["method"] == "GET"
+    assert record["url"] == "/hello?x=1"
+    assert record["status_code"] == 201
+    assert record["duration_ms"] >= 0
+
+
+def test_streaming_responses_pass_through(tmp_path):
+    writer = AccessLogWriter(path=str(tmp_path / "access.log"), flush_interval=0.01)
+
+    status, _, body = call(_app(writer), "GET", "/stream")
+    writer.stop()
+
+    assert status == 200
+    assert body == b"chunk0;chunk1;chunk2;"
+
+
+def test_log_file_is_rotated_by_size(tmp_path):
+    path = tmp_path / "access.log"
+    writer = AccessLogWriter(path=str(path), max_bytes=200, backup_count=2,
+                             batch_size=5, flush_interval=0.01)
+
+    for i in range(50):
+        writer.submit({"request": i, "padding": "x" * 20})
+    writer.stop()
+
+    assert (tmp_path / "access.log.1").exists()
+    assert (tmp_path / "access.log.2").exists()
+    assert not (tmp_path / "access.log.3").exists()
+
+
+def test_submit_never_blocks_when_queue_is_full(tmp_path):
+    writer = AccessLogWriter(path=str(tmp_path / "access.log"), queue_size=1)
+    writer._thread = object()  # pretend the writer is running but stalled
+
+    for i in range(5):
+        writer.submit({"request": i})
+
+    assert writer.dropped == 4
@@ -0,0 +1,84 @@
+import threading
+import pytest
+from asgi import call, call_json
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_async_docker_client
+from main import app
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.metrics import MetricsRegistry, docker_call, registry
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry()
+    latency = metrics.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.labels("/a").observe(value)
+    text = metrics.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert _sample(text, 'latency_seconds_bucket{route="/a",le="0.1"}') == 1
+    assert _sample(text, 'latency_seconds_bucket{route="/a",le="1.0"}') == 3
+    assert _sample(text, 'latency_seconds_bucket{route="/a",le="+Inf"}') == 4
+    assert _sample(text, 'latency_seconds_count{route="/a"}') == 4
+    assert _sample(text, 'latency_seconds_sum{route="/a"}') == pytest.approx(6.05)
+
+
+def test_counters_from_many_threads_are_not_lost():
+    metrics = MetricsRegistry()
+    hits = metrics.counter("hits_total", "Hits.").labels()
+
+    def worker():
+        for _ in range(10000):
+            hits.inc()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _sample(metrics.render(), "hits_total") == 80000
+
+
+def test_failed_docker_calls_are_counted():
+    with pytest.raises(RuntimeError):
+        with docker_call("bogus-op"):
+            raise RuntimeError("daemon down")
+    text = registry.render()
+
+    assert _sample(text, 'docker_api_call_errors_total{client="sync",operation="bogus-op"}') == 1
+    assert _sample(text, 'docker_api_call_duration_seconds_count{client="sync",operation="bogus-op"}') == 1
+
+
+def test_metrics_endpoint_labels_requests_by_route_template():
+    with FakeDockerDaemon(containers={"abc": "web"}) as daemon:
+        app.dependency_overrides[get_async_docker_client] = \
+            lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        try:
+            before = _sample(registry.render(),
+                             'http_request_duration_seconds_count'
+                             '{method="GET",route="/api/containers/{container_id}/stats/stream"}') or 0
+            call_json(app, "GET", "/api/containers/missing/stats/stream")
+            call_json(app, "GET", "/api/containers/gone/stats/stream")
+        finally:
+            app.dependency_overrides.clear()
+
+    status, headers, body = call(app, "GET", "/metrics")
+    text = body.decode()
+
+    assert status == 200
+    assert headers["content-type"].startswith("text/plain")
+    assert _sample(text, 'http_request_duration_seconds_count'
+                         '{method="GET",route="/api/containers/{container_id}/stats/stream"}') == before + 2
+    assert _sample(text, 'http_request_errors_total'
+                         '{method="GET",route="/api/containers/{container_id}/stats/stream",status="404"}') >= 2
+    assert _sample(text, 'docker_api_call_duration_seconds_count{client="async",operation="inspect"}') >= 2
+    assert "/api/containers/missing/stats/stream" not in text
@@ -0,0 +1,61 @@
+import pytest
+from asgi import call, call_json
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_async_docker_client
+from main import app
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+
+
+@pytest.fixture
+def daemon():
+    containers = {f"c{i:02d}": f"app-{i}" for i in range(5)}
+    images = {"sha256:1": ["nginx:latest"], "sha256:2": []}
+    with FakeDockerDaemon(containers=containers, images=images) as daemon:
+        app.dependency_overrides[get_async_docker_client] = \
+            lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        yield daemon
+        app.dependency_overrides.clear()
+
+
+def test_container_listing_is_paginated(daemon):
+    status, headers, body = call_json(app, "GET", "/api/containers/?limit=2")
+    assert status == 200
+    assert [c["id"] for c in body] == ["c00", "c01"]
+
+    status, headers, body = call_json(
+        app, "GET", f"/api/containers/?limit=10&cursor={headers['x-next-cursor']}")
+    assert [c["id"] for c in body] == ["c02", "c03", "c04"]
+    assert "x-next-cursor" not in headers
+
+
+def test_container_listing_projection(daemon):
+    status, _, body = call_json(app, "GET", "/api/containers/?fields=name&limit=1")
+    assert status == 200
+    assert body == [{"name": "app-0"}]
+
+    status, _, body = call_json(app, "GET", "/api/containers/?fields=bogus")
+    assert status == 400
+
+
+def test_image_listing_pushes_filters_down(daemon):
+    status, _, body = call_json(app, "GET", "/api/images/?dangling=true")
+    assert status == 200
+    assert [i["id"] for i in body] == ["sha256:2"]
+    assert any(path == "/images/json" for _, path in daemon.requests)
+
+
+def test_bulk_start_reports_each_container(daemon):
+    status, _, body = call_json(app, "POST", "/api/containers/bulk",
+                                body={"ids": ["c00", "c01", "missing"], "action": "start"})
+
+    assert status == 200
+    assert {cid: item["status"] for cid, item in body["results"].items()} == \
+        {"c00": "ok", "c01": "ok", "missing": "not_found"}
+    assert daemon.containers["c00"]["running"] is True
+
+
+def test_container_page_renders(daemon):
+    status, _, body = call(app, "GET", "/pages/containers")
+
+    assert status == 200
+    assert b"app-0" in body
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock
+import pytest
+from services.health_monitor import CLOSED, OPEN, HealthMonitor
+from services.inventory_cache import InventoryCache
+from services.prediction_manager import ContainerMemoryManager
+from services.shared_cache import Segment, SharedCache, _HEADER, _SEQ, _SEQ_OFFSET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_segment_round_trip_and_cached_reads(tmp_path):
+    writer = Segment(str(tmp_path / "doc.seg"), initial_size=64)
+    reader = Segment(str(tmp_path / "doc.seg"))
+    assert reader.read() is None
+
+    writer.write({"n": 1})
+    first = reader.read()
+    assert first == {"n": 1}
+    # Unchanged sequence: the decoded document is reused
+    assert reader.read() is first
+
+    # Larger than the file: it grows and the reader remaps
+    writer.write({"n": 2, "rows": ["x" * 100] * 50})
+    assert reader.read()["n"] == 2
+    assert reader.sequence == 4
+
+
+def test_segment_reader_skips_torn_writes(tmp_path):
+    writer = Segment(str(tmp_path / "doc.seg"))
+    reader = Segment(str(tmp_path / "doc.seg"))
+    writer.write({"n": 1})
+    assert reader.read() == {"n": 1}
+
+    # A writer that died mid-write leaves an odd sequence behind
+    _SEQ.pack_into(writer._map, _SEQ_OFFSET, 3)
+    assert reader.read() == {"n": 1}
+    # Garbage under a valid-looking header fails the checksum
+    _SEQ.pack_into(writer._map, _SEQ_OFFSET, 4)
+    writer._map[_HEADER.size] = ord("#")
+    assert reader.read() == {"n": 1}
+
+    # The next writer evens the sequence out before publishing
+    Segment(str(tmp_path / "doc.seg")).write({"n": 2})
+    assert reader.read() == {"n": 2}
+
+
+def test_segment_is_readable_from_another_process(tmp_path):
+    path = str(tmp_path / "doc.seg")
+    Segment(path).write({"containers": ["web"]})
+    probe = f"from services.shared_cache import Segment; print(Segment({path!r}).read())"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "{'containers': ['web']}"
+
+
+def _worker(path, containers=()):
+    engine = MagicMock()
+    engine.health = HealthMonitor(lambda: None)
+    client = engine.get_client.return_value
+    client.containers.list.return_value = []
+    for container_id, name in containers:
+        container = MagicMock(id=container_id, status="running", attrs={})
+        container.name = name
+        client.containers.list.return_value.append(container)
+    client.images.list.return_value = []
+    inventory = InventoryCache(engine, resync_interval=60)
+    return SharedCache(str(path), engine, inventory, interval=0.05), engine, inventory
+
+
+@pytest.fixture
+def no_pollers(monkeypatch):
+    started = []
+    monkeypatch.setattr(SharedCache, "_start_sources", lambda self: started.append(self))
+    return started
+
+
+def test_one_worker_leads_and_the_others_mirror_it(tmp_path, no_pollers):
+    leader, leader_engine, leader_inventory = _worker(tmp_path, [("c1", "web"), ("c2", "db")])
+    follower, follower_engine, follower_inventory = _worker(tmp_path)
+    try:
+        leader.tick()
+        follower.tick()
+        assert leader.leader and not follower.leader
+        assert no_pollers == [leader]
+
+        leader_inventory.resync()
+        leader_engine.health.record_success()
+        leader.tick()
+        follower.tick()
+
+        assert follower_inventory.ready
+        assert sorted(c.name for c in follower_inventory.containers()) == ["db", "web"]
+        assert follower_inventory.tag == leader_inventory.tag
+        assert follower_engine.health.state == CLOSED
+        # Followers never talked to the daemon
+        follower_engine.get_client.assert_not_called()
+
+        leader_engine.health.adopt(OPEN)
+        leader.tick()
+        follower.tick()
+        assert follower_engine.health.state == OPEN
+    finally:
+        leader.close()
+
+    # The lock is released with the leader; the next tick takes over
+    try:
+        follower.tick()
+        assert follower.leader and no_pollers == [leader, follower]
+    finally:
+        follower.close()
+
+
+def test_stats_rounds_are_mirrored_to_followers(tmp_path, no_pollers):
+    leader, *_ = _worker(tmp_path)
+    follower, *_ = _worker(tmp_path)
+    sampled, mirrored = ContainerMemoryManager(MagicMock()), ContainerMemoryManager(MagicMock())
+    leader._local_manager = lambda: sampled
+    follower._local_manager = lambda: mirrored
+    try:
+        leader.tick()
+        follower.request_stats()
+        assert leader.stats_wanted()
+
+        sampled.record([{"id": "c1", "name": "web", "memory_usage": 64.0, "partial": False}], 100.0)
+        leader.tick()
+        follower.tick()
+        follower.tick()
+
+        assert mirrored.history.latest() == sampled.history.latest()
+        assert len(mirrored.history.series("c1")[0]) == 1
+    finally:
+        leader.close()
+        follower.close()
@@ -0,0 +1,99 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+import pytest
+from services.docker_client import DockerClient
+from services.prediction_manager import ContainerMemoryManager
+from services.single_flight import SingleFlight
+
+
+def _run_concurrently(fn, callers):
+    barrier = threading.Barrier(callers)
+    results, errors = [], []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call_per_key():
+    flights = SingleFlight()
+    calls = []
+
+    def slow(key):
+        calls.append(key)
+        time.sleep(0.1)
+        return key.upper()
+
+    results, _ = _run_concurrently(lambda: (flights.do("a", lambda: slow("a")),
+                                            flights.do("b", lambda: slow("b"))), 32)
+
+    assert sorted(calls) == ["a", "b"]
+    assert results == [("A", "B")] * 32
+    assert len(flights) == 0
+
+
+def test_error_is_shared_and_next_flight_starts_fresh():
+    flights = SingleFlight()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("daemon down")
+
+    results, errors = _run_concurrently(lambda: flights.do("k", failing), 16)
+
+    assert results == [] and len(errors) == 16
+    assert all(str(error) == "daemon down" for error in errors)
+    assert len(calls) == 1
+    assert flights.do("k", lambda: "ok") == "ok"
+
+
+@patch("services.docker_engine.docker.from_env")
+def test_docker_client_listing_is_coalesced(mock_from_env):
+    container = MagicMock(id="c1", status="running", attrs={})
+    container.name = "web"
+
+    def list_containers(**kwargs):
+        time.sleep(0.1)
+        return [container]
+
+    mock_from_env.return_value.containers.list.side_effect = list_containers
+    engine = DockerClient().engine
+
+    results, errors = _run_concurrently(lambda: DockerClient(engine).list_containers(), 40)
+
+    assert errors == []
+    assert [[c.name for c in result] for result in results] == [["web"]] * 40
+    assert mock_from_env.return_value.containers.list.call_count == 1
+
+
+@patch("services.prediction_manager.docker.from_env")
+def test_stats_sweep_is_coalesced(mock_from_env):
+    container = MagicMock(id="c1")
+    container.name = "web"
+
+    def stats(stream=False):
+        time.sleep(0.1)
+        return {"memory_stats": {"usage": 64 * 1024 ** 2}}
+
+    container.stats.side_effect = stats
+    mock_from_env.return_value.containers.list.return_value = [container]
+    manager = ContainerMemoryManager()
+
+    _, errors = _run_concurrently(manager.fetch_container_stats, 20)
+
+    assert errors == []
+    assert mock_from_env.return_value.containers.list.call_count == 1
+    assert container.stats.call_count == 1
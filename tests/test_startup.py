@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_app_import_does_not_load_prediction_stack():
+    probe = ("import sys, main; "
+             "print(sorted(m for m in ('pandas', 'numpy', 'services.prediction_manager') "
+             "if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == "[]"
+
+
+def test_prediction_manager_is_loaded_on_first_use(monkeypatch):
+    import dependencies
+    from services import prediction_manager
+
+    started = []
+    monkeypatch.setattr(prediction_manager.ContainerMemoryManager, "start_sampling",
+                        lambda self: started.append(self))
+    monkeypatch.setattr(prediction_manager, "_manager", None)
+
+    manager = dependencies.get_prediction_manager()
+
+    assert manager is prediction_manager.get_memory_manager()
+    assert started == [manager]
+    dependencies.close_prediction_manager()
+    assert prediction_manager._manager is None
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from fake_daemon import FakeDockerDaemon
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.stats_broadcaster import StatsBroadcaster, summarize_stats
+
+
+@pytest.fixture
+def daemon():
+    with FakeDockerDaemon(containers={"abc123": "web"}, stats_interval=0.01) as daemon:
+        yield daemon
+
+
+def test_single_upstream_is_shared_and_torn_down(daemon):
+    async def scenario():
+        broadcaster = StatsBroadcaster(AsyncDockerClient(AsyncDockerEngine(daemon.url)))
+
+        async def watch(samples):
+            async with broadcaster.subscribe("abc123") as queue:
+                return [await queue.get() for _ in range(samples)]
+
+        results = await asyncio.gather(*(watch(3) for _ in range(10)))
+        upstreams_after = broadcaster.upstreams
+        await asyncio.sleep(0.05)
+        return results, upstreams_after
+
+    results, upstreams_after = asyncio.run(scenario())
+
+    assert all(len(samples) == 3 for samples in results)
+    assert results[0][0]["memory_usage"] == 64.0
+    assert sum(1 for _, path in daemon.requests if path == "/containers/abc123/stats") == 1
+    assert upstreams_after == 0
+    assert daemon.open_streams == 0
+
+
+def test_slow_subscriber_drops_oldest_samples(daemon):
+    async def scenario():
+        broadcaster = StatsBroadcaster(AsyncDockerClient(AsyncDockerEngine(daemon.url)), queue_size=2)
+        async with broadcaster.subscribe("abc123") as queue:
+            await asyncio.sleep(0.2)
+            first = await queue.get()
+            return first, queue.qsize(), broadcaster._channels["abc123"].dropped
+
+    first, size, dropped = asyncio.run(scenario())
+
+    assert size <= 1
+    assert dropped > 0
+    assert first["network_rx_bytes"] > 0
+
+
+def test_summarize_stats_computes_cpu_percent():
+    sample = summarize_stats({
+        "cpu_stats": {"cpu_usage": {"total_usage": 300}, "system_cpu_usage": 2000, "online_cpus": 2},
+        "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+        "memory_stats": {"usage": 1024 ** 2, "limit": 2 * 1024 ** 2},
+        "networks": {"eth0": {"rx_bytes": 1, "tx_bytes": 2}, "eth1": {"rx_bytes": 3, "tx_bytes": 4}},
+    })
+
+    assert sample["cpu_percent"] == 40.0
+    assert sample["memory_usage"] == 1.0
+    assert (sample["network_rx_bytes"], sample["network_tx_bytes"]) == (4, 6)
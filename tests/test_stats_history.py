@@ -0,0 +1,61 @@
+import time
+import numpy as np
+from unittest.mock import MagicMock
+from services.stats_history import StatsHistory
+from services.stats_sampler import StatsSampler
+
+
+def test_ring_buffer_keeps_last_window_samples():
+    history = StatsHistory(window=3, max_containers=4)
+    for i in range(5):
+        history.append("a", "alpha", float(i), memory_usage=float(i * 10))
+
+    timestamps, values = history.series("a")
+
+    assert list(timestamps) == [2.0, 3.0, 4.0]
+    assert list(values) == [20.0, 30.0, 40.0]
+    assert history.latest()[0]["memory_usage"] == 40.0
+
+
+def test_record_evicts_missing_containers_and_reuses_slots():
+    history = StatsHistory(window=4, max_containers=2)
+    history.record([{"id": "a", "name": "a", "memory_usage": 1.0},
+                    {"id": "b", "name": "b", "memory_usage": 2.0}], 1.0)
+    slot_a = history.slot_of("a")
+
+    history.record([{"id": "b", "name": "b", "memory_usage": 3.0},
+                    {"id": "c", "name": "c", "memory_usage": 4.0}], 2.0)
+
+    assert history.slot_of("a") is None
+    assert history.slot_of("c") == slot_a
+    assert len(history.series("c")[1]) == 1
+
+
+def test_partial_rows_keep_slot_without_sample():
+    history = StatsHistory(window=4)
+    history.record([{"id": "a", "name": "a", "memory_usage": 1.0}], 1.0)
+    history.record([{"id": "a", "name": "a", "memory_usage": None, "partial": True}], 2.0)
+
+    assert list(history.series("a")[1]) == [1.0]
+
+
+def test_memory_is_bounded():
+    history = StatsHistory(window=10, max_containers=2)
+    for i in range(5):
+        history.append(f"c{i}", f"c{i}", 0.0, memory_usage=1.0)
+
+    assert len(history) == 2
+    assert history.nbytes == 2 * 10 * 2 * 8
+    assert isinstance(history.values["memory_usage"], np.ndarray)
+
+
+def test_sampler_calls_manager_on_interval():
+    manager = MagicMock()
+    sampler = StatsSampler(manager, interval=0.01)
+
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+
+    assert manager.sample.call_count >= 2
+    assert not sampler.running
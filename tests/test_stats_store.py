@@ -0,0 +1,175 @@
+import math
+import os
+import time
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+from asgi import call_json
+from fake_daemon import FakeDockerDaemon
+from dependencies import get_async_docker_client, get_stats_history_store
+from main import app
+from services.async_docker_client import AsyncDockerClient, AsyncDockerEngine
+from services.prediction_manager import ContainerMemoryManager
+from services.stats_store import RECORD, StatsStore, aggregate
+
+DAY = 86400.0
+# An hour boundary within the raw retention, so buckets line up with the samples
+T0 = math.floor(time.time() / 3600) * 3600 - 7200.0
+
+
+def _row(container_id, memory, cpu=None, partial=False):
+    return {"id": container_id, "name": container_id, "memory_usage": memory,
+            "cpu_percent": cpu, "partial": partial}
+
+
+def _fill(store, container_id, count, interval=10.0, start=T0):
+    for i in range(count):
+        store.append([_row(container_id, float(i), cpu=50.0)], start + i * interval)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StatsStore(str(tmp_path), rollup_interval=3600)
+    yield store
+    store.close()
+
+
+def test_appends_fixed_width_records_and_queries_ranges(store, tmp_path):
+    _fill(store, "abc", 100)
+    store.append([_row("abc", None, partial=True), _row("def", 5.0)], T0 + 1000)
+
+    assert os.path.getsize(tmp_path / "raw" / "abc.bin") == 100 * RECORD.itemsize
+    records = store.read("abc", "raw", T0 + 100, T0 + 200)
+    assert records["t"].tolist() == [T0 + 100 + 10 * i for i in range(10)]
+    assert records["memory"].tolist() == [float(i) for i in range(10, 20)]
+    assert store.containers() == ["abc", "def"]
+
+
+def test_aggregate_weights_by_samples_and_skips_missing_cpu():
+    records = np.zeros(4, dtype=RECORD)
+    records["t"] = [0, 30, 60, 90]
+    records["memory"] = records["memory_max"] = [1, 3, 10, 20]
+    records["cpu"] = [10, np.nan, np.nan, np.nan]
+    records["samples"] = [1, 3, 1, 1]
+
+    buckets = aggregate(records, 60)
+
+    assert buckets["t"].tolist() == [0, 60]
+    assert buckets["memory"].tolist() == [2.5, 15.0]
+    assert buckets["memory_max"].tolist() == [3, 20]
+    assert buckets["cpu"][0] == 10 and np.isnan(buckets["cpu"][1])
+    assert buckets["samples"].tolist() == [4, 2]
+
+
+def test_rollup_only_writes_complete_buckets(store):
+    _fill(store, "abc", 30)  # 300 s of samples: 5 minutes
+
+    store.rollup(now=T0 + 150)
+    assert store.read("abc", "1m", 0, np.inf)["t"].tolist() == [T0, T0 + 60]
+
+    store.rollup(now=T0 + 400)
+    minutes = store.read("abc", "1m", 0, np.inf)
+    assert minutes["t"].tolist() == [T0 + 60 * i for i in range(5)]
+    assert minutes["samples"].tolist() == [6] * 5
+    assert minutes["memory"][0] == pytest.approx(2.5)
+    assert minutes["memory_max"][0] == 5
+    # The hour is not complete yet
+    assert len(store.read("abc", "1h", 0, np.inf)) == 0
+
+
+def test_retention_compacts_and_removes_expired_files(store, tmp_path):
+    store.retention = {"raw": 500.0, "1m": DAY, "1h": DAY}
+    _fill(store, "abc", 100)  # T0 .. T0 + 990
+    _fill(store, "old", 10)
+
+    store.enforce_retention(now=T0 + 1400)
+
+    assert store.read("abc", "raw", 0, np.inf)["t"][0] == T0 + 900
+    assert not (tmp_path / "raw" / "old.bin").exists()
+    # Appends continue after the rewrite
+    store.append([_row("abc", 1.0)], T0 + 2000)
+    assert len(store.read("abc", "raw", 0, np.inf)) == 11
+
+
+def test_query_picks_the_finest_covering_resolution(store):
+    now = T0 + 10 * DAY
+    assert store.pick_resolution(now - 3600, now, now=now) == "raw"
+    assert store.pick_resolution(now - 7 * DAY, now, now=now) == "1h"
+    assert store.pick_resolution(now - 3 * DAY, now, now=now) == "1m"
+    assert store.pick_resolution(now - 3600, now, step=30, now=now) == "raw"
+    assert store.pick_resolution(now - 30 * DAY, now, step=3600, now=now) == "1h"
+    # Nothing that fine reaches back that far: the closest tier answers
+    assert store.pick_resolution(now - 30 * DAY, now, step=60, now=now) == "1m"
+
+    _fill(store, "abc", 60)
+    resolution, records = store.query("abc", T0, T0 + 600, step=120)
+    assert resolution == "raw"
+    assert records["samples"].tolist() == [12] * 5
+
+
+def test_torn_tail_is_ignored_and_realigned(store, tmp_path):
+    _fill(store, "abc", 3)
+    with open(tmp_path / "raw" / "abc.bin", "ab") as file:
+        file.write(b"\x01\x02\x03")
+
+    assert len(store.read("abc", "raw", 0, np.inf)) == 3
+    store.append([_row("abc", 9.0)], T0 + 100)
+    assert store.read("abc", "raw", 0, np.inf)["memory"].tolist() == [0, 1, 2, 9]
+
+
+def test_second_store_on_a_directory_is_read_only(store, tmp_path):
+    _fill(store, "abc", 3)
+    reader = StatsStore(str(tmp_path))
+    try:
+        assert not reader.writable
+        reader.append([_row("abc", 1.0)], T0 + 100)
+        assert len(reader.read("abc", "raw", 0, np.inf)) == 3
+    finally:
+        reader.close()
+
+
+def test_rejects_ids_outside_the_store(store):
+    with pytest.raises(ValueError):
+        store.read("../raw/abc", "raw", 0, 1)
+    assert not store.has("..")
+
+
+def test_manager_sample_persists_rows(store):
+    container = MagicMock(id="abc")
+    container.name = "web"
+    container.stats.return_value = {"memory_stats": {"usage": 8 * 1024 ** 2}}
+    engine = MagicMock()
+    engine.flights.do = lambda key, fn: fn()
+    engine.get_client.return_value.containers.list.return_value = [container]
+    manager = ContainerMemoryManager(engine, store=store)
+
+    manager.sample()
+
+    records = store.read("abc", "raw", 0, np.inf)
+    assert records["memory"].tolist() == [8.0]
+    assert np.isnan(records["cpu"][0])
+
+
+def test_stats_endpoint_serves_ranges(store):
+    containers = {"a" * 64: "web"}
+    _fill(store, "a" * 64, 60)
+    with FakeDockerDaemon(containers=containers, images={}) as daemon:
+        app.dependency_overrides[get_async_docker_client] = \
+            lambda: AsyncDockerClient(AsyncDockerEngine(daemon.url))
+        app.dependency_overrides[get_stats_history_store] = lambda: store
+        try:
+            status, _, body = call_json(
+                app, "GET", f"/api/containers/web/stats?from={T0}&to={T0 + 600}&step=60")
+            assert status == 200
+            assert body["container_id"] == "a" * 64
+            assert body["resolution"] == "raw"
+            assert [p["samples"] for p in body["points"]] == [6] * 10
+            assert body["points"][0] == {"t": T0, "memory_usage": 2.5, "memory_max": 5.0,
+                                         "cpu_percent": 50.0, "samples": 6}
+
+            status, _, _ = call_json(app, "GET", "/api/containers/missing/stats")
+            assert status == 404
+            status, _, _ = call_json(app, "GET", f"/api/containers/web/stats?from={T0}&to={T0}")
+            assert status == 400
+        finally:
+            app.dependency_overrides.clear()
@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+import docker.errors
+import pytest
+from asgi import call_json
+from dependencies import get_docker_versions
+from main import app
+from services.version_service import VersionService, is_up_to_date
+
+
+class ReleaseFeed:
+    """
+    Local stand-in for GitHub's latest-release endpoint.
+    """
+
+    def __init__(self, tag="v25.0.2"):
+        self.tag = tag
+        self.rate_limited_until = None
+        self.requests = []
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                feed.requests.append(self.headers.get("If-None-Match"))
+                etag = f'"{feed.tag}"'
+                if feed.rate_limited_until is not None:
+                    self._reply(403, b'{"message": "API rate limit exceeded"}',
+                                {"X-RateLimit-Remaining": "0",
+                                 "X-RateLimit-Reset": str(int(feed.rate_limited_until))})
+                elif self.headers.get("If-None-Match") == etag:
+                    self._reply(304, b"", {"ETag": etag})
+                else:
+                    self._reply(200, json.dumps({"tag_name": feed.tag}).encode(), {"ETag": etag})
+
+            def _reply(self, code, body, headers):
+                self.send_response(code)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/releases/latest"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _engine(version="25.0.2"):
+    engine = MagicMock()
+    engine.is_online.return_value = True
+    engine.get_client.return_value.version.return_value = {"Version": version}
+    return engine
+
+
+def test_compares_versions_not_strings():
+    assert is_up_to_date("25.0.2", "v25.0.2")
+    assert is_up_to_date("25.0.10", "v25.0.9")
+    assert not is_up_to_date("24.0.7", "v25.0.2")
+    assert is_up_to_date("20.10.24+dfsg1", "v20.10.24")
+    assert is_up_to_date(None, "v25.0.2") is None
+
+
+def test_revalidates_with_etag_and_honours_rate_limits():
+    with ReleaseFeed() as feed:
+        service = VersionService(_engine(), feed_url=feed.url, latest_ttl=0, retry_interval=0)
+        assert service.latest_version(wait=True) == "v25.0.2"
+
+        # Stale: revalidated with the ETag, the feed answers 304
+        service.refresh_latest()
+        assert feed.requests == [None, '"v25.0.2"']
+        assert service.latest_version() == "v25.0.2"
+
+        feed.tag = "v26.0.0"
+        service.refresh_latest()
+        assert service.latest.value == "v26.0.0"
+
+        feed.rate_limited_until = time.time() + 3600
+        service.refresh_latest()
+        # Kept the last known value and will not ask again before the reset
+        assert service.latest.value == "v26.0.0"
+        assert service.latest.due - time.monotonic() > 3500
+
+
+def test_status_never_waits_for_the_network():
+    with ReleaseFeed() as feed:
+        service = VersionService(_engine("25.0.2"), feed_url=feed.url)
+        app.dependency_overrides[get_docker_versions] = lambda: service
+        try:
+            started = time.monotonic()
+            status, _, body = call_json(app, "GET", "/api/version/")
+            assert status == 200 and time.monotonic() - started < 0.5
+
+            # The background refresh fills the cache
+            deadline = time.monotonic() + 5
+            while service.latest.checked_at is None or service.installed.checked_at is None:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            _, _, body = call_json(app, "GET", "/api/version/")
+            assert body["installed"] == "25.0.2" and body["latest"] == "v25.0.2"
+            assert body["up_to_date"] is True
+            assert len(feed.requests) == 1
+        finally:
+            app.dependency_overrides.clear()
+            service.stop()
+
+
+def test_unreachable_feed_keeps_cache_empty_without_raising():
+    service = VersionService(_engine(), feed_url="http://127.0.0.1:9/latest", timeout=0.5)
+    assert service.latest_version(wait=True) is None
+    assert service.status().up_to_date is None
+
+
+def test_installed_version_needs_the_engine():
+    engine = _engine()
+    engine.is_online.return_value = False
+    with pytest.raises(docker.errors.DockerException, match="not available"):
+        VersionService(engine).installed_version(wait=True)
+
+
+def test_failing_engine_is_not_asked_again_before_the_retry_interval():
+    engine = _engine()
+    engine.get_client.return_value.version.side_effect = docker.errors.APIError("daemon error")
+    service = VersionService(engine, retry_interval=60)
+
+    with pytest.raises(docker.errors.DockerException):
+        service.installed_version(wait=True)
+    assert service.installed_version(wait=True) is None
+    assert service.installed_version() is None
+    service.stop()
+
+    assert engine.get_client.return_value.version.call_count == 1